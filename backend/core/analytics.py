@@ -0,0 +1,33 @@
+import time
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import AnalyticsRefresh, CompanyApplicationConversion, CompanyPlotUsage, PlanRevenue
+
+VIEWS = tuple(model._meta.db_table for model in (CompanyPlotUsage, CompanyApplicationConversion, PlanRevenue))
+
+
+def is_materialized() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def refresh(concurrently: bool = True) -> dict[str, float]:
+    # Plain views (non-PostgreSQL backends) are always current, so there is nothing to refresh.
+    timings = {}
+    if is_materialized():
+        keyword = ' CONCURRENTLY' if concurrently else ''
+        with connection.cursor() as cursor:
+            for name in VIEWS:
+                started = time.perf_counter()
+                cursor.execute(f'REFRESH MATERIALIZED VIEW{keyword} {name}')
+                timings[name] = round((time.perf_counter() - started) * 1000, 3)
+    AnalyticsRefresh.objects.update_or_create(id=1, defaults={'refreshed_at': timezone.now()})
+    return timings
+
+
+def refreshed_at() -> float | None:
+    if not is_materialized():
+        return time.time()
+    row = AnalyticsRefresh.objects.filter(id=1).first()
+    return row.refreshed_at.timestamp() if row else None
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import stats  # noqa: F401  (connects the summary-row signal handlers)
+        from . import tenancy  # noqa: F401  (membership cache invalidation)
+        from . import events  # noqa: F401  (event feed for the SSE stream)
+        from . import caching  # noqa: F401  (per-company cache generations)
+        from . import throttling
+
+        throttling.validate_rates()
@@ -0,0 +1,188 @@
+import datetime
+import posixpath
+
+from django.core import serializers
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from . import events
+from .models import Application, ArchivedApplication, ArchivedProperty, Property
+
+FILE_FIELDS = {
+    Property: ('image', 'layout_image'),
+    Application: ('id_document', 'proof_of_funds'),
+}
+CLOSED_APPLICATION_STATUSES = (Application.Status.APPROVED, Application.Status.REJECTED)
+
+
+def _snapshots(objs):
+    return {row['pk']: row['fields'] for row in serializers.serialize('python', objs)}
+
+
+def _archive_applications(applications, now):
+    snapshots = _snapshots(applications)
+    ArchivedApplication.objects.bulk_create(
+        [
+            ArchivedApplication(
+                id=app.id,
+                company_id=app.company_id,
+                property_id=app.property_id,
+                applicant_email=app.applicant_email,
+                status=app.status,
+                date_applied=app.date_applied,
+                archived_at=now,
+                data=snapshots[str(app.id)],
+            )
+            for app in applications
+        ],
+        ignore_conflicts=True,
+    )
+    Application.objects.filter(id__in=[app.id for app in applications]).delete()
+
+
+def _archive_properties(properties, now):
+    snapshots = _snapshots(properties)
+    ArchivedProperty.objects.bulk_create(
+        [
+            ArchivedProperty(
+                id=prop.id,
+                company_id=prop.company_id,
+                title=prop.title,
+                deleted_at=prop.deleted_at,
+                archived_at=now,
+                data=snapshots[str(prop.id)],
+            )
+            for prop in properties
+        ],
+        ignore_conflicts=True,
+    )
+    Property.objects.filter(id__in=[prop.id for prop in properties]).delete()
+
+
+def archive_properties(cutoff, batch_size, dry_run=False):
+    # Properties soft-deleted before `cutoff`, together with every application that points at them.
+    candidates = Property.objects.filter(deleted_at__lt=cutoff).order_by('deleted_at', 'id')
+    if dry_run:
+        return {
+            'properties': candidates.count(),
+            'applications': Application.objects.filter(property__deleted_at__lt=cutoff).count(),
+        }
+
+    totals = {'properties': 0, 'applications': 0}
+    while True:
+        with transaction.atomic():
+            properties = list(candidates.select_for_update(skip_locked=True)[:batch_size])
+            if not properties:
+                break
+            applications = list(Application.objects.filter(property_id__in=[prop.id for prop in properties]))
+            now = timezone.now()
+            if applications:
+                _archive_applications(applications, now)
+            _archive_properties(properties, now)
+        totals['properties'] += len(properties)
+        totals['applications'] += len(applications)
+        if len(properties) < batch_size:
+            break
+    return totals
+
+
+def archive_applications(cutoff, batch_size, dry_run=False):
+    # Approved/rejected applications submitted before `cutoff`; pending ones are never archived.
+    candidates = Application.objects.filter(
+        status__in=CLOSED_APPLICATION_STATUSES, date_applied__lt=cutoff
+    ).order_by('date_applied', 'id')
+    if dry_run:
+        return {'applications': candidates.count()}
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            applications = list(candidates.select_for_update(skip_locked=True)[:batch_size])
+            if not applications:
+                break
+            _archive_applications(applications, timezone.now())
+        total += len(applications)
+        if len(applications) < batch_size:
+            break
+    return {'applications': total}
+
+
+def referenced_files():
+    names = set()
+    for model, fields in FILE_FIELDS.items():
+        for field in fields:
+            names.update(model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''}).values_list(field, flat=True))
+    return names
+
+
+def upload_dirs():
+    dirs = set()
+    for model, fields in FILE_FIELDS.items():
+        for field in fields:
+            upload_to = model._meta.get_field(field).upload_to
+            if isinstance(upload_to, str):
+                dirs.add(upload_to.split('%')[0].rstrip('/'))
+    # Nested upload dirs (properties/layouts under properties) are walked from their parent.
+    return sorted(d for d in dirs if not any(d != other and d.startswith(other + '/') for other in dirs))
+
+
+def _walk(storage, directory):
+    try:
+        subdirs, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield posixpath.join(directory, name)
+    for subdir in subdirs:
+        yield from _walk(storage, posixpath.join(directory, subdir))
+
+
+def collect_orphaned_media(grace, dry_run=False, storage=None):
+    # Files under the upload dirs that no live property/application references. Files newer than
+    # `grace` are kept so an upload whose row is not committed yet is never collected.
+    storage = storage or default_storage
+    referenced = referenced_files()
+    newest_allowed = timezone.now() - grace
+    files = 0
+    reclaimed = 0
+    for directory in upload_dirs():
+        for name in _walk(storage, directory):
+            if name in referenced:
+                continue
+            try:
+                if storage.get_modified_time(name) > newest_allowed:
+                    continue
+                size = storage.size(name)
+            except (NotImplementedError, OSError):
+                continue
+            if not dry_run:
+                storage.delete(name)
+            files += 1
+            reclaimed += size
+    return {'files': files, 'bytes': reclaimed}
+
+
+def run(property_days, application_days, batch_size, grace_hours, dry_run=False, media=True, event_hours=None):
+    now = timezone.now()
+    property_cutoff = now - datetime.timedelta(days=property_days)
+    application_cutoff = (now - datetime.timedelta(days=application_days)).date()
+
+    properties = archive_properties(property_cutoff, batch_size, dry_run=dry_run)
+    applications = archive_applications(application_cutoff, batch_size, dry_run=dry_run)
+    report = {
+        'dryRun': dry_run,
+        'propertyCutoff': property_cutoff.isoformat(),
+        'applicationCutoff': application_cutoff.isoformat(),
+        'archivedProperties': properties['properties'],
+        'archivedApplications': properties['applications'] + applications['applications'],
+        'mediaFiles': 0,
+        'mediaBytes': 0,
+        'prunedEvents': 0,
+    }
+    if event_hours is not None:
+        report['prunedEvents'] = events.prune(datetime.timedelta(hours=event_hours), dry_run=dry_run)
+    if media:
+        reclaimed = collect_orphaned_media(datetime.timedelta(hours=grace_hours), dry_run=dry_run)
+        report.update(mediaFiles=reclaimed['files'], mediaBytes=reclaimed['bytes'])
+    return report
@@ -0,0 +1,148 @@
+import hashlib
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import db_routing
+from .models import Application, Company, Property
+
+# Versioned cache namespaces. Every company has a generation counter, plus one (PUBLIC) for data
+# shown to anonymous visitors; keys embed the current generations of the namespaces they depend on.
+# Invalidating a tenant is a single counter bump: its old keys are never read again and expire on
+# their own, so bulk writes never have to find or delete individual entries. Keys start with the
+# company namespace, so a sharded cache backend spreads tenants across nodes.
+#
+#   caching.get_or_set([caching.company(company_id)], ('features',), compute)
+#   caching.invalidate_companies([company_id])       # after a write; runs on commit
+#
+# Bumps come from every process that writes (web workers, scan_uploads, archive_and_purge), so
+# TENANT_CACHE must be shared between them. On a per-process backend (locmem) nothing is cached:
+# get_or_set() always computes and bumps are skipped.
+PUBLIC = 'public'
+
+
+def _cache():
+    return caches[settings.TENANT_CACHE]
+
+
+def is_shared(alias=None) -> bool:
+    # Whether every process sees the same entries in this cache alias (TENANT_CACHE by default).
+    cache = caches[alias] if alias else _cache()
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def company(company_id) -> str:
+    return f'company:{company_id}'
+
+
+def _generation_key(namespace):
+    return f'gen:{namespace}'
+
+
+def _seed():
+    # Initial generation for a namespace whose counter is missing (first use, evicted or expired).
+    # Time-based, so a recreated counter never lands on a generation an older entry was stored under.
+    return time.time_ns() // 1000
+
+
+def _generation_timeout():
+    # Counters expire too, so namespaces nobody reads any more don't stay in the cache forever. They
+    # outlive the entries stored under them; one that expires anyway only costs a recompute.
+    return settings.TENANT_CACHE_TIMEOUT * 2
+
+
+def generations(namespaces) -> dict:
+    cache = _cache()
+    keys = {_generation_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    result = {}
+    for key, namespace in keys.items():
+        if key not in found:
+            cache.add(key, _seed(), timeout=_generation_timeout())
+            found[key] = cache.get(key)
+        result[namespace] = found[key]
+    return result
+
+
+def make_key(namespaces, *parts) -> str:
+    versions = generations(namespaces)
+    prefix = '|'.join(f'{namespace}@{versions[namespace]}' for namespace in namespaces)
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'{prefix}:{digest}'
+
+
+def get_or_set(namespaces, parts, compute, timeout=None):
+    if not is_shared():
+        return compute()
+    key = make_key(namespaces, *parts)
+    cache = _cache()
+    value = cache.get(key)
+    if value is None:
+        # Computed on the primary: a replica that lags behind a bump would cache stale data under
+        # the new generation, where nothing invalidates it again.
+        with db_routing.primary_reads():
+            value = compute()
+        cache.set(key, value, timeout=settings.TENANT_CACHE_TIMEOUT if timeout is None else timeout)
+    return value
+
+
+def bump(namespaces):
+    if not is_shared():
+        return
+    cache = _cache()
+    for namespace in set(namespaces):
+        key = _generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _seed(), timeout=_generation_timeout())
+
+
+def invalidate(namespaces):
+    # Bumped after commit: a reader that runs between the write and the commit repopulates the old
+    # generation, not the new one.
+    namespaces = list(namespaces)
+    if namespaces:
+        transaction.on_commit(lambda: bump(namespaces))
+
+
+def invalidate_companies(company_ids, public=True):
+    namespaces = [company(company_id) for company_id in set(company_ids) if company_id]
+    invalidate(namespaces + [PUBLIC] if public else namespaces)
+
+
+@contextmanager
+def tracking(queryset):
+    # For queryset.update()/delete() paths, which bypass model signals: invalidate every company
+    # the affected rows belong to.
+    company_ids = set(queryset.order_by().values_list('company_id', flat=True).distinct())
+    yield
+    invalidate_companies(company_ids, public=queryset.model is not Application)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def _company_changed(sender, instance, **kwargs):
+    invalidate_companies([instance.pk])
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def _property_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_companies([instance.company_id])
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def _application_changed(sender, instance, raw=False, **kwargs):
+    # Applications are never public, so only the company's namespace changes.
+    if not raw:
+        invalidate_companies([instance.company_id], public=False)
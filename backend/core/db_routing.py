@@ -0,0 +1,84 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in connections.databases
+
+
+def _pin_key(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'db-pin:user:{user.pk}'
+    return f"db-pin:ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def pin_to_primary(request):
+    caches[settings.REPLICA_PIN_CACHE].set(_pin_key(request), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(request) -> bool:
+    return bool(caches[settings.REPLICA_PIN_CACHE].get(_pin_key(request)))
+
+
+def use_replica(request):
+    # Returns a token for release(), or None when this request must read from the primary.
+    if not replica_configured() or request.method not in SAFE_METHODS or is_pinned(request):
+        return None
+    return _replica_reads.set(True)
+
+
+def release(token):
+    if token is not None:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    # Reads inside the block go to the primary, even in a view that opted into the replica.
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    # Reads go to the replica only inside views that opted in via use_replica(); everything
+    # else, including all writes, stays on the primary.
+    def db_for_read(self, model, **hints):
+        return REPLICA_DB_ALIAS if _replica_reads.get() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaPinMiddleware:
+    # Read-your-writes: after a successful write, the caller reads from the primary for
+    # REPLICA_PIN_SECONDS so replication lag never hides their own change.
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request)
+        return response
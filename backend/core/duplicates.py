@@ -0,0 +1,121 @@
+import datetime
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .ids import uuid7_floor
+from .models import Application
+
+# Repeated submissions of the same application (double taps, retries from flaky connections)
+# resolve to the row that already exists instead of inserting another one:
+#   - an Idempotency-Key header maps straight to the application it created (cached for
+#     IDEMPOTENCY_KEY_TTL seconds), checked before the request is validated; the key only replays
+#     a request for the same email and property, any other body gets a 422;
+#   - otherwise the fingerprint (normalized applicant email + property) is looked up among
+#     applications from the last APPLICATION_DUPLICATE_WINDOW_HOURS (and at least all of today)
+#     before anything is saved.
+# The unique (fingerprint, date_applied) constraint settles concurrent submissions on the same day;
+# date_applied is the partition key, so the constraint also holds on the partitioned table.
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# What a fingerprint match echoes back: matching an email and property proves neither owns the
+# existing application, so its details are not returned.
+DUPLICATE_FIELDS = ('id', 'propertyId', 'status', 'dateApplied')
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used for a different application.'
+    default_code = 'idempotency_key_reused'
+
+
+def normalize_email(email: str) -> str:
+    return (email or '').strip().lower()
+
+
+def application_fingerprint(email: str, property_id) -> str:
+    return hashlib.sha256(f'{normalize_email(email)}|{property_id}'.encode()).hexdigest()[:32]
+
+
+def request_fingerprint(data) -> str | None:
+    # Fingerprint of a raw (unvalidated) submission body, None when it names no valid property.
+    if not hasattr(data, 'get'):
+        return None
+    try:
+        property_id = uuid.UUID(str(data.get('propertyId')))
+    except ValueError:
+        return None
+    return application_fingerprint(data.get('applicantEmail'), property_id)
+
+
+def find_duplicate(fingerprint: str):
+    since = timezone.now() - datetime.timedelta(hours=settings.APPLICATION_DUPLICATE_WINDOW_HOURS)
+    # The window never ends before the start of today: the unique constraint covers the whole
+    # date_applied day, so a shorter window must still find today's row instead of hitting it.
+    since = min(since, timezone.make_aware(datetime.datetime.combine(timezone.localdate(), datetime.time.min)))
+    return (
+        Application.objects.filter(fingerprint=fingerprint, date_applied__gte=since.date(), id__gte=uuid7_floor(since))
+        .order_by('id')
+        .first()
+    )
+
+
+def _idempotency_cache_key(scope: str, key: str) -> str:
+    return f'idempotency:{scope}:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def idempotency_key(request) -> str | None:
+    key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+    return key[:MAX_IDEMPOTENCY_KEY_LENGTH] or None
+
+
+def replayed_application(scope: str, request):
+    # The application an earlier request with this Idempotency-Key created, if it still exists.
+    # A key is bound to what it created: a body for another email or property can't replay (and
+    # read back) someone else's application. The body is only parsed once the key is known, so
+    # requests without a remembered key reach the throttles unparsed.
+    key = idempotency_key(request)
+    if not key:
+        return None
+    application_id = caches[settings.IDEMPOTENCY_CACHE].get(_idempotency_cache_key(scope, key))
+    if application_id is None:
+        return None
+    application = Application.objects.filter(id=application_id).first()
+    if application is not None and application.fingerprint != request_fingerprint(request.data):
+        raise IdempotencyKeyReused()
+    return application
+
+
+def remember(scope: str, key: str | None, application):
+    if key:
+        caches[settings.IDEMPOTENCY_CACHE].set(
+            _idempotency_cache_key(scope, key), str(application.id), timeout=settings.IDEMPOTENCY_KEY_TTL
+        )
+
+
+def save_application(serializer, **kwargs):
+    # Saves a validated ApplicationSerializer unless an equivalent application already exists.
+    # Returns (application, created). Duplicates are detected before save(), so their documents
+    # are never written to storage.
+    data = serializer.validated_data
+    property_id = kwargs.get('property_id') or data.get('property_id')
+    fingerprint = application_fingerprint(data.get('applicant_email'), property_id)
+    existing = find_duplicate(fingerprint)
+    if existing is not None:
+        return existing, False
+    try:
+        with transaction.atomic():
+            return serializer.save(fingerprint=fingerprint, **kwargs), True
+    except IntegrityError:
+        # Lost the race against an identical submission committed in the meantime; any documents
+        # this attempt stored are unreferenced and left to archive_and_purge's media cleanup.
+        existing = find_duplicate(fingerprint)
+        if existing is None:
+            raise
+        return existing, False
@@ -0,0 +1,356 @@
+import asyncio
+import datetime
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.db import Error as DBError, close_old_connections, connections, router
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+
+from .ids import uuid7_floor, uuid7_time_ms
+from .models import Application, Event, Property, User
+from .tenancy import TenantContext
+
+# Live updates for dashboards. Writes append an Event row and, on PostgreSQL, NOTIFY it on
+# CHANNEL in the same transaction, so listeners only hear about committed changes. Each ASGI
+# worker holds one LISTEN connection (EventHub) and fans events out to its open SSE streams;
+# reconnecting streams replay missed rows from the table using the Last-Event-ID cursor. Other
+# databases fall back to polling the table every EVENTS_POLL_INTERVAL seconds.
+CHANNEL = 'raven_events'
+TICKET_SALT = 'core.events.ticket'
+APPLICATION_KINDS = (Event.Kind.APPLICATION_CREATED, Event.Kind.APPLICATION_STATUS)
+
+logger = logging.getLogger(__name__)
+
+
+def _message(event):
+    return {
+        'id': str(event.id),
+        'kind': event.kind,
+        'companyId': str(event.company_id),
+        'userId': str(event.user_id) if event.user_id else None,
+        'data': event.payload,
+    }
+
+
+def emit(events):
+    if not events:
+        return
+    alias = router.db_for_write(Event)
+    Event.objects.using(alias).bulk_create(events)
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        # NOTIFY is delivered on commit and dropped on rollback, like the rows themselves.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, message) FROM unnest(%s::text[]) AS message',
+                [CHANNEL, [json.dumps(_message(event)) for event in events]],
+            )
+
+
+def _application_event(kind, row, previous_status=None):
+    payload = {'id': str(row['id']), 'propertyId': str(row['property_id']), 'status': row['status']}
+    if previous_status is not None:
+        payload['previousStatus'] = previous_status
+    return Event(kind=kind, company_id=row['company_id'], user_id=row['user_id'], payload=payload)
+
+
+def _property_event(row, previous_status):
+    payload = {'id': str(row['id']), 'status': row['status'], 'previousStatus': previous_status}
+    return Event(kind=Event.Kind.PROPERTY_STATUS, company_id=row['company_id'], payload=payload)
+
+
+EVENT_FIELDS = {
+    Application: ('id', 'company_id', 'user_id', 'property_id', 'status'),
+    Property: ('id', 'company_id', 'status'),
+}
+
+
+def _status_events(model, before, after):
+    events = []
+    for row in after:
+        previous = before.get(row['id'])
+        if previous is None or previous == row['status']:
+            continue
+        if model is Application:
+            events.append(_application_event(Event.Kind.APPLICATION_STATUS, row, previous))
+        else:
+            events.append(_property_event(row, previous))
+    return events
+
+
+@contextmanager
+def tracking(queryset):
+    # For queryset.update() paths, which bypass model signals: emit an event for every row whose
+    # status differs after the block.
+    model = queryset.model
+    before = dict(queryset.order_by().values_list('id', 'status'))
+    yield
+    if before:
+        emit(_status_events(model, before, queryset.all().order_by('id').values(*EVENT_FIELDS[model])))
+
+
+def _previous_status(instance, update_fields):
+    # core.stats stores the row as it was before this save (None for inserts).
+    previous = getattr(instance, '_stats_previous', None)
+    if previous is None or (update_fields is not None and 'status' not in update_fields):
+        return None
+    return previous['status']
+
+
+@receiver(post_save, sender=Application)
+def _application_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    row = {field: getattr(instance, field) for field in EVENT_FIELDS[Application]}
+    if created:
+        emit([_application_event(Event.Kind.APPLICATION_CREATED, row)])
+    else:
+        emit(_status_events(Application, {instance.id: _previous_status(instance, update_fields)}, [row]))
+
+
+@receiver(post_save, sender=Property)
+def _property_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created:
+        return
+    row = {field: getattr(instance, field) for field in EVENT_FIELDS[Property]}
+    emit(_status_events(Property, {instance.id: _previous_status(instance, update_fields)}, [row]))
+
+
+def prune(older_than, dry_run=False):
+    stale = Event.objects.filter(id__lt=uuid7_floor(timezone.now() - older_than))
+    return stale.count() if dry_run else stale.delete()[0]
+
+
+def create_ticket(user):
+    return signing.dumps({'user': str(user.pk)}, salt=TICKET_SALT)
+
+
+class Subscription:
+    # One open stream: what it may see and a bounded queue of pending messages. A stream that falls
+    # EVENTS_QUEUE_SIZE messages behind is closed; the browser reconnects and replays from its cursor.
+    def __init__(self, company_id=None, user_id=None):
+        self.company_id = str(company_id) if company_id else None
+        self.user_id = str(user_id) if user_id else None
+        self.queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, message):
+        if self.company_id and message['companyId'] != self.company_id:
+            return False
+        if self.user_id and message['kind'] in APPLICATION_KINDS and message['userId'] != self.user_id:
+            return False
+        return True
+
+    def offer(self, message):
+        if self.overflowed or not self.wants(message):
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def replay(self, cursor, limit):
+        # Events after `cursor` visible to this stream, oldest first, or None when the gap is too
+        # large (or reaches past the retention window) and the client should reload its lists instead.
+        try:
+            cursor = uuid.UUID(cursor)
+        except ValueError:
+            return None
+        retained_since = timezone.now() - datetime.timedelta(hours=settings.EVENTS_RETENTION_HOURS)
+        if (uuid7_time_ms(cursor) or 0) < retained_since.timestamp() * 1000:
+            return None
+        events = Event.objects.using(router.db_for_write(Event)).filter(id__gt=cursor).order_by('id')
+        if self.company_id:
+            events = events.filter(company_id=self.company_id)
+        if self.user_id:
+            events = events.filter(Q(user_id=self.user_id) | ~Q(kind__in=APPLICATION_KINDS))
+        events = list(events[: limit + 1])
+        if len(events) > limit:
+            return None
+        return [_message(event) for event in events]
+
+
+def subscription_for_ticket(ticket):
+    # Resolves a stream ticket to a Subscription scoped like the REST API: SuperAdmins see every
+    # company, admins their active company, clients their active company's inventory and their own
+    # applications. Returns None for invalid tickets or users without a company.
+    try:
+        payload = signing.loads(ticket, salt=TICKET_SALT, max_age=settings.EVENTS_TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    user = User.objects.filter(pk=payload.get('user'), is_active=True).first()
+    if user is None:
+        return None
+    tenant = TenantContext(user)
+    if tenant.is_superadmin:
+        return Subscription()
+    if tenant.company_id is None:
+        return None
+    return Subscription(tenant.company_id, user.pk if tenant.is_client else None)
+
+
+class EventHub:
+    # Per-process fan-out from a single LISTEN connection (or poll loop) to every open stream.
+    # Delivered ids from the last EVENTS_CATCH_UP_SECONDS are remembered, so the catch-up query run
+    # after a reconnect (and every poll) can overlap the previous one without duplicates: rows
+    # committed out of id order are still picked up.
+    def __init__(self):
+        self.subscriptions = set()
+        self.task = None
+        self.seen = OrderedDict()
+        self.since_ms = None
+
+    def subscribe(self, subscription):
+        self.subscriptions.add(subscription)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def publish(self, message):
+        event_id = uuid.UUID(message['id'])
+        if event_id in self.seen:
+            return
+        ms = uuid7_time_ms(event_id) or 0
+        self.seen[event_id] = ms
+        self.since_ms = max(self.since_ms or 0, ms)
+        self._prune()
+        for subscription in list(self.subscriptions):
+            subscription.offer(message)
+
+    def _floor_ms(self):
+        now_ms = int(timezone.now().timestamp() * 1000)
+        return (self.since_ms or now_ms) - settings.EVENTS_CATCH_UP_SECONDS * 1000
+
+    def _prune(self):
+        # Ids arrive roughly in time order, so expired ones are dropped from the oldest end; one
+        # that arrived late is dropped once the ids ahead of it expire.
+        floor_ms = self._floor_ms()
+        while self.seen and next(iter(self.seen.values())) < floor_ms:
+            self.seen.popitem(last=False)
+
+    def _recent(self):
+        floor_ms = self._floor_ms()
+        self.seen = OrderedDict((event_id, ms) for event_id, ms in self.seen.items() if ms >= floor_ms)
+        floor = uuid7_floor(datetime.datetime.fromtimestamp(floor_ms / 1000, datetime.timezone.utc))
+        events = Event.objects.using(router.db_for_write(Event)).filter(id__gte=floor).order_by('id')
+        return [_message(event) for event in events[: settings.EVENTS_CATCH_UP_LIMIT]]
+
+    async def _catch_up(self, publish=True):
+        for message in await sync_to_async(self._recent)():
+            if publish:
+                self.publish(message)
+            else:
+                self.seen[uuid.UUID(message['id'])] = uuid7_time_ms(uuid.UUID(message['id'])) or 0
+        if self.since_ms is None:
+            self.since_ms = int(timezone.now().timestamp() * 1000)
+
+    async def _run(self):
+        alias = router.db_for_write(Event)
+        # Streams replay their own history, so rows that predate the hub are only marked as seen.
+        await self._catch_up(publish=False)
+        if connections[alias].vendor == 'postgresql':
+            await self._listen(alias)
+        else:
+            await self._poll()
+
+    async def _listen(self, alias):
+        import psycopg
+
+        params = connections[alias].get_connection_params()
+        for name in ('cursor_factory', 'context', 'prepare_threshold'):
+            params.pop(name, None)
+        delay = 1
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(**params, autocommit=True) as conn:
+                    await conn.execute(f'LISTEN {CHANNEL}')
+                    await self._catch_up()
+                    delay = 1
+                    async for notify in conn.notifies():
+                        self.publish(json.loads(notify.payload))
+            except (psycopg.Error, DBError, OSError):
+                logger.warning('Event listener connection lost; reconnecting in %ss', delay, exc_info=True)
+                # The catch-up query's Django connection may be the broken one.
+                await sync_to_async(close_old_connections)()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+            try:
+                await self._catch_up()
+            except DBError:
+                logger.warning('Event poll failed; retrying', exc_info=True)
+                await sync_to_async(close_old_connections)()
+
+
+hub = EventHub()
+
+
+def _sse(message):
+    data = {'companyId': message['companyId'], **message['data']}
+    return f'id: {message["id"]}\nevent: {message["kind"]}\ndata: {json.dumps(data)}\n\n'
+
+
+async def _stream(subscription, cursor):
+    hub.subscribe(subscription)
+    try:
+        yield f'retry: {settings.EVENTS_RETRY_MS}\n\n'
+        # Subscribed before replaying, so nothing committed in between is lost; live copies of
+        # replayed events are skipped.
+        replayed = set()
+        if cursor:
+            messages = await sync_to_async(subscription.replay)(cursor, settings.EVENTS_REPLAY_LIMIT)
+            if messages is None:
+                yield 'event: reset\ndata: {}\n\n'
+            else:
+                for message in messages:
+                    replayed.add(message['id'])
+                    yield _sse(message)
+        loop = asyncio.get_running_loop()
+        # Streams end after EVENTS_STREAM_MAX_SECONDS so access is re-checked on reconnect.
+        deadline = loop.time() + settings.EVENTS_STREAM_MAX_SECONDS
+        while not subscription.overflowed:
+            timeout = min(settings.EVENTS_KEEPALIVE_SECONDS, deadline - loop.time())
+            if timeout <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), timeout)
+            except TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if message['id'] not in replayed:
+                yield _sse(message)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@require_safe
+async def stream_view(request):
+    # EventSource cannot send an Authorization header, so the stream authenticates with a
+    # short-lived ticket from POST /api/events/ticket/.
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'The event stream requires an ASGI server.'}, status=503)
+    subscription = await sync_to_async(subscription_for_ticket)(request.GET.get('ticket', ''))
+    if subscription is None:
+        return JsonResponse({'detail': 'Invalid or expired stream ticket.'}, status=401)
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    response = StreamingHttpResponse(_stream(subscription, cursor), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
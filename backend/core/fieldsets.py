@@ -0,0 +1,145 @@
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+
+SLIM_VIEW = 'slim'
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        'fields',
+        OpenApiTypes.STR,
+        description='Comma-separated list of fields to return (sparse fieldset). `id` is always included.',
+    ),
+    OpenApiParameter(
+        'exclude',
+        OpenApiTypes.STR,
+        description='Comma-separated list of fields to omit from the response.',
+    ),
+    OpenApiParameter(
+        'view',
+        OpenApiTypes.STR,
+        enum=[SLIM_VIEW],
+        description='Use `slim` for the lightweight list representation (grid/card columns only).',
+    ),
+]
+
+
+def _split(value):
+    if not value:
+        return None
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    return names or None
+
+
+def fieldset_kwargs(request):
+    """Serializer kwargs for the sparse fieldset requested via ?fields=, ?exclude= and ?view=slim."""
+    if request is None or getattr(request, 'method', None) not in ('GET', 'HEAD'):
+        return {}
+    params = getattr(request, 'query_params', None)
+    if params is None:
+        return {}
+
+    kwargs = {}
+    fields = _split(params.get('fields'))
+    exclude = _split(params.get('exclude'))
+    if fields:
+        kwargs['fields'] = fields
+    if exclude:
+        kwargs['exclude'] = exclude
+    if params.get('view') == SLIM_VIEW:
+        kwargs['slim'] = True
+    return kwargs
+
+
+class SparseFieldsetMixin:
+    # Meta.slim_fields: the lightweight list representation.
+    # Meta.fieldset_sources: model columns read by computed (source='*') fields.
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        exclude = kwargs.pop('exclude', None)
+        slim = kwargs.pop('slim', False)
+        super().__init__(*args, **kwargs)
+
+        if slim and fields is None:
+            fields = getattr(self.Meta, 'slim_fields', None)
+
+        self.sparse_fields = list(fields) if fields is not None else None
+        self.sparse_exclude = list(exclude) if exclude is not None else None
+        if self.sparse_fields is None and self.sparse_exclude is None:
+            return
+
+        requested = set(self.sparse_fields or ()) | set(self.sparse_exclude or ())
+        unknown = sorted(requested - set(self.fields))
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+
+        keep = set(self.fields) if self.sparse_fields is None else set(self.sparse_fields) | {'id'}
+        keep -= set(self.sparse_exclude or ()) - {'id'}
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+
+def _model_paths(model, source_attrs, select_related):
+    paths = []
+    current = model
+    prefix = ''
+    related = select_related
+    for attr in source_attrs:
+        try:
+            field = current._meta.get_field(attr)
+        except FieldDoesNotExist:
+            field = next((f for f in current._meta.concrete_fields if f.attname == attr), None)
+            if field is None:
+                break
+        if field.one_to_many or field.many_to_many or not field.concrete:
+            break
+        paths.append(prefix + field.name)
+        if not field.is_relation:
+            break
+        # Related columns can only be restricted when the relation is joined in.
+        if not isinstance(related, dict) or field.name not in related:
+            break
+        related = related[field.name]
+        prefix = f'{prefix}{field.name}__'
+        current = field.related_model
+    return paths
+
+
+def restrict_queryset(queryset, serializer):
+    """Push the serializer's sparse fieldset down into `.only()` / `.defer()` on the queryset."""
+    sparse_fields = getattr(serializer, 'sparse_fields', None)
+    sparse_exclude = getattr(serializer, 'sparse_exclude', None)
+    if sparse_fields is None and sparse_exclude is None:
+        return queryset
+
+    model = queryset.model
+    sources = getattr(serializer.Meta, 'fieldset_sources', {})
+    select_related = queryset.query.select_related
+
+    needed = {model._meta.pk.name}
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in sources:
+            needed.update(sources[name])
+            continue
+        if field.source == '*':
+            # Unknown column usage; load the full row rather than risk per-row deferred loads.
+            return queryset
+        needed.update(_model_paths(model, field.source_attrs, select_related))
+
+    if isinstance(select_related, dict):
+        # A deferred relation cannot be traversed by select_related, so only join what is still read.
+        joined = [name for name in select_related if name in needed]
+        queryset = queryset.select_related(None)
+        if joined:
+            queryset = queryset.select_related(*joined)
+
+    if sparse_fields is not None:
+        return queryset.only(*sorted(needed))
+
+    unused = [f.name for f in model._meta.concrete_fields if f.name not in needed]
+    return queryset.defer(*unused) if unused else queryset
@@ -0,0 +1,221 @@
+import math
+import uuid
+
+from django.db import connections, router
+from django.db.models import Avg, BooleanField, CharField, Count, F, FloatField, Min, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import ASin, Cast, Cos, Floor, Power, Radians, Sin, Sqrt
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+
+from .models import Property
+
+MAX_FEATURES = 20
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+DEFAULT_RADIUS_KM = 5
+MAX_RADIUS_KM = 500
+MAX_ZOOM = 22
+# Cluster cells are CLUSTER_CELL_PX map pixels wide at the requested zoom (256px web-mercator tiles).
+CLUSTER_CELL_PX = 64
+
+PROPERTY_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        'features',
+        OpenApiTypes.STR,
+        description='Comma-separated features every returned property must have, e.g. `water,fenced`.',
+    ),
+    OpenApiParameter(
+        'bbox',
+        OpenApiTypes.STR,
+        description=(
+            'Map viewport `minLng,minLat,maxLng,maxLat`; only properties with coordinates inside it are returned. '
+            'minLng > maxLng selects a box crossing the antimeridian.'
+        ),
+    ),
+    OpenApiParameter(
+        'near',
+        OpenApiTypes.STR,
+        description='`lat,lng`: only properties within `radius` km of this point, nearest first.',
+    ),
+    OpenApiParameter(
+        'radius',
+        OpenApiTypes.NUMBER,
+        description=f'Search radius in km for `near` (default {DEFAULT_RADIUS_KM}, max {MAX_RADIUS_KM}).',
+    ),
+]
+
+
+def parse_features(raw):
+    features = list(dict.fromkeys(part.strip() for part in (raw or '').split(',') if part.strip()))
+    if len(features) > MAX_FEATURES:
+        raise ValidationError({'features': f'At most {MAX_FEATURES} features.'})
+    return features
+
+
+def filter_features(queryset, features):
+    if not features:
+        return queryset
+    if connections[queryset.db].vendor == 'postgresql':
+        # jsonb @> containment, served by the jsonb_path_ops GIN index from migration 0015.
+        return queryset.filter(features__contains=features)
+    # SQLite has no JSON containment operator; test each feature against the array's elements.
+    table = Property._meta.db_table
+    for n, feature in enumerate(features):
+        has_feature = RawSQL(
+            f"EXISTS (SELECT 1 FROM json_each(CASE WHEN json_type({table}.features) = 'array' "
+            f"THEN {table}.features ELSE '[]' END) WHERE value = %s)",
+            [feature],
+            output_field=BooleanField(),
+        )
+        queryset = queryset.alias(**{f'_has_feature_{n}': has_feature}).filter(**{f'_has_feature_{n}': True})
+    return queryset
+
+
+def _floats(raw, count, param):
+    try:
+        values = [float(part) for part in raw.split(',')]
+    except ValueError:
+        values = []
+    if len(values) != count or not all(math.isfinite(v) for v in values):
+        raise ValidationError({param: f'Expected {count} comma-separated numbers.'})
+    return values
+
+
+def _check_point(lat, lng, param):
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        raise ValidationError({param: 'Latitude must be within [-90, 90] and longitude within [-180, 180].'})
+
+
+def parse_bbox(raw):
+    if not raw:
+        return None
+    min_lng, min_lat, max_lng, max_lat = _floats(raw, 4, 'bbox')
+    _check_point(min_lat, min_lng, 'bbox')
+    _check_point(max_lat, max_lng, 'bbox')
+    if min_lat > max_lat:
+        raise ValidationError({'bbox': 'minLat must not exceed maxLat.'})
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def parse_near(raw, raw_radius):
+    if not raw:
+        return None
+    lat, lng = _floats(raw, 2, 'near')
+    _check_point(lat, lng, 'near')
+    radius = DEFAULT_RADIUS_KM
+    if raw_radius:
+        (radius,) = _floats(raw_radius, 1, 'radius')
+        if not 0 < radius <= MAX_RADIUS_KM:
+            raise ValidationError({'radius': f'Radius must be in (0, {MAX_RADIUS_KM}] km.'})
+    return lat, lng, radius
+
+
+def filter_bbox(queryset, bbox):
+    # Plain range predicates on (latitude, longitude) so the composite B-tree index does the work.
+    if bbox is None:
+        return queryset
+    min_lng, min_lat, max_lng, max_lat = bbox
+    queryset = queryset.filter(latitude__gte=min_lat, latitude__lte=max_lat)
+    if min_lng <= max_lng:
+        return queryset.filter(longitude__gte=min_lng, longitude__lte=max_lng)
+    return queryset.filter(Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng))
+
+
+def filter_near(queryset, near):
+    # Index-friendly bounding box around the circle first, then the exact haversine distance
+    # (km, annotated as `distance`) on the few rows left.
+    if near is None:
+        return queryset
+    lat, lng, radius = near
+    dlat = radius / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    dlng = radius / (KM_PER_DEGREE_LAT * cos_lat) if cos_lat > 1e-6 else 360
+    min_lat, max_lat = max(lat - dlat, -90), min(lat + dlat, 90)
+    if dlng >= 180 or min_lat == -90 or max_lat == 90:
+        queryset = queryset.filter(latitude__gte=min_lat, latitude__lte=max_lat)
+    else:
+        min_lng, max_lng = lng - dlng, lng + dlng
+        wrapped_min = min_lng + 360 if min_lng < -180 else min_lng
+        wrapped_max = max_lng - 360 if max_lng > 180 else max_lng
+        queryset = filter_bbox(queryset, (wrapped_min, min_lat, wrapped_max, max_lat))
+
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2 = Radians(Cast('latitude', FloatField()))
+    lng2 = Radians(Cast('longitude', FloatField()))
+    haversine = (
+        Power(Sin((lat2 - lat1) / 2), 2)
+        + math.cos(lat1) * Cos(lat2) * Power(Sin((lng2 - lng1) / 2), 2)
+    )
+    distance = 2 * EARTH_RADIUS_KM * ASin(Sqrt(haversine), output_field=FloatField())
+    return queryset.annotate(distance=distance).filter(distance__lte=radius).order_by('distance', 'id')
+
+
+def filter_properties(queryset, request):
+    params = request.query_params
+    queryset = filter_features(queryset, parse_features(params.get('features')))
+    queryset = filter_bbox(queryset, parse_bbox(params.get('bbox')))
+    return filter_near(queryset, parse_near(params.get('near'), params.get('radius')))
+
+
+def parse_zoom(raw):
+    try:
+        zoom = int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({'zoom': f'An integer zoom level between 0 and {MAX_ZOOM} is required.'})
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValidationError({'zoom': f'An integer zoom level between 0 and {MAX_ZOOM} is required.'})
+    return zoom
+
+
+def cluster_properties(queryset, zoom):
+    # Grid clustering in the database: properties are bucketed into square cells sized for the
+    # zoom level and each cell comes back as one marker (count + centroid). Single-property
+    # cells carry the property id so the client can render a normal pin.
+    cell = 360 / (256 * 2 ** zoom) * CLUSTER_CELL_PX
+    rows = (
+        queryset.filter(latitude__isnull=False, longitude__isnull=False)
+        .annotate(
+            cell_y=Floor(Cast('latitude', FloatField()) / cell),
+            cell_x=Floor(Cast('longitude', FloatField()) / cell),
+        )
+        .order_by()
+        .values('cell_y', 'cell_x')
+        .annotate(
+            count=Count('id'),
+            center_lat=Avg(Cast(F('latitude'), FloatField())),
+            center_lng=Avg(Cast(F('longitude'), FloatField())),
+            property_id=Min(Cast('id', CharField())),
+        )
+        .order_by('-count', 'cell_y', 'cell_x')
+    )
+    return [
+        {
+            'latitude': round(row['center_lat'], 6),
+            'longitude': round(row['center_lng'], 6),
+            'count': row['count'],
+            'propertyId': str(uuid.UUID(row['property_id'])) if row['count'] == 1 else None,
+        }
+        for row in rows
+    ]
+
+
+def feature_vocabulary(company_id):
+    # Distinct features across the company's live properties with how many properties have each,
+    # computed in one aggregate query over the JSON arrays.
+    db = connections[router.db_for_read(Property)]
+    table = Property._meta.db_table
+    if db.vendor == 'postgresql':
+        elements = "jsonb_array_elements_text(CASE WHEN jsonb_typeof(p.features) = 'array' THEN p.features ELSE '[]' END) AS f(value)"
+    else:
+        elements = "json_each(CASE WHEN json_type(p.features) = 'array' THEN p.features ELSE '[]' END) AS f"
+    sql = (
+        f'SELECT f.value, COUNT(*) FROM {table} p, {elements} '
+        'WHERE p.company_id = %s AND p.deleted_at IS NULL '
+        'GROUP BY f.value ORDER BY COUNT(*) DESC, f.value'
+    )
+    company_param = Property._meta.get_field('company').get_db_prep_value(company_id, db)
+    with db.cursor() as cursor:
+        cursor.execute(sql, [company_param])
+        return [{'feature': value, 'count': count} for value, count in cursor.fetchall() if isinstance(value, str)]
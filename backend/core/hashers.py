@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+_pool = None
+_pool_lock = threading.Lock()
+_POOL_THREAD_PREFIX = 'password-hashing'
+
+
+def hashing_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_WORKERS,
+                    thread_name_prefix=_POOL_THREAD_PREFIX,
+                )
+    return _pool
+
+
+def _run_bounded(fn, *args, **kwargs):
+    # Caps concurrent hash computations per process; surplus logins queue here instead of
+    # competing for CPU with every other request thread.
+    if not settings.PASSWORD_HASHING_OFFLOAD or threading.current_thread().name.startswith(_POOL_THREAD_PREFIX):
+        return fn(*args, **kwargs)
+    return hashing_pool().submit(fn, *args, **kwargs).result()
+
+
+class BoundedHasherMixin:
+    def encode(self, password, salt, *args, **kwargs):
+        return _run_bounded(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return _run_bounded(super().verify, password, encoded)
+
+
+class TunedPBKDF2PasswordHasher(BoundedHasherMixin, PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or PBKDF2PasswordHasher.iterations
+
+
+class TunedArgon2PasswordHasher(BoundedHasherMixin, Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
@@ -0,0 +1,59 @@
+import datetime
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_counter = 0
+
+
+def uuid7(timestamp_ms: int | None = None, rng=None) -> uuid.UUID:
+    # RFC 9562 UUIDv7: 48-bit Unix time in ms, then 12 bits used as a per-process counter
+    # (monotonic within a millisecond), then 62 random bits. Ids sort by creation time, so
+    # B-tree inserts land at the right edge of the index and ORDER BY id is chronological.
+    global _last_ms, _last_counter
+    # An explicit timestamp (backfills, seeded data) skips the counter; `rng` makes the bits reproducible.
+    getrandbits = rng.getrandbits if rng is not None else lambda bits: int.from_bytes(os.urandom(8), 'big') >> (64 - bits)
+    if timestamp_ms is not None:
+        counter = getrandbits(11)
+        ms = timestamp_ms
+    else:
+        with _lock:
+            ms = time.time_ns() // 1_000_000
+            if ms <= _last_ms:
+                ms = _last_ms
+                counter = _last_counter + 1
+                if counter > 0xFFF:
+                    ms += 1
+                    counter = 0
+            else:
+                # Start each millisecond low in the counter space to leave room for increments.
+                counter = getrandbits(11)
+            _last_ms, _last_counter = ms, counter
+
+    rand_b = getrandbits(62)
+    value = (ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7_time_ms(value: uuid.UUID) -> int | None:
+    if value.version != 7:
+        return None
+    return value.int >> 80
+
+
+def uuid7_for(moment) -> uuid.UUID:
+    # UUIDv7 positioned at a date or datetime (midnight UTC for dates).
+    if not isinstance(moment, datetime.datetime):
+        moment = datetime.datetime.combine(moment, datetime.time(), tzinfo=datetime.timezone.utc)
+    elif moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return uuid7(int(moment.timestamp() * 1000))
+
+
+def uuid7_floor(moment) -> uuid.UUID:
+    # Smallest UUIDv7 for the millisecond of `moment`, for `id >= ...` range scans.
+    ms = int(moment.timestamp() * 1000)
+    return uuid.UUID(int=(ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | 0b10 << 62)
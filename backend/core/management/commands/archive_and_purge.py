@@ -0,0 +1,38 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import archival
+
+
+class Command(BaseCommand):
+    help = (
+        'Move long soft-deleted properties and old closed applications into the archive tables in batches, '
+        'then delete media files no live row references and prune old live-update events. Prints a JSON report of '
+        'archived rows and reclaimed bytes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--property-days', type=int, default=settings.ARCHIVE_PROPERTIES_AFTER_DAYS)
+        parser.add_argument('--application-days', type=int, default=settings.ARCHIVE_APPLICATIONS_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--grace-hours', type=int, default=settings.MEDIA_GC_GRACE_HOURS)
+        parser.add_argument('--event-hours', type=int, default=settings.EVENTS_RETENTION_HOURS)
+        parser.add_argument('--skip-media', action='store_true', help='Archive rows only; leave media files alone.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived/deleted without changing anything.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        report = archival.run(
+            property_days=options['property_days'],
+            application_days=options['application_days'],
+            batch_size=max(1, options['batch_size']),
+            grace_hours=options['grace_hours'],
+            dry_run=options['dry_run'],
+            media=not options['skip_media'],
+            event_hours=options['event_hours'],
+        )
+        report['seconds'] = round(time.monotonic() - started, 3)
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,264 @@
+import json
+import math
+import platform
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from core.management.commands.seed_loadtest import EMAIL_DOMAIN
+from core.models import Application, Company, Property, User
+
+SCENARIOS = (
+    'login',
+    'me',
+    'public_companies',
+    'public_properties',
+    'tenant_properties',
+    'tenant_applications',
+    'application_create',
+    'soft_delete',
+)
+
+PDF_BYTES = b'%PDF-1.4\n1 0 obj <<>> endobj\ntrailer <<>>\n%%EOF\n'
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the real API routes in-process (full URLconf and middleware) against the configured database. '
+        'Reports throughput and p50/p95/p99 latency per scenario as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per scenario.')
+        parser.add_argument('--concurrency', type=int, default=1, help='Worker threads issuing requests.')
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated subset of scenarios.')
+        parser.add_argument('--password', default='loadtest123', help='Password of the seed_loadtest users.')
+        parser.add_argument('--seed-dataset', action='store_true', help='Run seed_loadtest first if no dataset exists.')
+        parser.add_argument('--output', default='', help='Write the JSON report to this file (default: stdout).')
+        parser.add_argument('--compare', default='', help='Previous JSON report to compare against.')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.15,
+            help='Relative p95 increase or throughput drop that counts as a regression (default 0.15).',
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [s.strip() for s in options['scenarios'].split(',') if s.strip()]
+        unknown = sorted(set(scenarios) - set(SCENARIOS))
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(unknown)}")
+
+        if not User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').exists():
+            if not options['seed_dataset']:
+                raise CommandError('No load-test dataset found. Run seed_loadtest first or pass --seed-dataset.')
+            call_command('seed_loadtest', stdout=self.stdout)
+
+        self.password = options['password']
+        allowed_hosts = list(settings.ALLOWED_HOSTS) + ['testserver']
+        # Measure the endpoints themselves, not the abuse throttles in front of them.
+        rest_framework = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            DEBUG=False, ALLOWED_HOSTS=allowed_hosts, MEDIA_ROOT=media_root, REST_FRAMEWORK=rest_framework
+        ):
+            self.context = self._prepare()
+            results = {}
+            try:
+                for name in scenarios:
+                    results[name] = self._run(name, options['requests'], options['warmup'], max(1, options['concurrency']))
+                    r = results[name]
+                    self.stderr.write(
+                        f"{name:<20} {r['throughput_rps']:8.1f} req/s  p50 {r['p50_ms']:7.1f} ms  "
+                        f"p95 {r['p95_ms']:7.1f} ms  p99 {r['p99_ms']:7.1f} ms  errors {r['errors']}"
+                    )
+            finally:
+                self._cleanup()
+
+        report = {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'scenarios': results,
+        }
+
+        regressions = []
+        if options['compare']:
+            with open(options['compare']) as fh:
+                baseline = json.load(fh)
+            regressions = self._compare(baseline.get('scenarios', {}), results, options['threshold'])
+            report['regressions'] = regressions
+
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(payload)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(self.style.ERROR(regression['message']))
+            raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}')
+
+    def _prepare(self):
+        admin = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}', role=User.Role.ADMIN).order_by('email').first()
+        client_user = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}', role=User.Role.CLIENT).order_by('email').first()
+        if admin is None or client_user is None:
+            raise CommandError('The load-test dataset needs at least one admin and one client user.')
+
+        company = Company.objects.get(id=admin.company_id)
+        properties = list(
+            Property.objects.filter(company_id=company.id, deleted_at__isnull=True).values_list('id', flat=True)[:5000]
+        )
+        if not properties:
+            raise CommandError(f'Company {company.name} has no properties to benchmark against.')
+
+        return {
+            'admin_token': self._login(admin.email),
+            'client_token': self._login(client_user.email),
+            'client_email': client_user.email,
+            'company_id': str(company.id),
+            'property_ids': [str(pid) for pid in properties],
+            'deleted_ids': [],
+        }
+
+    def _login(self, email):
+        response = Client().post('/api/auth/token/', {'email': email, 'password': self.password}, content_type='application/json')
+        if response.status_code != 200:
+            raise CommandError(f'Login failed for {email} ({response.status_code}); check --password.')
+        return response.json()['access']
+
+    def _cleanup(self):
+        deleted = self.context.get('deleted_ids') if hasattr(self, 'context') else None
+        if deleted:
+            Property.objects.filter(id__in=deleted).update(deleted_at=None)
+        Application.objects.filter(applicant_email__startswith='bench', applicant_email__endswith=f'@{EMAIL_DOMAIN}').delete()
+
+    def _request(self, name, client, n):
+        ctx = self.context
+        admin_auth = {'HTTP_AUTHORIZATION': f"Bearer {ctx['admin_token']}"}
+        client_auth = {'HTTP_AUTHORIZATION': f"Bearer {ctx['client_token']}"}
+        property_ids = ctx['property_ids']
+
+        if name == 'login':
+            return client.post(
+                '/api/auth/token/',
+                {'email': ctx['client_email'], 'password': self.password},
+                content_type='application/json',
+            )
+        if name == 'me':
+            return client.get('/api/auth/me/', **client_auth)
+        if name == 'public_companies':
+            return client.get('/api/public/companies/')
+        if name == 'public_properties':
+            return client.get('/api/public/properties/', {'companyId': ctx['company_id']})
+        if name == 'tenant_properties':
+            return client.get('/api/properties/', **admin_auth)
+        if name == 'tenant_applications':
+            return client.get('/api/applications/', **admin_auth)
+        if name == 'application_create':
+            return client.post(
+                '/api/public/applications/',
+                {
+                    'companyId': ctx['company_id'],
+                    'propertyId': property_ids[n % len(property_ids)],
+                    'applicantName': f'Bench Applicant {n}',
+                    'applicantEmail': f'bench{n}@{EMAIL_DOMAIN}',
+                    'offerAmount': '1000.00',
+                    'idDocument': SimpleUploadedFile('id.pdf', PDF_BYTES, content_type='application/pdf'),
+                    'proofOfFunds': SimpleUploadedFile('funds.pdf', PDF_BYTES, content_type='application/pdf'),
+                },
+                **client_auth,
+            )
+        if name == 'soft_delete':
+            property_id = property_ids[n % len(property_ids)]
+            ctx['deleted_ids'].append(property_id)
+            return client.delete(f'/api/properties/{property_id}/', **admin_auth)
+        raise CommandError(f'Unknown scenario {name}')
+
+    def _run(self, name, requests, warmup, concurrency):
+        client = Client()
+        for n in range(warmup):
+            self._request(name, client, n)
+
+        latencies = []
+        errors = 0
+
+        def worker(indices):
+            worker_client = Client()
+            timings = []
+            failed = 0
+            for n in indices:
+                started = time.perf_counter()
+                response = self._request(name, worker_client, warmup + n)
+                timings.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    failed += 1
+            return timings, failed
+
+        chunks = [range(i, requests, concurrency) for i in range(concurrency)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for timings, failed in pool.map(worker, chunks):
+                latencies.extend(timings)
+                errors += failed
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'seconds': elapsed,
+            'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+            'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+        }
+
+    def _compare(self, baseline, results, threshold):
+        regressions = []
+        for name, current in results.items():
+            previous = baseline.get(name)
+            if not previous:
+                continue
+            if previous.get('p95_ms') and current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+                regressions.append({
+                    'scenario': name,
+                    'metric': 'p95_ms',
+                    'baseline': previous['p95_ms'],
+                    'current': current['p95_ms'],
+                    'message': f"{name}: p95 {previous['p95_ms']:.1f} ms -> {current['p95_ms']:.1f} ms",
+                })
+            if previous.get('throughput_rps') and current['throughput_rps'] < previous['throughput_rps'] * (1 - threshold):
+                regressions.append({
+                    'scenario': name,
+                    'metric': 'throughput_rps',
+                    'baseline': previous['throughput_rps'],
+                    'current': current['throughput_rps'],
+                    'message': (
+                        f"{name}: throughput {previous['throughput_rps']:.1f} -> {current['throughput_rps']:.1f} req/s"
+                    ),
+                })
+        return regressions
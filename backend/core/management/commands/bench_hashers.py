@@ -0,0 +1,96 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from core.hashers import TunedArgon2PasswordHasher, TunedPBKDF2PasswordHasher
+
+PASSWORD = 'correct horse battery staple'
+
+
+class Command(BaseCommand):
+    help = 'Measure password hash cost and login (verify) throughput for candidate hasher parameters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pbkdf2',
+            default='260000,600000,870000',
+            help='Comma-separated PBKDF2 iteration counts to try (empty to skip).',
+        )
+        parser.add_argument(
+            '--argon2',
+            default='2:19456:1,2:65536:2,3:65536:4',
+            help='Comma-separated time_cost:memory_cost_kib:parallelism triples to try (empty to skip).',
+        )
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent verifiers for the throughput run.')
+        parser.add_argument('--seconds', type=float, default=3.0, help='Duration of each throughput run.')
+        parser.add_argument('--json', dest='json_path', default='', help='Also write results to this JSON file.')
+
+    def handle(self, *args, **options):
+        candidates = []
+        for value in filter(None, (v.strip() for v in options['pbkdf2'].split(','))):
+            candidates.append(('pbkdf2', {'PASSWORD_PBKDF2_ITERATIONS': int(value)}, f'iterations={value}'))
+        for value in filter(None, (v.strip() for v in options['argon2'].split(','))):
+            try:
+                time_cost, memory_cost, parallelism = (int(p) for p in value.split(':'))
+            except ValueError:
+                raise CommandError(f'Invalid --argon2 triple: {value}')
+            candidates.append((
+                'argon2',
+                {
+                    'PASSWORD_ARGON2_TIME_COST': time_cost,
+                    'PASSWORD_ARGON2_MEMORY_COST': memory_cost,
+                    'PASSWORD_ARGON2_PARALLELISM': parallelism,
+                },
+                f't={time_cost} m={memory_cost}KiB p={parallelism}',
+            ))
+
+        results = []
+        for algorithm, overrides, label in candidates:
+            hasher_class = TunedPBKDF2PasswordHasher if algorithm == 'pbkdf2' else TunedArgon2PasswordHasher
+            # Measure raw hashing cost, without the request-path thread pool.
+            with override_settings(PASSWORD_HASHING_OFFLOAD=False, **overrides):
+                hasher = hasher_class()
+                try:
+                    encoded = hasher.encode(PASSWORD, hasher.salt())
+                except ValueError as exc:
+                    self.stderr.write(self.style.WARNING(f'{algorithm} {label}: skipped ({exc})'))
+                    continue
+                started = time.perf_counter()
+                hasher.verify(PASSWORD, encoded)
+                single_ms = (time.perf_counter() - started) * 1000
+                throughput = self._throughput(hasher, encoded, options['threads'], options['seconds'])
+
+            results.append({
+                'algorithm': algorithm,
+                'params': overrides,
+                'verify_ms': single_ms,
+                'logins_per_second': throughput,
+                'threads': options['threads'],
+            })
+            self.stdout.write(
+                f'{algorithm:<7} {label:<28} verify {single_ms:8.1f} ms  '
+                f'{throughput:8.1f} logins/s with {options["threads"]} threads'
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
+
+    def _throughput(self, hasher, encoded, threads, seconds):
+        deadline = time.perf_counter() + seconds
+
+        def worker():
+            count = 0
+            while time.perf_counter() < deadline:
+                hasher.verify(PASSWORD, encoded)
+                count += 1
+            return count
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            total = sum(f.result() for f in [pool.submit(worker) for _ in range(threads)])
+        return total / (time.perf_counter() - started)
@@ -0,0 +1,117 @@
+import datetime
+import json
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from core.models import Application, Company, CompanyMembership, Property, User
+from core.serializers import ApplicationSerializer, CompanySerializer, PropertySerializer, UserSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark serializer cost per row using in-memory instances (no database rows are written).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per serializer; the fastest run is reported.')
+        parser.add_argument('--json', dest='json_path', default='', help='Also write results to this JSON file.')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = max(1, options['repeat'])
+
+        host = next((h for h in settings.ALLOWED_HOSTS if h and not h.startswith('.') and h != '*'), 'localhost')
+        request = RequestFactory().get('/api/', HTTP_HOST=host)
+        context = {'request': request}
+
+        company = Company(name='Bench Co', status=Company.Status.ACTIVE, registered_date=datetime.date(2026, 1, 1))
+        cases = [
+            ('company', CompanySerializer, self._companies(rows)),
+            ('user', UserSerializer, self._users(rows, company)),
+            ('property', PropertySerializer, self._properties(rows, company)),
+            ('application', ApplicationSerializer, self._applications(rows, company)),
+        ]
+
+        results = []
+        for name, serializer_class, instances in cases:
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                serializer_class(instances, many=True, context=dict(context)).data
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            per_row_us = best / rows * 1_000_000
+            results.append({'serializer': serializer_class.__name__, 'rows': rows, 'seconds': best, 'per_row_us': per_row_us})
+            self.stdout.write(f'{name:<12} {rows} rows  {best * 1000:9.1f} ms  {per_row_us:8.2f} us/row')
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump({'rows': rows, 'repeat': repeat, 'results': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
+
+    def _companies(self, rows):
+        return [
+            Company(
+                name=f'Company {i}',
+                description='Land developer',
+                status=Company.Status.ACTIVE,
+                registered_date=datetime.date(2026, 1, 1),
+                contact_email=f'info{i}@bench.test',
+            )
+            for i in range(rows)
+        ]
+
+    def _users(self, rows, company):
+        users = []
+        for i in range(rows):
+            user = User(
+                email=f'client{i}@bench.test',
+                name=f'Client {i}',
+                role=User.Role.CLIENT,
+                company=company,
+                registered_date=datetime.date(2026, 1, 1),
+            )
+            # Mirror prefetch_related('company_memberships') so no queries are issued.
+            memberships = CompanyMembership.objects.all()
+            memberships._result_cache = [CompanyMembership(user=user, company=company)]
+            memberships._prefetch_done = True
+            user._prefetched_objects_cache = {'company_memberships': memberships}
+            users.append(user)
+        return users
+
+    def _properties(self, rows, company):
+        return [
+            Property(
+                company=company,
+                title=f'Plot {i}',
+                description='Serviced residential plot',
+                location='Kampala',
+                plot_number=str(i),
+                price=Decimal('25000.00'),
+                size=Decimal('450.00'),
+                image=f'properties/plot{i}.jpg',
+                layout_image='properties/layouts/kampala.pdf',
+                features=['water', 'electricity', 'fenced'],
+            )
+            for i in range(rows)
+        ]
+
+    def _applications(self, rows, company):
+        prop = Property(company=company, title='Plot', location='Kampala')
+        return [
+            Application(
+                company=company,
+                property=prop,
+                applicant_name=f'Applicant {i}',
+                applicant_email=f'applicant{i}@bench.test',
+                offer_amount=Decimal('24000.00'),
+                date_applied=datetime.date(2026, 1, 1),
+                id_document=f'applications/id_documents/id{i}.pdf',
+                proof_of_funds=f'applications/proof_of_funds/pof{i}.pdf',
+                documents={'idDocumentName': f'id{i}.pdf'},
+            )
+            for i in range(rows)
+        ]
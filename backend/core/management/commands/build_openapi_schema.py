@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the OpenAPI schema (YAML and JSON) served at /api/schema/ for the current code version. '
+        'Does nothing when the files for this version already exist; run at build or deploy time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate even if the files already exist.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = schema.build(force=options['force'])
+        if not written:
+            self.stdout.write(f'Schema for version {schema.code_version()} is up to date.')
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Wrote schema version {schema.code_version()} ({len(written)} files) in {time.monotonic() - started:.1f}s.'
+            )
+        )
@@ -0,0 +1,34 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the monthly core_application partitions (PostgreSQL) from this month, or --from, through '
+        '--months-ahead months from now. Safe to run repeatedly; existing partitions are left alone.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=settings.APPLICATION_PARTITION_MONTHS_AHEAD)
+        parser.add_argument('--from', dest='start', default='', help='First month to cover (YYYY-MM).')
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            self.stdout.write('core_application is not partitioned on this database; nothing to do.')
+            return
+
+        start = None
+        if options['start']:
+            try:
+                start = datetime.datetime.strptime(options['start'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--from must look like YYYY-MM')
+
+        created = partitions.ensure_partitions(max(0, options['months_ahead']), start=start)
+        for name in created:
+            self.stdout.write(f'Created {name}')
+        self.stdout.write(self.style.SUCCESS(f'{len(created)} partition(s) created.'))
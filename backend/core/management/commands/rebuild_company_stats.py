@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from core import stats
+from core.models import Company, CompanyStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the per-company dashboard summary rows from the property and application tables. '
+        'Use after bulk imports or raw SQL writes, or with --check to report drift without fixing it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', action='append', default=[], help='Company id to rebuild (repeatable; default all).')
+        parser.add_argument('--check', action='store_true', help='Only report companies whose stored row has drifted.')
+
+    def handle(self, *args, **options):
+        company_ids = options['company'] or None
+        if company_ids and Company.objects.filter(id__in=company_ids).count() != len(set(company_ids)):
+            raise CommandError('Unknown company id in --company.')
+
+        before = {row.company_id: self._values(row) for row in self._rows(company_ids)}
+        if options['check']:
+            # Rebuild inside a rolled-back transaction so the stored rows stay untouched.
+            with transaction.atomic():
+                stats.rebuild(company_ids)
+                after = {row.company_id: self._values(row) for row in self._rows(company_ids)}
+                transaction.set_rollback(True)
+        else:
+            count = stats.rebuild(company_ids)
+            after = {row.company_id: self._values(row) for row in self._rows(company_ids)}
+
+        drifted = [company_id for company_id, values in after.items() if before.get(company_id) != values]
+        for company_id in drifted:
+            self.stdout.write(f'{company_id}: {before.get(company_id)} -> {after[company_id]}')
+
+        if options['check']:
+            self.stdout.write(self.style.SUCCESS(f'{len(drifted)} of {len(after)} companies drifted.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} summary rows ({len(drifted)} had drifted).'))
+
+    def _rows(self, company_ids):
+        rows = CompanyStats.objects.all()
+        if company_ids:
+            rows = rows.filter(company_id__in=company_ids)
+        return rows
+
+    def _values(self, row):
+        values = model_to_dict(row, exclude=['company', 'updated_at'])
+        return {name: str(value) for name, value in values.items()}
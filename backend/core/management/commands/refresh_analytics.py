@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from core import analytics
+
+
+class Command(BaseCommand):
+    help = (
+        'Refresh the SuperAdmin analytics materialized views (CONCURRENTLY, so API reads are not blocked). '
+        'Run from cron, or with --interval to keep refreshing on a schedule.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            nargs='?',
+            const=settings.ANALYTICS_REFRESH_INTERVAL,
+            default=0,
+            help='Keep refreshing every N seconds (bare --interval uses DJANGO_ANALYTICS_REFRESH_INTERVAL).',
+        )
+        parser.add_argument('--blocking', action='store_true', help='Use a plain (locking) refresh instead of CONCURRENTLY.')
+
+    def handle(self, *args, **options):
+        if not analytics.is_materialized():
+            self.stdout.write('Analytics are plain views on this database; nothing to refresh.')
+            return
+
+        while True:
+            try:
+                timings = analytics.refresh(concurrently=not options['blocking'])
+            except DatabaseError as exc:
+                # Keep a scheduled loop alive across transient failures (e.g. migrations still running).
+                if not options['interval']:
+                    raise
+                self.stderr.write(self.style.ERROR(f'Refresh failed: {exc}'))
+            else:
+                summary = ', '.join(f'{name} {ms:.0f} ms' for name, ms in timings.items())
+                self.stdout.write(self.style.SUCCESS(f'Refreshed {summary}'))
+
+            if not options['interval']:
+                return
+            close_old_connections()
+            time.sleep(options['interval'])
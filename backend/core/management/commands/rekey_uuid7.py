@@ -0,0 +1,96 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from core.ids import uuid7, uuid7_for, uuid7_time_ms
+from core.models import (
+    Application,
+    ArchivedApplication,
+    ArchivedProperty,
+    Company,
+    CompanyMembership,
+    Property,
+    User,
+)
+
+# Creation timestamp used to place each legacy row on the UUIDv7 timeline. Property has none,
+# so its legacy rows go just before the oldest time-ordered property.
+TIMESTAMP_FIELDS = {
+    Company: 'registered_date',
+    User: 'date_joined',
+    CompanyMembership: 'created_at',
+    Property: None,
+    Application: 'date_applied',
+}
+# Archive tables keep plain UUID copies of ids rather than foreign keys.
+PLAIN_REFERENCES = {
+    Company: ((ArchivedProperty, 'company_id'), (ArchivedApplication, 'company_id')),
+    Property: ((ArchivedApplication, 'property_id'),),
+}
+
+
+def _references(model):
+    for related in apps.get_models(include_auto_created=True):
+        if not related._meta.managed:
+            continue
+        for field in related._meta.concrete_fields:
+            if field.is_relation and field.remote_field.model is model:
+                yield related, field.attname
+    yield from PLAIN_REFERENCES.get(model, ())
+
+
+def _case(column, mapping):
+    return models.Case(
+        *[models.When(**{column: old}, then=models.Value(new, output_field=models.UUIDField())) for old, new in mapping],
+        output_field=models.UUIDField(),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Rewrite legacy (UUIDv4) primary keys as time-ordered UUIDv7 ids derived from each row\'s creation time, '
+        'updating every foreign key and archive reference in one transaction. Run in a maintenance window: '
+        'existing JWTs and sessions carry old user ids and stop working, and bookmarked URLs change.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Ids rewritten per UPDATE statement.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be rekeyed.')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        started = time.monotonic()
+        total = 0
+        with transaction.atomic():
+            for model, timestamp_field in TIMESTAMP_FIELDS.items():
+                mapping = self._mapping(model, timestamp_field)
+                total += len(mapping)
+                self.stdout.write(f'{model.__name__}: {len(mapping)} legacy ids')
+                if options['dry_run'] or not mapping:
+                    continue
+                for start in range(0, len(mapping), batch_size):
+                    batch = mapping[start:start + batch_size]
+                    olds = [old for old, _ in batch]
+                    # Foreign keys are deferrable, so parent and child rows can change in any order
+                    # as long as everything lands in this transaction.
+                    model._base_manager.filter(pk__in=olds).update(id=_case('pk', batch))
+                    for related, column in _references(model):
+                        related._base_manager.filter(**{f'{column}__in': olds}).update(**{column: _case(column, batch)})
+
+        verb = 'would be rekeyed' if options['dry_run'] else 'rekeyed'
+        self.stdout.write(self.style.SUCCESS(f'{total} rows {verb} in {time.monotonic() - started:.1f}s.'))
+
+    def _mapping(self, model, timestamp_field):
+        fields = ('id', timestamp_field) if timestamp_field else ('id',)
+        rows = [row for row in model._base_manager.values_list(*fields) if row[0].version != 7]
+        if timestamp_field:
+            return [(row[0], uuid7_for(row[1])) for row in rows]
+
+        oldest = min(
+            (uuid7_time_ms(pk) for pk in model._base_manager.values_list('id', flat=True) if pk.version == 7),
+            default=None,
+        )
+        legacy_ms = (oldest if oldest is not None else int(time.time() * 1000)) - 1
+        return [(row[0], uuid7(legacy_ms)) for row in rows]
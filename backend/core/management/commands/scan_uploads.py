@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from core import uploads
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the deep checks (full image decode, PDF page count) on application documents waiting for a scan. '
+        'Failing files are deleted and the application is marked Rejected. Run from cron, or with --interval '
+        'as a long-running worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            nargs='?',
+            const=settings.UPLOAD_SCAN_INTERVAL,
+            default=0,
+            help='Keep polling every N seconds (bare --interval uses DJANGO_UPLOAD_SCAN_INTERVAL).',
+        )
+        parser.add_argument('--batch-size', type=int, default=50, help='Applications claimed per batch.')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        while True:
+            clean = rejected = 0
+            try:
+                while True:
+                    counts = uploads.scan_pending(batch_size)
+                    clean += counts['Clean']
+                    rejected += counts['Rejected']
+                    if counts['claimed'] < batch_size:
+                        break
+            except DatabaseError as exc:
+                if not options['interval']:
+                    raise
+                self.stderr.write(self.style.ERROR(f'Scan failed: {exc}'))
+            if clean or rejected or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f'Scanned {clean + rejected} applications: {clean} clean, {rejected} rejected.'))
+
+            if not options['interval']:
+                return
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,265 @@
+import datetime
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import stats
+from core.ids import uuid7
+from core.models import Application, Company, CompanyMembership, Property, User
+
+EMAIL_DOMAIN = 'loadtest.suwokono.test'
+COMPANY_PREFIX = 'Loadtest'
+
+TOWNS = [
+    'Kampala', 'Entebbe', 'Mukono', 'Wakiso', 'Jinja', 'Mbarara', 'Gulu', 'Masaka', 'Mbale', 'Fort Portal',
+    'Nairobi', 'Kiambu', 'Machakos', 'Nakuru', 'Kisumu', 'Mombasa', 'Eldoret', 'Thika', 'Kigali', 'Arusha',
+]
+ESTATES = [
+    'Hillside Estate', 'Lakeview Gardens', 'Green Acres', 'Sunrise Park', 'Palm Grove', 'Riverside',
+    'Cedar Heights', 'Valley View', 'Kingsway', 'Golden Fields', 'Acacia Ridge', 'Savannah Court',
+]
+FEATURES = ['water', 'electricity', 'fenced', 'tarmac road', 'title deed', 'sewer', 'street lights', 'security']
+PLANS = [('Starter', 10), ('Growth', 500), ('Business', 5000), ('Enterprise', 100000)]
+FIRST_NAMES = ['Amina', 'Brian', 'Grace', 'David', 'Esther', 'Joseph', 'Sarah', 'Peter', 'Ruth', 'Moses', 'Faith', 'Ivan']
+LAST_NAMES = ['Okello', 'Namutebi', 'Mugisha', 'Achieng', 'Kamau', 'Wanjiru', 'Otieno', 'Nakato', 'Ssempala', 'Mutua']
+FINANCING = ['Cash', 'Mortgage', 'Installments', 'SACCO loan']
+USES = ['Family home', 'Rental units', 'Farming', 'Retail', 'Warehouse', 'Investment']
+
+PROPERTY_TYPES = ([Property.Type.RESIDENTIAL] * 6) + ([Property.Type.COMMERCIAL] * 2) + ([Property.Type.AGRICULTURAL] * 2)
+PROPERTY_STATUSES = ([Property.Status.AVAILABLE] * 7) + ([Property.Status.RESERVED] * 2) + [Property.Status.SOLD]
+APPLICATION_STATUSES = ([Application.Status.PENDING] * 6) + ([Application.Status.APPROVED] * 2) + ([Application.Status.REJECTED] * 2)
+
+
+class Command(BaseCommand):
+    help = 'Generate a reproducible synthetic dataset (companies, properties, applications, clients) for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10)
+        parser.add_argument('--properties-per-company', type=int, default=100)
+        parser.add_argument('--applications', type=int, default=1000)
+        parser.add_argument('--clients', type=int, default=500)
+        parser.add_argument('--max-memberships', type=int, default=3, help='Upper bound of companies each client joins.')
+        parser.add_argument('--locations-per-company', type=int, default=8, help='Distinct locations (shared layouts) per company.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--as-of',
+            type=datetime.date.fromisoformat,
+            default=None,
+            help='Anchor date (YYYY-MM-DD) for generated dates; defaults to today.',
+        )
+        parser.add_argument('--password', default='loadtest123')
+        parser.add_argument('--purge', action='store_true', help='Delete previously generated load-test data first.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = max(1, options['batch_size'])
+        started = time.monotonic()
+
+        if options['purge']:
+            self._purge()
+
+        # Hash once; every generated account shares the same password.
+        self.password_hash = make_password(options['password'])
+        self.today = options['as_of'] or datetime.date.today()
+
+        companies = self._create_companies(options['companies'])
+        self._create_admins(companies)
+        properties = self._create_properties(
+            companies, options['properties_per_company'], max(1, options['locations_per_company'])
+        )
+        clients = self._create_clients(companies, options['clients'], max(1, options['max_memberships']))
+        self._create_applications(properties, clients, options['applications'])
+        # bulk_create bypasses the signal handlers that keep the dashboard summary rows current.
+        stats.rebuild([company.id for company in companies])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'Seeded load-test data in {elapsed:.1f}s.'))
+        self.stdout.write(self.style.SUCCESS(f"Password for generated users: {options['password']}"))
+
+    def _uuid(self, day=None):
+        # Time-ordered like real rows (placed at `day`, default --as-of) yet reproducible from --seed.
+        moment = datetime.datetime.combine(day or self.today, datetime.time(), tzinfo=datetime.timezone.utc)
+        return uuid7(int(moment.timestamp() * 1000), rng=self.rng)
+
+    def _date_within(self, days):
+        return self.today - datetime.timedelta(days=self.rng.randrange(days))
+
+    def _bulk_create(self, model, objs, label):
+        total = 0
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                total += self._flush(model, batch)
+                batch = []
+        if batch:
+            total += self._flush(model, batch)
+        self.stdout.write(f'  {label}: {total}')
+        return total
+
+    def _flush(self, model, batch):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+        return len(batch)
+
+    def _purge(self):
+        users_deleted, _ = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        companies_deleted, _ = Company.objects.filter(name__startswith=f'{COMPANY_PREFIX} ').delete()
+        self.stdout.write(f'Purged previous load-test data ({users_deleted + companies_deleted} rows).')
+
+    def _create_companies(self, count):
+        companies = []
+        for i in range(count):
+            plan, max_plots = self.rng.choice(PLANS)
+            registered = self._date_within(1500)
+            companies.append(
+                Company(
+                    id=self._uuid(registered),
+                    name=f'{COMPANY_PREFIX} {self.rng.choice(ESTATES)} Developers {i:05d}',
+                    description='Synthetic company generated for load testing.',
+                    logo='🏢',
+                    primary_color=f'#{self.rng.randrange(0x1000000):06X}',
+                    status=Company.Status.ACTIVE,
+                    registered_date=registered,
+                    subscription_plan=plan,
+                    max_plots=max_plots,
+                    contact_email=f'company{i}@{EMAIL_DOMAIN}',
+                    contact_phone=f'+2567{self.rng.randrange(10 ** 8):08d}',
+                    address=f'{self.rng.choice(ESTATES)}, {self.rng.choice(TOWNS)}',
+                )
+            )
+        self._bulk_create(Company, companies, 'companies')
+        return companies
+
+    def _create_admins(self, companies):
+        admins = [
+            User(
+                id=self._uuid(),
+                email=f'admin{i}@{EMAIL_DOMAIN}',
+                name=f'Admin {company.name}',
+                role=User.Role.ADMIN,
+                status=User.Status.ACTIVE,
+                company_id=company.id,
+                is_staff=True,
+                password=self.password_hash,
+            )
+            for i, company in enumerate(companies)
+        ]
+        self._bulk_create(User, admins, 'admins')
+        memberships = (
+            CompanyMembership(id=self._uuid(), user_id=admin.id, company_id=admin.company_id) for admin in admins
+        )
+        self._bulk_create(CompanyMembership, memberships, 'admin memberships')
+
+    def _create_properties(self, companies, per_company, locations_per_company):
+        # (property_id, company_id, price) rows kept for generating applications.
+        created = []
+
+        def generate():
+            for company in companies:
+                towns = self.rng.sample(TOWNS, k=min(len(TOWNS), locations_per_company))
+                locations = [f'{self.rng.choice(ESTATES)}, {town}' for town in towns]
+                layouts = {location: f'properties/layouts/{company.id.hex[:8]}-{n}.pdf' for n, location in enumerate(locations)}
+                for n in range(per_company):
+                    location = self.rng.choice(locations)
+                    property_type = self.rng.choice(PROPERTY_TYPES)
+                    size = Decimal(self.rng.randrange(200, 5000))
+                    price = (size * Decimal(self.rng.randrange(20, 400))).quantize(Decimal('1.00'))
+                    prop = Property(
+                        id=self._uuid(),
+                        company_id=company.id,
+                        title=f'{property_type} plot {n + 1} - {location}',
+                        description='Synthetic plot generated for load testing.',
+                        location=location,
+                        plot_number=f'P{n + 1:06d}',
+                        room_number=None,
+                        price=price,
+                        size=size,
+                        status=self.rng.choice(PROPERTY_STATUSES),
+                        type=property_type,
+                        layout_image=layouts[location],
+                        features=self.rng.sample(FEATURES, k=self.rng.randrange(0, 5)),
+                    )
+                    created.append((prop.id, company.id, price))
+                    yield prop
+
+        self._bulk_create(Property, generate(), 'properties')
+        return created
+
+    def _create_clients(self, companies, count, max_memberships):
+        # (user_id, [company_ids]) rows kept for linking applications to members.
+        clients = []
+        memberships = []
+
+        def generate_users():
+            for i in range(count):
+                joined = self.rng.sample(companies, k=self.rng.randint(1, min(max_memberships, len(companies))))
+                registered = self._date_within(720)
+                user = User(
+                    id=self._uuid(registered),
+                    email=f'client{i}@{EMAIL_DOMAIN}',
+                    name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                    phone=f'+2547{self.rng.randrange(10 ** 8):08d}',
+                    role=User.Role.CLIENT,
+                    status=User.Status.ACTIVE,
+                    registered_date=registered,
+                    company_id=joined[0].id,
+                    password=self.password_hash,
+                )
+                clients.append((user.id, user.email, user.name, [c.id for c in joined]))
+                memberships.extend(
+                    CompanyMembership(id=self._uuid(), user_id=user.id, company_id=c.id) for c in joined
+                )
+                yield user
+
+        if not companies:
+            return clients
+        self._bulk_create(User, generate_users(), 'clients')
+        self._bulk_create(CompanyMembership, memberships, 'client memberships')
+        return clients
+
+    def _create_applications(self, properties, clients, count):
+        if not properties:
+            return
+
+        clients_by_company = {}
+        for client in clients:
+            for company_id in client[3]:
+                clients_by_company.setdefault(company_id, []).append(client)
+
+        def generate():
+            for i in range(count):
+                property_id, company_id, price = self.rng.choice(properties)
+                members = clients_by_company.get(company_id)
+                client = self.rng.choice(members) if members and self.rng.random() < 0.7 else None
+                if client:
+                    user_id, email, name = client[0], client[1], client[2]
+                else:
+                    user_id = None
+                    email = f'applicant{i}@{EMAIL_DOMAIN}'
+                    name = f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+                offer = (price * Decimal(self.rng.randrange(85, 106)) / 100).quantize(Decimal('1.00'))
+                applied = self._date_within(365)
+                yield Application(
+                    id=self._uuid(applied),
+                    company_id=company_id,
+                    property_id=property_id,
+                    user_id=user_id,
+                    applicant_name=name,
+                    applicant_email=email,
+                    applicant_phone=f'+2567{self.rng.randrange(10 ** 8):08d}',
+                    applicant_address=self.rng.choice(TOWNS),
+                    offer_amount=offer,
+                    financing_method=self.rng.choice(FINANCING),
+                    intended_use=self.rng.choice(USES),
+                    status=self.rng.choice(APPLICATION_STATUSES),
+                    date_applied=applied,
+                    documents={},
+                )
+
+        self._bulk_create(Application, generate(), 'applications')
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_property_deleted_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyStats',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.company')),
+                ('properties_available', models.IntegerField(default=0)),
+                ('properties_reserved', models.IntegerField(default=0)),
+                ('properties_sold', models.IntegerField(default=0)),
+                ('applications_pending', models.IntegerField(default=0)),
+                ('applications_approved', models.IntegerField(default=0)),
+                ('applications_rejected', models.IntegerField(default=0)),
+                ('offers_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('offers_approved', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
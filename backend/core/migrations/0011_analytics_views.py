@@ -0,0 +1,121 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# SuperAdmin analytics. On PostgreSQL these are materialized views with a unique index each, so
+# `REFRESH MATERIALIZED VIEW CONCURRENTLY` can run without blocking readers; other backends get
+# plain views over the same queries.
+VIEWS = {
+    'analytics_company_plots': (
+        'company_id',
+        """
+        SELECT c.id AS company_id, c.name, c.subscription_plan, c.max_plots, COUNT(p.id) AS plots
+        FROM core_company c
+        LEFT JOIN core_property p ON p.company_id = c.id AND p.deleted_at IS NULL
+        GROUP BY c.id, c.name, c.subscription_plan, c.max_plots
+        """,
+    ),
+    'analytics_application_conversion': (
+        'company_id',
+        """
+        SELECT
+            c.id AS company_id,
+            c.name,
+            COUNT(a.id) AS applications,
+            COALESCE(SUM(CASE WHEN a.status = 'Pending' THEN 1 ELSE 0 END), 0) AS pending,
+            COALESCE(SUM(CASE WHEN a.status = 'Approved' THEN 1 ELSE 0 END), 0) AS approved,
+            COALESCE(SUM(CASE WHEN a.status = 'Rejected' THEN 1 ELSE 0 END), 0) AS rejected
+        FROM core_company c
+        LEFT JOIN core_application a ON a.company_id = c.id
+        GROUP BY c.id, c.name
+        """,
+    ),
+    'analytics_plan_revenue': (
+        'subscription_plan',
+        """
+        SELECT
+            c.subscription_plan,
+            COUNT(c.id) AS companies,
+            COALESCE(SUM(a.approved), 0) AS approved_applications,
+            COALESCE(SUM(a.offers), 0) AS approved_offers
+        FROM core_company c
+        LEFT JOIN (
+            SELECT company_id, COUNT(*) AS approved, SUM(offer_amount) AS offers
+            FROM core_application
+            WHERE status = 'Approved'
+            GROUP BY company_id
+        ) a ON a.company_id = c.id
+        GROUP BY c.subscription_plan
+        """,
+    ),
+}
+
+
+def create_views(apps, schema_editor):
+    postgres = schema_editor.connection.vendor == 'postgresql'
+    for name, (unique_column, query) in VIEWS.items():
+        if postgres:
+            schema_editor.execute(f'CREATE MATERIALIZED VIEW {name} AS {query} WITH DATA')
+            schema_editor.execute(f'CREATE UNIQUE INDEX {name}_uniq ON {name} ({unique_column})')
+        else:
+            schema_editor.execute(f'CREATE VIEW {name} AS {query}')
+
+
+def drop_views(apps, schema_editor):
+    kind = 'MATERIALIZED VIEW' if schema_editor.connection.vendor == 'postgresql' else 'VIEW'
+    for name in VIEWS:
+        schema_editor.execute(f'DROP {kind} IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_companystats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_views, drop_views),
+        migrations.CreateModel(
+            name='CompanyApplicationConversion',
+            fields=[
+                ('company', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='core.company')),
+                ('name', models.CharField(max_length=255)),
+                ('applications', models.IntegerField()),
+                ('pending', models.IntegerField()),
+                ('approved', models.IntegerField()),
+                ('rejected', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'analytics_application_conversion',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CompanyPlotUsage',
+            fields=[
+                ('company', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='core.company')),
+                ('name', models.CharField(max_length=255)),
+                ('subscription_plan', models.CharField(max_length=64)),
+                ('max_plots', models.PositiveIntegerField()),
+                ('plots', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'analytics_company_plots',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PlanRevenue',
+            fields=[
+                ('subscription_plan', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('companies', models.IntegerField()),
+                ('approved_applications', models.IntegerField()),
+                ('approved_offers', models.DecimalField(decimal_places=2, max_digits=18)),
+            ],
+            options={
+                'db_table': 'analytics_plan_revenue',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:47
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_analytics_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedApplication',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('company_id', models.UUIDField(db_index=True)),
+                ('property_id', models.UUIDField(db_index=True)),
+                ('applicant_email', models.EmailField(max_length=254)),
+                ('status', models.CharField(max_length=16)),
+                ('date_applied', models.DateField()),
+                ('archived_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedProperty',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('company_id', models.UUIDField(db_index=True)),
+                ('title', models.CharField(max_length=255)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:49
+
+import datetime
+import importlib
+
+import core.ids
+from django.conf import settings
+from django.db import migrations, models
+
+from core import partitions
+
+# The analytics views read core_application, so they are dropped around the table changes
+# (SQLite rebuilds the table for AlterField, PostgreSQL swaps it for the partitioned one).
+analytics_views = importlib.import_module('core.migrations.0011_analytics_views')
+
+TABLE = partitions.TABLE
+PARTITIONED = f'{TABLE}_partitioned'
+UNPARTITIONED = f'{TABLE}_unpartitioned'
+FOREIGN_KEYS = (
+    ('company_id', 'core_company'),
+    ('property_id', 'core_property'),
+    ('user_id', 'core_user'),
+)
+
+
+def _add_foreign_keys_and_indexes(execute, table, prefix):
+    for column, target in FOREIGN_KEYS:
+        execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {prefix}_{column}_fk FOREIGN KEY ({column}) '
+            f'REFERENCES {target} (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+    execute(f'CREATE INDEX {prefix}_company_id_idx ON {table} (company_id, id)')
+    execute(f'CREATE INDEX {prefix}_property_id_idx ON {table} (property_id)')
+    execute(f'CREATE INDEX {prefix}_user_id_idx ON {table} (user_id)')
+
+
+def partition_applications(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    execute = schema_editor.execute
+
+    execute(
+        f'CREATE TABLE {PARTITIONED} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        'PARTITION BY RANGE (date_applied)'
+    )
+    # A partitioned table's primary key must include the partition column.
+    execute(f'ALTER TABLE {PARTITIONED} ADD CONSTRAINT {TABLE}_part_pkey PRIMARY KEY (id, date_applied)')
+    _add_foreign_keys_and_indexes(execute, PARTITIONED, f'{TABLE}_part')
+    execute(f'CREATE TABLE {partitions.DEFAULT_PARTITION} PARTITION OF {PARTITIONED} DEFAULT')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(date_applied) FROM {TABLE}')
+        first = cursor.fetchone()[0] or datetime.date.today()
+        last = partitions.month_floor(datetime.date.today())
+        for _ in range(getattr(settings, 'APPLICATION_PARTITION_MONTHS_AHEAD', 3)):
+            last = partitions.next_month(last)
+        for month in partitions.months_between(first, last):
+            partitions.create_month_partition(cursor, month, parent=PARTITIONED)
+
+    execute(f'INSERT INTO {PARTITIONED} SELECT * FROM {TABLE}')
+    execute(f'DROP TABLE {TABLE}')
+    execute(f'ALTER TABLE {PARTITIONED} RENAME TO {TABLE}')
+
+
+def unpartition_applications(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    execute = schema_editor.execute
+
+    execute(f'CREATE TABLE {UNPARTITIONED} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    execute(f'INSERT INTO {UNPARTITIONED} SELECT * FROM {TABLE}')
+    execute(f'DROP TABLE {TABLE} CASCADE')
+    execute(f'ALTER TABLE {UNPARTITIONED} RENAME TO {TABLE}')
+    execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)')
+    _add_foreign_keys_and_indexes(execute, TABLE, TABLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_archive_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(analytics_views.drop_views, analytics_views.create_views),
+        migrations.AlterField(
+            model_name='application',
+            name='id',
+            field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(partition_applications, unpartition_applications),
+        migrations.RunPython(analytics_views.create_views, analytics_views.drop_views),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:51
+
+import importlib
+
+import core.ids
+from django.db import migrations, models
+
+# Only the Python-side default changes; existing rows keep their ids (see `rekey_uuid7`).
+# The analytics views are dropped around the AlterFields because SQLite rebuilds the tables.
+analytics_views = importlib.import_module('core.migrations.0011_analytics_views')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_partition_applications'),
+    ]
+
+    operations = [
+        migrations.RunPython(analytics_views.drop_views, analytics_views.create_views),
+        migrations.AlterField(
+            model_name='company',
+            name='id',
+            field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='companymembership',
+            name='id',
+            field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='id',
+            field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(analytics_views.create_views, analytics_views.drop_views),
+    ]
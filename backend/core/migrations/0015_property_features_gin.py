@@ -0,0 +1,31 @@
+from django.db import migrations
+
+INDEX = 'core_property_features_gin'
+
+
+def create_index(apps, schema_editor):
+    # jsonb_path_ops indexes only support @> containment, which is all the features filter needs,
+    # and are smaller and faster than the default jsonb_ops. CONCURRENTLY avoids blocking writes.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX} ON core_property USING gin (features jsonb_path_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0014_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:00
+
+import importlib
+
+from django.db import migrations, models
+
+# SQLite rebuilds core_application for a NOT NULL column, so the analytics views are dropped around it.
+analytics_views = importlib.import_module('core.migrations.0011_analytics_views')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_property_coordinates'),
+    ]
+
+    operations = [
+        migrations.RunPython(analytics_views.drop_views, analytics_views.create_views),
+        migrations.AddField(
+            model_name='application',
+            name='scan_status',
+            field=models.CharField(blank=True, choices=[('', 'Not scanned'), ('Pending', 'Pending'), ('Clean', 'Clean'), ('Rejected', 'Rejected')], default='', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('scan_status', 'Pending')), fields=['id'], name='core_app_scan_pending_idx'),
+        ),
+        migrations.RunPython(analytics_views.create_views, analytics_views.drop_views),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:13
+
+import importlib
+
+from django.db import migrations, models
+
+# SQLite rebuilds core_application for a NOT NULL column, so the analytics views are dropped around it.
+analytics_views = importlib.import_module('core.migrations.0011_analytics_views')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_events'),
+    ]
+
+    operations = [
+        migrations.RunPython(analytics_views.drop_views, analytics_views.create_views),
+        migrations.AddField(
+            model_name='application',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(condition=models.Q(('fingerprint', ''), _negated=True), fields=('fingerprint', 'date_applied'), name='core_app_fingerprint_day_uniq'),
+        ),
+        migrations.RunPython(analytics_views.create_views, analytics_views.drop_views),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_analytics_refresh'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='application',
+            name='core_app_scan_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='scan_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='scan_status',
+            field=models.CharField(blank=True, choices=[('', 'Not scanned'), ('Pending', 'Pending'), ('Scanning', 'Scanning'), ('Clean', 'Clean'), ('Rejected', 'Rejected')], default='', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('scan_status__in', ['Pending', 'Scanning'])), fields=['id'], name='core_app_scan_queue_idx'),
+        ),
+    ]
@@ -1,11 +1,15 @@
-import uuid
+from decimal import Decimal
 
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils import timezone
 
+from .ids import uuid7
+
 
 class Company(models.Model):
     class Status(models.TextChoices):
@@ -13,7 +17,7 @@ class Company(models.Model):
         PENDING = 'Pending'
         INACTIVE = 'Inactive'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -70,7 +74,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         ACTIVE = 'Active'
         INACTIVE = 'Inactive'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     email = models.EmailField(unique=True)
     name = models.CharField(max_length=255)
@@ -95,12 +99,26 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+class CompanyMembershipManager(models.Manager):
+    def bulk_add(self, pairs, batch_size: int = 1000):
+        # Idempotent upsert of (user_id, company_id) pairs: existing rows are left untouched.
+        memberships = [self.model(user_id=user_id, company_id=company_id) for user_id, company_id in pairs]
+        created = self.bulk_create(memberships, batch_size=batch_size, ignore_conflicts=True)
+        # bulk_create sends no post_save, so drop the cached membership sets here.
+        from .tenancy import invalidate_memberships
+
+        invalidate_memberships(membership.user_id for membership in memberships)
+        return created
+
+
 class CompanyMembership(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='company_memberships')
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='memberships')
     created_at = models.DateTimeField(default=timezone.now)
 
+    objects = CompanyMembershipManager()
+
     class Meta:
         unique_together = ('user', 'company')
 
@@ -119,7 +137,7 @@ class Property(models.Model):
         COMMERCIAL = 'Commercial'
         AGRICULTURAL = 'Agricultural'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='properties')
 
@@ -140,8 +158,21 @@ class Property(models.Model):
     layout_image = models.FileField(upload_to='properties/layouts/', blank=True, null=True)
     features = models.JSONField(default=list, blank=True)
 
+    # WGS84 degrees; the (latitude, longitude) index serves the bbox/near map filters in core.filters.
+    latitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True,
+        validators=[MinValueValidator(Decimal(-90)), MaxValueValidator(Decimal(90))],
+    )
+    longitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True,
+        validators=[MinValueValidator(Decimal(-180)), MaxValueValidator(Decimal(180))],
+    )
+
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['latitude', 'longitude'], name='core_property_coords_idx')]
+
     def __str__(self) -> str:
         return self.title
 
@@ -152,7 +183,16 @@ class Application(models.Model):
         APPROVED = 'Approved'
         REJECTED = 'Rejected'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    class ScanStatus(models.TextChoices):
+        NONE = '', 'Not scanned'
+        PENDING = 'Pending'
+        SCANNING = 'Scanning'
+        CLEAN = 'Clean'
+        REJECTED = 'Rejected'
+
+    # On PostgreSQL the table is partitioned by date_applied (see core.partitions) and the primary
+    # key there is (id, date_applied), so uniqueness of id rests on the uuid7 generator.
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='applications')
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='applications')
@@ -175,6 +215,145 @@ class Application(models.Model):
     proof_of_funds = models.FileField(upload_to='applications/proof_of_funds/', blank=True, null=True)
 
     documents = models.JSONField(default=dict, blank=True)
+    # Uploaded documents pass cheap checks in the request and are queued here for the deep checks
+    # run by `scan_uploads` (see core.uploads).
+    scan_status = models.CharField(max_length=16, choices=ScanStatus.choices, default=ScanStatus.NONE, blank=True)
+    # When a worker claimed the row (Scanning); claims older than UPLOAD_SCAN_CLAIM_SECONDS are retried.
+    scan_claimed_at = models.DateTimeField(null=True, blank=True)
+    # Normalized applicant email + property (core.duplicates); blank for rows created before it existed.
+    fingerprint = models.CharField(max_length=32, blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['id'], condition=models.Q(scan_status__in=['Pending', 'Scanning']), name='core_app_scan_queue_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fingerprint', 'date_applied'],
+                condition=~models.Q(fingerprint=''),
+                name='core_app_fingerprint_day_uniq',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.applicant_email} - {self.property_id}"
+
+
+class CompanyStats(models.Model):
+    # Summary row maintained incrementally by core.stats; `rebuild_company_stats` repairs drift.
+    company = models.OneToOneField(Company, primary_key=True, on_delete=models.CASCADE, related_name='stats')
+
+    properties_available = models.IntegerField(default=0)
+    properties_reserved = models.IntegerField(default=0)
+    properties_sold = models.IntegerField(default=0)
+
+    applications_pending = models.IntegerField(default=0)
+    applications_approved = models.IntegerField(default=0)
+    applications_rejected = models.IntegerField(default=0)
+
+    offers_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    offers_approved = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"stats for {self.company_id}"
+
+
+# Read-only models over the analytics views created in migration 0011 (materialized views on
+# PostgreSQL, plain views elsewhere). Refreshed by `refresh_analytics`.
+class CompanyPlotUsage(models.Model):
+    company = models.OneToOneField(
+        Company, primary_key=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    name = models.CharField(max_length=255)
+    subscription_plan = models.CharField(max_length=64)
+    max_plots = models.PositiveIntegerField()
+    plots = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_company_plots'
+
+
+class CompanyApplicationConversion(models.Model):
+    company = models.OneToOneField(
+        Company, primary_key=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    name = models.CharField(max_length=255)
+    applications = models.IntegerField()
+    pending = models.IntegerField()
+    approved = models.IntegerField()
+    rejected = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_application_conversion'
+
+
+class PlanRevenue(models.Model):
+    subscription_plan = models.CharField(max_length=64, primary_key=True)
+    companies = models.IntegerField()
+    approved_applications = models.IntegerField()
+    approved_offers = models.DecimalField(max_digits=18, decimal_places=2)
+
+    class Meta:
+        managed = False
+        db_table = 'analytics_plan_revenue'
+
+
+class AnalyticsRefresh(models.Model):
+    # Single row (id=1) recording when `refresh_analytics` last rebuilt the views. Kept in the
+    # database because the refresh runs in another container than the API.
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    refreshed_at = models.DateTimeField()
+
+
+class Event(models.Model):
+    # Change feed behind the SSE stream (core.events). The uuid7 id is the reconnect cursor; rows
+    # older than EVENTS_RETENTION_HOURS are pruned by `archive_and_purge`.
+    class Kind(models.TextChoices):
+        APPLICATION_CREATED = 'application.created'
+        APPLICATION_STATUS = 'application.status'
+        PROPERTY_STATUS = 'property.status'
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='+', db_index=False)
+    # Applicant the event concerns; clients only receive application events for themselves.
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['company', 'id'], name='core_event_company_id_idx')]
+
+
+# Archive tables written by core.archival. Rows keep the original id and a full snapshot of the
+# columns; company/property references are plain UUIDs so archives outlive the rows they point at.
+class ArchivedProperty(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    company_id = models.UUIDField(db_index=True)
+    title = models.CharField(max_length=255)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    def __str__(self) -> str:
+        return self.title
+
+
+class ArchivedApplication(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    company_id = models.UUIDField(db_index=True)
+    property_id = models.UUIDField(db_index=True)
+    applicant_email = models.EmailField()
+    status = models.CharField(max_length=16)
+    date_applied = models.DateField()
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
 
     def __str__(self) -> str:
         return f"{self.applicant_email} - {self.property_id}"
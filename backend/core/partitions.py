@@ -0,0 +1,84 @@
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+
+# core_application is range-partitioned by date_applied on PostgreSQL (migration 0013): one
+# partition per month plus a default partition that catches anything outside them.
+TABLE = 'core_application'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def month_floor(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def next_month(month: datetime.date) -> datetime.date:
+    return (month.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def months_between(first: datetime.date, last: datetime.date):
+    month = month_floor(first)
+    while month <= last:
+        yield month
+        month = next_month(month)
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s',
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def existing_partitions(cursor, parent=TABLE) -> set[str]:
+    cursor.execute(
+        'SELECT c.relname FROM pg_inherits i '
+        'JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent '
+        'WHERE p.relname = %s',
+        [parent],
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def create_month_partition(cursor, month: datetime.date, parent=TABLE) -> str:
+    name = partition_name(month)
+    start, end = f"'{month.isoformat()}'", f"'{next_month(month).isoformat()}'"
+    cursor.execute(f'CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    # Rows for this month that already landed in the default partition move over first;
+    # otherwise ATTACH would fail the default partition's constraint check.
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE date_applied >= {start} AND date_applied < {end} '
+        f'RETURNING *) INSERT INTO {name} SELECT * FROM moved'
+    )
+    cursor.execute(f'ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})')
+    return name
+
+
+def ensure_partitions(months_ahead: int | None = None, start: datetime.date | None = None) -> list[str]:
+    # Creates any missing monthly partitions from `start` (default: this month) through
+    # `months_ahead` months from now. Returns the names created.
+    if not is_partitioned():
+        return []
+    if months_ahead is None:
+        months_ahead = settings.APPLICATION_PARTITION_MONTHS_AHEAD
+    this_month = month_floor(datetime.date.today())
+    last = this_month
+    for _ in range(months_ahead):
+        last = next_month(last)
+
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        existing = existing_partitions(cursor)
+        for month in months_between(start or this_month, last):
+            if partition_name(month) not in existing:
+                created.append(create_month_partition(cursor, month))
+    return created
@@ -1,21 +1,20 @@
 from rest_framework.permissions import BasePermission
 
+from .tenancy import tenant_context
+
 
 class IsSuperAdmin(BasePermission):
     def has_permission(self, request, view):
-        user = getattr(request, 'user', None)
-        return bool(user and user.is_authenticated and getattr(user, 'role', None) == 'SuperAdmin')
+        tenant = tenant_context(request)
+        return tenant.is_authenticated and tenant.is_superadmin
 
 
 class IsAuthenticatedUser(BasePermission):
     def has_permission(self, request, view):
-        user = getattr(request, 'user', None)
-        return bool(user and user.is_authenticated)
+        return tenant_context(request).is_authenticated
 
 
 class IsAdminOrSuperAdmin(BasePermission):
     def has_permission(self, request, view):
-        user = getattr(request, 'user', None)
-        if not user or not user.is_authenticated:
-            return False
-        return getattr(user, 'role', None) in ('Admin', 'SuperAdmin')
+        tenant = tenant_context(request)
+        return tenant.is_authenticated and tenant.is_admin
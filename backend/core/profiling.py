@@ -0,0 +1,182 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+SIGNING_SALT = 'core.profiling'
+# The force-profiling switch lives next to the captures, where every worker already looks, rather
+# than in the per-process cache.
+FORCE_FILE = 'forced_until'
+PROFILE_ID_RE = re.compile(r'^[0-9]{13}-[0-9a-f]{8}$')
+# Only one cProfile profiler can be active per process (Python 3.12 raises for a second one), so
+# overlapping requests on other threads record their SQL without CPU stats.
+_profiler_lock = threading.Lock()
+
+
+def profiles_dir() -> Path:
+    return Path(settings.PROFILING_DIR)
+
+
+def make_profile_token() -> str:
+    return signing.dumps({'profile': True}, salt=SIGNING_SALT)
+
+
+def force_profiling(seconds: int) -> float | None:
+    # Raises OSError when the profiles directory is not writable.
+    path = profiles_dir() / FORCE_FILE
+    if seconds <= 0:
+        path.unlink(missing_ok=True)
+        return None
+    until = time.time() + seconds
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f'{FORCE_FILE}.{os.getpid()}')
+    partial.write_text(repr(until))
+    partial.replace(path)
+    return until
+
+
+def forced_until() -> float | None:
+    try:
+        return float((profiles_dir() / FORCE_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def list_profiles() -> list[dict]:
+    directory = profiles_dir()
+    if not directory.exists():
+        return []
+    profiles = []
+    for meta_path in sorted(directory.glob('*.json'), reverse=True):
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            continue
+        meta.pop('sql', None)
+        meta.pop('stats', None)
+        profiles.append(meta)
+    return profiles
+
+
+def profile_path(profile_id: str, suffix: str) -> Path | None:
+    if not PROFILE_ID_RE.match(profile_id or ''):
+        return None
+    path = profiles_dir() / f'{profile_id}{suffix}'
+    return path if path.exists() else None
+
+
+class _SqlRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'many': many,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.header = 'HTTP_' + settings.PROFILING_HEADER.upper().replace('-', '_')
+
+    def __call__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        recorder = _SqlRecorder()
+        profiler = None
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            if _profiler_lock.acquire(blocking=False):
+                stack.callback(_profiler_lock.release)
+                profiler = cProfile.Profile()
+                profiler.enable()
+                stack.callback(profiler.disable)
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            profile_id = self._store(request, response, trigger, profiler, recorder.queries, duration_ms)
+        except OSError:
+            return response
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def _trigger(self, request):
+        token = request.META.get(self.header)
+        if token:
+            try:
+                signing.loads(token, salt=SIGNING_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+                return 'header'
+            except signing.BadSignature:
+                pass
+        until = forced_until()
+        if until and until > time.time():
+            return 'toggle'
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate > 0 and random.random() < rate:
+            return 'sample'
+        return None
+
+    def _store(self, request, response, trigger, profiler, queries, duration_ms):
+        directory = profiles_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+
+        profile_id = f'{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}'
+        stream = io.StringIO()
+        if profiler is not None:
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats('cumulative').print_stats(settings.PROFILING_TOP_FUNCTIONS)
+            profiler.dump_stats(str(directory / f'{profile_id}.prof'))
+
+        meta = {
+            'id': profile_id,
+            'timestamp': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'query': request.META.get('QUERY_STRING', ''),
+            'status': response.status_code,
+            'durationMs': round(duration_ms, 3),
+            'trigger': trigger,
+            'cpuProfile': profiler is not None,
+            'sqlCount': len(queries),
+            'sqlMs': round(sum(q['ms'] for q in queries), 3),
+            'sql': queries,
+            'stats': stream.getvalue(),
+        }
+        (directory / f'{profile_id}.json').write_text(json.dumps(meta))
+        self._evict(directory)
+        return profile_id
+
+    def _evict(self, directory):
+        # Bounded ring buffer: keep only the newest PROFILING_MAX_PROFILES captures.
+        metas = sorted(directory.glob('*.json'))
+        for meta_path in metas[: max(0, len(metas) - settings.PROFILING_MAX_PROFILES)]:
+            for suffix in ('.json', '.prof'):
+                meta_path.with_suffix(suffix).unlink(missing_ok=True)
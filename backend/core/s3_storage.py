@@ -0,0 +1,68 @@
+from boto3.s3.transfer import TransferConfig
+from django.utils.encoding import filepath_to_uri
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+MB = 1024 * 1024
+
+
+class S3MediaStorage(S3Storage):
+    # Media on any S3-compatible store (AWS S3, MinIO). Saves stream through boto3's managed
+    # transfer, which switches to a multipart upload above `multipart_threshold` and sends up to
+    # `max_concurrency` parts in parallel. `public_endpoint_url` is the address browsers use when it
+    # differs from the one the app reaches (e.g. MinIO inside docker-compose); URLs and presigned
+    # uploads are signed for it.
+    def __init__(self, **settings):
+        self.public_endpoint_url = settings.pop('public_endpoint_url', None) or None
+        threshold = settings.pop('multipart_threshold', 8 * MB)
+        chunksize = settings.pop('multipart_chunksize', 8 * MB)
+        concurrency = settings.pop('max_concurrency', 4)
+        settings.setdefault(
+            'transfer_config',
+            TransferConfig(multipart_threshold=threshold, multipart_chunksize=chunksize, max_concurrency=concurrency),
+        )
+        super().__init__(**settings)
+
+    @property
+    def signing_client(self):
+        client = getattr(self._connections, 'signing_client', None)
+        if client is None:
+            if self.public_endpoint_url:
+                client = self._create_session().client(
+                    's3',
+                    region_name=self.region_name,
+                    use_ssl=self.use_ssl,
+                    endpoint_url=self.public_endpoint_url,
+                    config=self.client_config,
+                    verify=self.verify,
+                )
+            else:
+                client = self.connection.meta.client
+            self._connections.signing_client = client
+        return client
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if not self.public_endpoint_url or self.custom_domain:
+            return super().url(name, parameters=parameters, expire=expire, http_method=http_method)
+        name = self._normalize_name(clean_name(name))
+        if not self.querystring_auth:
+            return f'{self.public_endpoint_url.rstrip("/")}/{self.bucket_name}/{filepath_to_uri(name)}'
+        params = {**(parameters or {}), 'Bucket': self.bucket_name, 'Key': name}
+        return self.signing_client.generate_presigned_url(
+            'get_object',
+            Params=params,
+            ExpiresIn=self.querystring_expire if expire is None else expire,
+            HttpMethod=http_method,
+        )
+
+    def presign_upload(self, name, content_type, max_bytes, expires, token):
+        # Browser form POST straight to the bucket; the policy pins the key, the content type and
+        # the size range, so the client cannot write anywhere else or upload more than max_bytes.
+        post = self.signing_client.generate_presigned_post(
+            Bucket=self.bucket_name,
+            Key=self._normalize_name(clean_name(name)),
+            Fields={'Content-Type': content_type},
+            Conditions=[{'Content-Type': content_type}, ['content-length-range', 1, max_bytes]],
+            ExpiresIn=expires,
+        )
+        return {'method': 'POST', 'url': post['url'], 'fields': post['fields'], 'fileField': 'file'}
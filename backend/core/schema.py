@@ -0,0 +1,121 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+# The OpenAPI document is generated once per code version and written to OPENAPI_SCHEMA_DIR
+# (see `build_openapi_schema`), then served from memory. drf_spectacular's generator, renderers
+# and their yaml/uritemplate/inflection imports are only loaded when a build is needed, so
+# request-serving workers never import them.
+FORMATS = {
+    'yaml': 'application/vnd.oai.openapi',
+    'json': 'application/vnd.oai.openapi+json',
+}
+SOURCE_DIRS = ('core', 'raven_api')
+
+_lock = threading.Lock()
+_loaded = {}
+_version = None
+
+
+def code_version() -> str:
+    # DJANGO_CODE_VERSION (e.g. the git sha baked in at build time) when set; otherwise a hash of
+    # the backend's Python sources plus the schema settings, computed once per process.
+    global _version
+    if _version is None:
+        explicit = settings.CODE_VERSION
+        if explicit:
+            _version = explicit
+        else:
+            digest = hashlib.sha256(repr(sorted(settings.SPECTACULAR_SETTINGS.items())).encode())
+            for directory in SOURCE_DIRS:
+                for path in sorted((Path(settings.BASE_DIR) / directory).rglob('*.py')):
+                    digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+                    digest.update(path.read_bytes())
+            _version = digest.hexdigest()[:16]
+    return _version
+
+
+def schema_path(fmt: str, version: str | None = None) -> Path:
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f'openapi-{version or code_version()}.{fmt}'
+
+
+def generate() -> dict[str, bytes]:
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    schema = spectacular_settings.DEFAULT_GENERATOR_CLASS().get_schema(request=None, public=True)
+    return {
+        'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+        'json': OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def build(force: bool = False) -> list[Path]:
+    # Writes the schema files for the current code version unless they already exist. Returns the
+    # paths written; stale versions are removed.
+    paths = {fmt: schema_path(fmt) for fmt in FORMATS}
+    if not force and all(path.exists() for path in paths.values()):
+        return []
+    directory = Path(settings.OPENAPI_SCHEMA_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for fmt, body in generate().items():
+        tmp = paths[fmt].with_suffix(f'.{fmt}.tmp')
+        tmp.write_bytes(body)
+        os.replace(tmp, paths[fmt])
+    current = set(paths.values())
+    for stale in directory.glob('openapi-*.*'):
+        if stale not in current:
+            stale.unlink(missing_ok=True)
+    return list(current)
+
+
+def load(fmt: str) -> tuple[bytes, str]:
+    # (body, etag) for the current code version. Falls back to building in-process when the build
+    # step did not run; if the directory is not writable the result is only kept in memory.
+    if fmt not in _loaded:
+        with _lock:
+            if fmt not in _loaded:
+                path = schema_path(fmt)
+                if not path.exists():
+                    try:
+                        build()
+                    except OSError:
+                        pass
+                if path.exists():
+                    bodies = {fmt: path.read_bytes()}
+                else:
+                    bodies = generate()
+                for name, body in bodies.items():
+                    _loaded[name] = (body, f'"{code_version()}-{hashlib.sha256(body).hexdigest()[:16]}"')
+    return _loaded[fmt]
+
+
+@require_safe
+def schema_view(request):
+    fmt = 'json' if request.GET.get('format') == 'json' or 'json' in request.headers.get('Accept', '') else 'yaml'
+    body, etag = load(fmt)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type=FORMATS[fmt])
+    response.headers['ETag'] = etag
+    response.headers['Vary'] = 'Accept'
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
+
+
+_swagger_view = None
+
+
+def swagger_view(request, *args, **kwargs):
+    global _swagger_view
+    if _swagger_view is None:
+        from drf_spectacular.views import SpectacularSwaggerView
+
+        _swagger_view = SpectacularSwaggerView.as_view(url_name='schema')
+    return _swagger_view(request, *args, **kwargs)
@@ -1,10 +1,28 @@
 import datetime
+import operator
+import posixpath
+from collections.abc import Mapping
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from django.db import transaction
-
-from .models import Application, Company, CompanyMembership, Property, User
+from rest_framework.fields import SkipField
+from django.db import models, transaction
+
+from . import caching
+from .fieldsets import SparseFieldsetMixin
+from .models import (
+    Application,
+    Company,
+    CompanyApplicationConversion,
+    CompanyMembership,
+    CompanyPlotUsage,
+    PlanRevenue,
+    Property,
+    User,
+)
+from .storage import DIRECT_UPLOAD_TARGETS, DirectUploadField
+from .uploads import validate_document
+from .workflows import APPROVED, ApprovalConflict, approve_applications
 
 
 class CoerceDateField(serializers.DateField):
@@ -14,13 +32,73 @@ class CoerceDateField(serializers.DateField):
         return super().to_representation(value)
 
 
-class CompanySerializer(serializers.ModelSerializer):
+def absolute_media_url(context, file_field):
+    if not file_field:
+        return ''
+    try:
+        url = file_field.url
+    except Exception:
+        return ''
+    if not url.startswith('/'):
+        return url
+    # Resolve scheme://host once per request instead of build_absolute_uri() per file.
+    base_url = context.get('media_base_url')
+    if base_url is None:
+        request = context.get('request')
+        base_url = request.build_absolute_uri('/')[:-1] if request else ''
+        context['media_base_url'] = base_url
+    return base_url + url
+
+
+class MediaUrlField(serializers.Field):
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return super().get_attribute(instance) or ''
+
+    def to_representation(self, value):
+        return absolute_media_url(self.context, value)
+
+
+class FastRepresentationMixin:
+    def _compiled_readable_fields(self):
+        compiled = self.__dict__.get('_compiled_fields')
+        if compiled is None:
+            compiled = []
+            for field in self._readable_fields:
+                getter = field.get_attribute
+                if (
+                    len(field.source_attrs) == 1
+                    and field.source != '*'
+                    and type(field).get_attribute is serializers.Field.get_attribute
+                ):
+                    getter = operator.attrgetter(field.source_attrs[0])
+                compiled.append((field.field_name, getter, field.to_representation))
+            self._compiled_fields = compiled
+        return compiled
+
+    def to_representation(self, instance):
+        if isinstance(instance, Mapping):
+            return super().to_representation(instance)
+        ret = {}
+        for field_name, getter, to_representation in self._compiled_readable_fields():
+            try:
+                attribute = getter(instance)
+            except SkipField:
+                continue
+            ret[field_name] = None if attribute is None else to_representation(attribute)
+        return ret
+
+
+class CompanySerializer(SparseFieldsetMixin, FastRepresentationMixin, serializers.ModelSerializer):
     primaryColor = serializers.CharField(source='primary_color', required=False, allow_blank=True)
     contactEmail = serializers.EmailField(source='contact_email', required=False, allow_blank=True)
     contactPhone = serializers.CharField(source='contact_phone', required=False, allow_blank=True)
     subscriptionPlan = serializers.CharField(source='subscription_plan', required=False, allow_blank=True)
     maxPlots = serializers.IntegerField(source='max_plots', required=False)
-    registeredDate = serializers.SerializerMethodField()
+    registeredDate = CoerceDateField(source='registered_date', read_only=True)
 
     def validate(self, attrs):
         instance = getattr(self, 'instance', None)
@@ -39,12 +117,6 @@ class CompanySerializer(serializers.ModelSerializer):
                     )
         return super().validate(attrs)
 
-    def get_registeredDate(self, obj):
-        value = getattr(obj, 'registered_date', None)
-        if isinstance(value, datetime.datetime):
-            return value.date()
-        return value
-
     class Meta:
         model = Company
         fields = (
@@ -61,6 +133,7 @@ class CompanySerializer(serializers.ModelSerializer):
             'contactPhone',
             'address',
         )
+        slim_fields = ('id', 'name', 'logo', 'primaryColor', 'status')
 
 
 class CompanyCreateSerializer(CompanySerializer):
@@ -103,19 +176,38 @@ class CompanyCreateSerializer(CompanySerializer):
         return company
 
 
-class UserSerializer(serializers.ModelSerializer):
-    companyId = serializers.UUIDField(source='company.id', read_only=True)
-    companyIds = serializers.SerializerMethodField()
-    registeredDate = serializers.SerializerMethodField()
+class CompanyStatsSerializer(serializers.Serializer):
+    def to_representation(self, instance):
+        properties = {
+            Property.Status.AVAILABLE: instance.properties_available,
+            Property.Status.RESERVED: instance.properties_reserved,
+            Property.Status.SOLD: instance.properties_sold,
+        }
+        applications = {
+            Application.Status.PENDING: instance.applications_pending,
+            Application.Status.APPROVED: instance.applications_approved,
+            Application.Status.REJECTED: instance.applications_rejected,
+        }
+        return {
+            'companyId': str(instance.company_id),
+            'propertiesTotal': sum(properties.values()),
+            'propertiesByStatus': {str(k): v for k, v in properties.items()},
+            'applicationsTotal': sum(applications.values()),
+            'applicationsByStatus': {str(k): v for k, v in applications.items()},
+            'offersTotal': str(instance.offers_total),
+            'offersApproved': str(instance.offers_approved),
+            'updatedAt': instance.updated_at.isoformat() if instance.updated_at else None,
+        }
 
-    def get_registeredDate(self, obj):
-        value = getattr(obj, 'registered_date', None)
-        if isinstance(value, datetime.datetime):
-            return value.date()
-        return value
+
+class UserSerializer(SparseFieldsetMixin, FastRepresentationMixin, serializers.ModelSerializer):
+    companyId = serializers.UUIDField(source='company_id', read_only=True)
+    companyIds = serializers.SerializerMethodField()
+    registeredDate = CoerceDateField(source='registered_date', read_only=True)
 
     def get_companyIds(self, obj):
-        return [str(cid) for cid in obj.company_memberships.values_list('company_id', flat=True)]
+        # Uses the prefetch cache when the queryset has prefetch_related('company_memberships').
+        return [str(membership.company_id) for membership in obj.company_memberships.all()]
 
     class Meta:
         model = User
@@ -130,6 +222,8 @@ class UserSerializer(serializers.ModelSerializer):
             'companyId',
             'companyIds',
         )
+        slim_fields = ('id', 'name', 'email', 'role', 'status', 'companyId')
+        fieldset_sources = {'companyIds': ()}
 
 
 class ClientSignupSerializer(serializers.Serializer):
@@ -143,17 +237,21 @@ class ClientSignupSerializer(serializers.Serializer):
     )
 
     def validate_companyIds(self, value):
-        companies = Company.objects.filter(id__in=value)
-        if companies.count() != len(set(value)):
+        company_ids = list(dict.fromkeys(value))
+        companies = {company.id: company for company in Company.objects.filter(id__in=company_ids)}
+        if len(companies) != len(company_ids):
             raise ValidationError('One or more companyIds are invalid')
-        return value
+        # Keep the fetched rows (in request order) so save() doesn't query them again.
+        self._companies = [companies[company_id] for company_id in company_ids]
+        return company_ids
 
+    @transaction.atomic
     def save(self, **kwargs):
         name = self.validated_data['name']
         email = self.validated_data['email'].lower()
         phone = self.validated_data.get('phone', '')
         password = self.validated_data['password']
-        company_ids = self.validated_data['companyIds']
+        companies = self._companies
 
         user = User.objects.filter(email=email).first()
 
@@ -165,7 +263,7 @@ class ClientSignupSerializer(serializers.Serializer):
             user.name = user.name or name
             if phone:
                 user.phone = phone
-            user.save(update_fields=['name', 'phone'])
+            update_fields = ['name', 'phone']
         else:
             user = User.objects.create_user(
                 email=email,
@@ -174,19 +272,63 @@ class ClientSignupSerializer(serializers.Serializer):
                 phone=phone,
                 role=User.Role.CLIENT,
                 status=User.Status.ACTIVE,
+                company=companies[0],
             )
+            update_fields = []
 
-        companies = list(Company.objects.filter(id__in=company_ids))
-        for company in companies:
-            CompanyMembership.objects.get_or_create(user=user, company=company)
+        CompanyMembership.objects.bulk_add((user.id, company.id) for company in companies)
 
-        if not user.company_id and companies:
+        if not user.company_id:
             user.company = companies[0]
-            user.save(update_fields=['company'])
+            update_fields.append('company')
+        if update_fields:
+            user.save(update_fields=update_fields)
 
         return user
 
 
+class CompanyMembershipBatchSerializer(serializers.Serializer):
+    userIds = serializers.ListField(child=serializers.UUIDField(), required=False, max_length=1000)
+    emails = serializers.ListField(child=serializers.EmailField(), required=False, max_length=1000)
+
+    def validate(self, attrs):
+        if not attrs.get('userIds') and not attrs.get('emails'):
+            raise ValidationError('Provide userIds and/or emails')
+        return attrs
+
+    @transaction.atomic
+    def save(self, company):
+        user_ids = list(dict.fromkeys(self.validated_data.get('userIds') or []))
+        emails = list(dict.fromkeys(email.lower() for email in self.validated_data.get('emails') or []))
+
+        lookup = models.Q(id__in=user_ids) | models.Q(email__in=emails)
+        users = list(User.objects.filter(lookup).only('id', 'email', 'role', 'company_id'))
+        by_id = {user.id: user for user in users}
+        by_email = {user.email: user for user in users}
+        existing = set(
+            CompanyMembership.objects.filter(company_id=company.id, user_id__in=list(by_id)).values_list('user_id', flat=True)
+        )
+
+        results = []
+        to_add = []
+        for key, user in [(str(uid), by_id.get(uid)) for uid in user_ids] + [(e, by_email.get(e)) for e in emails]:
+            if user is None:
+                results.append({'key': key, 'status': 'not_found'})
+            elif user.role != User.Role.CLIENT:
+                results.append({'key': key, 'userId': str(user.id), 'status': 'not_client'})
+            elif user.id in existing:
+                results.append({'key': key, 'userId': str(user.id), 'status': 'exists'})
+            else:
+                existing.add(user.id)
+                to_add.append(user.id)
+                results.append({'key': key, 'userId': str(user.id), 'status': 'created'})
+
+        CompanyMembership.objects.bulk_add((user_id, company.id) for user_id in to_add)
+        # Clients without an active company default to the one they were just enrolled in.
+        User.objects.filter(id__in=to_add, company__isnull=True).update(company=company)
+        return results
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=6)
     companyId = serializers.UUIDField(required=False, allow_null=True)
@@ -216,40 +358,16 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class PropertySerializer(serializers.ModelSerializer):
+class PropertySerializer(SparseFieldsetMixin, FastRepresentationMixin, serializers.ModelSerializer):
     companyId = serializers.UUIDField(source='company_id', required=False, allow_null=True)
     plotNumber = serializers.CharField(source='plot_number', required=False, allow_blank=True, allow_null=True)
     roomNumber = serializers.CharField(source='room_number', required=False, allow_blank=True, allow_null=True)
     image = serializers.ImageField(required=False, allow_null=True, write_only=True)
-    imageUrl = serializers.SerializerMethodField()
+    imageUpload = DirectUploadField('image', source='image')
+    imageUrl = MediaUrlField(source='image')
     layoutImage = serializers.FileField(source='layout_image', required=False, allow_null=True, write_only=True)
-    layoutImageUrl = serializers.SerializerMethodField()
-
-    def get_imageUrl(self, obj):
-        image = getattr(obj, 'image', None)
-        if not image:
-            return ''
-        try:
-            url = image.url
-        except Exception:
-            return ''
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(url)
-        return url
-
-    def get_layoutImageUrl(self, obj):
-        image = getattr(obj, 'layout_image', None)
-        if not image:
-            return ''
-        try:
-            url = image.url
-        except Exception:
-            return ''
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(url)
-        return url
+    layoutImageUpload = DirectUploadField('layoutImage', source='layout_image')
+    layoutImageUrl = MediaUrlField(source='layout_image')
 
     class Meta:
         model = Property
@@ -266,12 +384,27 @@ class PropertySerializer(serializers.ModelSerializer):
             'status',
             'type',
             'image',
+            'imageUpload',
             'imageUrl',
             'layoutImage',
+            'layoutImageUpload',
             'layoutImageUrl',
             'features',
+            'latitude',
+            'longitude',
+        )
+        slim_fields = (
+            'id', 'companyId', 'title', 'location', 'price', 'size', 'status', 'type', 'imageUrl', 'latitude', 'longitude',
         )
 
+    def validate(self, attrs):
+        instance = getattr(self, 'instance', None)
+        latitude = attrs.get('latitude', getattr(instance, 'latitude', None))
+        longitude = attrs.get('longitude', getattr(instance, 'longitude', None))
+        if (latitude is None) != (longitude is None):
+            raise ValidationError({'detail': 'latitude and longitude must be set together.'})
+        return super().validate(attrs)
+
     def create(self, validated_data):
         company_id = validated_data.pop('company_id', None)
         if company_id:
@@ -311,6 +444,7 @@ class PropertySerializer(serializers.ModelSerializer):
             ).update(
                 layout_image=instance.layout_image
             )
+            caching.invalidate_companies([instance.company_id])
 
         return instance
 
@@ -346,6 +480,7 @@ class PropertySerializer(serializers.ModelSerializer):
             ).update(
                 layout_image=updated.layout_image
             )
+            caching.invalidate_companies([updated.company_id])
 
         return updated
 
@@ -357,9 +492,20 @@ class PublicPropertySerializer(PropertySerializer):
         fields = PropertySerializer.Meta.fields + (
             'companyName',
         )
+        slim_fields = PropertySerializer.Meta.slim_fields + (
+            'companyName',
+        )
+
 
+def _upload_name(upload):
+    # Multipart uploads carry the client's file name; direct uploads are a storage key
+    # ('<dir>/<uuid7 hex>-<name>').
+    if isinstance(upload, str):
+        return posixpath.basename(upload).split('-', 1)[-1]
+    return getattr(upload, 'name', '')
 
-class ApplicationSerializer(serializers.ModelSerializer):
+
+class ApplicationSerializer(SparseFieldsetMixin, FastRepresentationMixin, serializers.ModelSerializer):
     companyId = serializers.UUIDField(source='company_id', required=False, allow_null=True)
     propertyId = serializers.UUIDField(source='property_id', required=False, allow_null=True)
     userId = serializers.UUIDField(source='user_id', required=False, allow_null=True)
@@ -370,35 +516,30 @@ class ApplicationSerializer(serializers.ModelSerializer):
     offerAmount = serializers.DecimalField(source='offer_amount', max_digits=14, decimal_places=2)
     financingMethod = serializers.CharField(source='financing_method', required=False, allow_blank=True)
     intendedUse = serializers.CharField(source='intended_use', required=False, allow_blank=True)
-    dateApplied = serializers.SerializerMethodField()
+    dateApplied = CoerceDateField(source='date_applied', read_only=True)
     idDocument = serializers.FileField(source='id_document', required=False, allow_null=True, write_only=True)
     proofOfFunds = serializers.FileField(source='proof_of_funds', required=False, allow_null=True, write_only=True)
+    idDocumentUpload = DirectUploadField('idDocument', source='id_document')
+    proofOfFundsUpload = DirectUploadField('proofOfFunds', source='proof_of_funds')
+    scanStatus = serializers.CharField(source='scan_status', read_only=True)
 
-    def get_dateApplied(self, obj):
-        value = getattr(obj, 'date_applied', None)
-        if isinstance(value, datetime.datetime):
-            return value.date()
-        return value
-
-    def _file_url(self, file_field):
-        if not file_field:
-            return ''
-        try:
-            url = file_field.url
-        except Exception:
-            return ''
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(url)
-        return url
+    def validate_idDocument(self, value):
+        return validate_document(value) if value else value
+
+    def validate_proofOfFunds(self, value):
+        return validate_document(value) if value else value
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        docs = data.get('documents') or {}
-        if not isinstance(docs, dict):
-            docs = {}
-        docs['idDocument'] = self._file_url(getattr(instance, 'id_document', None)) or docs.get('idDocument') or ''
-        docs['proofOfFunds'] = self._file_url(getattr(instance, 'proof_of_funds', None)) or docs.get('proofOfFunds') or ''
+        if 'documents' not in data:
+            return data
+        stored = data['documents']
+        if not isinstance(stored, dict):
+            stored = {}
+        # Copy so the instance's JSON value is never mutated in place.
+        docs = dict(stored)
+        docs['idDocument'] = absolute_media_url(self.context, instance.id_document) or stored.get('idDocument') or ''
+        docs['proofOfFunds'] = absolute_media_url(self.context, instance.proof_of_funds) or stored.get('proofOfFunds') or ''
         data['documents'] = docs
         return data
 
@@ -420,8 +561,13 @@ class ApplicationSerializer(serializers.ModelSerializer):
             'dateApplied',
             'idDocument',
             'proofOfFunds',
+            'idDocumentUpload',
+            'proofOfFundsUpload',
             'documents',
+            'scanStatus',
         )
+        slim_fields = ('id', 'companyId', 'propertyId', 'applicantName', 'offerAmount', 'status', 'dateApplied')
+        fieldset_sources = {'documents': ('documents', 'id_document', 'proof_of_funds')}
         extra_kwargs = {
             'company': {'read_only': True},
             'property': {'read_only': True},
@@ -435,14 +581,16 @@ class ApplicationSerializer(serializers.ModelSerializer):
 
         id_doc = validated_data.get('id_document')
         pof = validated_data.get('proof_of_funds')
+        if id_doc or pof:
+            validated_data['scan_status'] = Application.ScanStatus.PENDING
         if id_doc:
             validated_data.setdefault('documents', {})
             if isinstance(validated_data['documents'], dict):
-                validated_data['documents']['idDocumentName'] = getattr(id_doc, 'name', '')
+                validated_data['documents']['idDocumentName'] = _upload_name(id_doc)
         if pof:
             validated_data.setdefault('documents', {})
             if isinstance(validated_data['documents'], dict):
-                validated_data['documents']['proofOfFundsName'] = getattr(pof, 'name', '')
+                validated_data['documents']['proofOfFundsName'] = _upload_name(pof)
 
         if company_id:
             validated_data['company'] = Company.objects.get(id=company_id)
@@ -452,3 +600,91 @@ class ApplicationSerializer(serializers.ModelSerializer):
             validated_data['user'] = User.objects.get(id=user_id)
 
         return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        if validated_data.get('id_document') or validated_data.get('proof_of_funds'):
+            # Also drops a running scan's claim, so its result for the old files is discarded.
+            validated_data['scan_status'] = Application.ScanStatus.PENDING
+            validated_data['scan_claimed_at'] = None
+        approving = (
+            validated_data.get('status') == Application.Status.APPROVED
+            and instance.status != Application.Status.APPROVED
+        )
+        if not approving:
+            return super().update(instance, validated_data)
+
+        # Approval goes through the locking workflow so the property is reserved exactly once. It runs
+        # before the save: the workflow locks the property ahead of any application row, and saving
+        # first would take this application's row lock out of that order.
+        validated_data.pop('status')
+        with transaction.atomic():
+            if approve_applications([instance.id]).get(instance.id) != APPROVED:
+                raise ApprovalConflict()
+            instance.status = Application.Status.APPROVED
+            return super().update(instance, validated_data)
+
+
+class DirectUploadRequestSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=sorted(DIRECT_UPLOAD_TARGETS))
+    filename = serializers.CharField(max_length=200)
+    contentType = serializers.CharField(max_length=100)
+
+    def validate(self, attrs):
+        allowed = DIRECT_UPLOAD_TARGETS[attrs['target']][2]
+        if attrs['contentType'] not in allowed:
+            raise ValidationError({'contentType': f'Must be one of: {", ".join(allowed)}.'})
+        return attrs
+
+
+class BulkActionSerializer(serializers.Serializer):
+    ACTION_SET_STATUS = 'set_status'
+    ACTION_DELETE = 'delete'
+
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=1000)
+    action = serializers.ChoiceField(choices=[ACTION_SET_STATUS, ACTION_DELETE])
+
+    def __init__(self, *args, status_choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['status'] = serializers.ChoiceField(choices=status_choices, required=False)
+
+    def validate(self, attrs):
+        if attrs['action'] == self.ACTION_SET_STATUS and not attrs.get('status'):
+            raise ValidationError({'status': 'status is required for set_status'})
+        attrs['ids'] = list(dict.fromkeys(attrs['ids']))
+        return attrs
+
+
+class CompanyPlotUsageSerializer(serializers.ModelSerializer):
+    companyId = serializers.UUIDField(source='company_id', read_only=True)
+    subscriptionPlan = serializers.CharField(source='subscription_plan', read_only=True)
+    maxPlots = serializers.IntegerField(source='max_plots', read_only=True)
+    utilization = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CompanyPlotUsage
+        fields = ('companyId', 'name', 'subscriptionPlan', 'maxPlots', 'plots', 'utilization')
+
+    def get_utilization(self, obj):
+        return round(obj.plots / obj.max_plots, 4) if obj.max_plots else None
+
+
+class CompanyApplicationConversionSerializer(serializers.ModelSerializer):
+    companyId = serializers.UUIDField(source='company_id', read_only=True)
+    conversionRate = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CompanyApplicationConversion
+        fields = ('companyId', 'name', 'applications', 'pending', 'approved', 'rejected', 'conversionRate')
+
+    def get_conversionRate(self, obj):
+        return round(obj.approved / obj.applications, 4) if obj.applications else None
+
+
+class PlanRevenueSerializer(serializers.ModelSerializer):
+    subscriptionPlan = serializers.CharField(source='subscription_plan', read_only=True)
+    approvedApplications = serializers.IntegerField(source='approved_applications', read_only=True)
+    approvedOffers = serializers.DecimalField(source='approved_offers', max_digits=18, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = PlanRevenue
+        fields = ('subscriptionPlan', 'companies', 'approvedApplications', 'approvedOffers')
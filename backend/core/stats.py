@@ -0,0 +1,193 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Application, Company, CompanyStats, Property
+
+PROPERTY_COUNTERS = {
+    Property.Status.AVAILABLE: 'properties_available',
+    Property.Status.RESERVED: 'properties_reserved',
+    Property.Status.SOLD: 'properties_sold',
+}
+APPLICATION_COUNTERS = {
+    Application.Status.PENDING: 'applications_pending',
+    Application.Status.APPROVED: 'applications_approved',
+    Application.Status.REJECTED: 'applications_rejected',
+}
+TRACKED_FIELDS = {
+    Property: ('company_id', 'status', 'deleted_at'),
+    Application: ('company_id', 'status', 'offer_amount'),
+}
+
+
+def _contribution(model, row):
+    # What one row adds to its company's summary; soft-deleted properties count for nothing.
+    counters = Counter()
+    if model is Property:
+        if row['deleted_at'] is None and row['status'] in PROPERTY_COUNTERS:
+            counters[PROPERTY_COUNTERS[row['status']]] += 1
+    else:
+        if row['status'] in APPLICATION_COUNTERS:
+            counters[APPLICATION_COUNTERS[row['status']]] += 1
+        offer = row['offer_amount'] or Decimal('0')
+        counters['offers_total'] += offer
+        if row['status'] == Application.Status.APPROVED:
+            counters['offers_approved'] += offer
+    return counters
+
+
+def _row(model, instance):
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS[model]}
+
+
+def _totals(model, queryset):
+    # Aggregated contribution of every row in `queryset`, per company.
+    totals = defaultdict(Counter)
+    if model is Property:
+        rows = queryset.order_by().values('company_id', 'status').annotate(
+            n=Count('id', filter=Q(deleted_at__isnull=True))
+        )
+        for row in rows:
+            if row['status'] in PROPERTY_COUNTERS:
+                totals[row['company_id']][PROPERTY_COUNTERS[row['status']]] += row['n']
+    else:
+        rows = queryset.order_by().values('company_id', 'status').annotate(n=Count('id'), offers=Sum('offer_amount'))
+        for row in rows:
+            company = totals[row['company_id']]
+            if row['status'] in APPLICATION_COUNTERS:
+                company[APPLICATION_COUNTERS[row['status']]] += row['n']
+            company['offers_total'] += row['offers'] or 0
+            if row['status'] == Application.Status.APPROVED:
+                company['offers_approved'] += row['offers'] or 0
+    return totals
+
+
+def apply_deltas(deltas, create_missing=True):
+    for company_id, counters in deltas.items():
+        changes = {name: F(name) + value for name, value in counters.items() if value}
+        if not changes or company_id is None:
+            continue
+        updated = CompanyStats.objects.filter(company_id=company_id).update(updated_at=timezone.now(), **changes)
+        if not updated and create_missing:
+            # First write for this company (or the row was dropped): seed it from the tables,
+            # which already include the current write.
+            rebuild([company_id])
+
+
+def _subtract(after, before):
+    deltas = defaultdict(Counter)
+    for company_id in set(after) | set(before):
+        for name in set(after.get(company_id, ())) | set(before.get(company_id, ())):
+            deltas[company_id][name] = after.get(company_id, {}).get(name, 0) - before.get(company_id, {}).get(name, 0)
+    return deltas
+
+
+@contextmanager
+def tracking(queryset):
+    # For queryset.update() paths, which bypass model signals: diff the aggregated
+    # contribution of the affected rows before and after the block.
+    model = queryset.model
+    before = _totals(model, queryset)
+    yield
+    apply_deltas(_subtract(_totals(model, queryset.all()), before))
+
+
+def rebuild(company_ids=None):
+    companies = Company.objects.all()
+    if company_ids is not None:
+        companies = companies.filter(id__in=list(company_ids))
+    company_ids = list(companies.values_list('id', flat=True))
+    properties = _totals(Property, Property.objects.filter(company_id__in=company_ids))
+    applications = _totals(Application, Application.objects.filter(company_id__in=company_ids))
+
+    names = [*PROPERTY_COUNTERS.values(), *APPLICATION_COUNTERS.values(), 'offers_total', 'offers_approved']
+    now = timezone.now()
+    rows = []
+    for company_id in company_ids:
+        values = dict.fromkeys(names, 0)
+        values.update(properties.get(company_id, {}))
+        values.update(applications.get(company_id, {}))
+        rows.append(CompanyStats(company_id=company_id, updated_at=now, **values))
+
+    if rows:
+        CompanyStats.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['company'],
+            update_fields=names + ['updated_at'],
+        )
+    return len(rows)
+
+
+def company_stats(company_id):
+    stats = CompanyStats.objects.filter(company_id=company_id).first()
+    if stats is None:
+        rebuild([company_id])
+        stats = CompanyStats.objects.filter(company_id=company_id).first()
+    return stats
+
+
+def _stored_row(model, pk):
+    return model.objects.filter(pk=pk).values(*TRACKED_FIELDS[model]).first()
+
+
+@receiver(pre_save, sender=Property)
+@receiver(pre_save, sender=Application)
+def _remember_previous(sender, instance, raw=False, **kwargs):
+    # Read the stored row rather than trusting the instance, which may have been loaded
+    # before a queryset.update() changed it.
+    instance._stats_previous = None if raw or instance._state.adding else _stored_row(sender, instance.pk)
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_save, sender=Application)
+def _track_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_stats_previous', None)
+    current = _row(sender, instance)
+    if previous is not None and update_fields is not None:
+        # Columns outside update_fields were not written, so they keep their stored values.
+        written = {sender._meta.get_field(name).attname for name in update_fields}
+        current = {name: current[name] if name in written else previous[name] for name in current}
+
+    deltas = defaultdict(Counter)
+    deltas[current['company_id']].update(_contribution(sender, current))
+    if previous is not None:
+        deltas[previous['company_id']].subtract(_contribution(sender, previous))
+    apply_deltas(deltas)
+
+
+def _deleting_company(origin):
+    model = getattr(origin, 'model', type(origin))
+    return model is Company
+
+
+@receiver(pre_delete, sender=Property)
+@receiver(pre_delete, sender=Application)
+def _remember_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting_company(origin):
+        # A cascade from Company removes the summary row too, so there is nothing to maintain.
+        instance._stats_previous = None
+    elif origin is instance:
+        instance._stats_previous = _stored_row(sender, instance.pk)
+    else:
+        # Queryset deletes and cascades load the rows they delete, so the instance is current.
+        instance._stats_previous = _row(sender, instance)
+
+
+@receiver(post_delete, sender=Property)
+@receiver(post_delete, sender=Application)
+def _track_delete(sender, instance, **kwargs):
+    previous = getattr(instance, '_stats_previous', None)
+    if previous is None:
+        return
+    deltas = defaultdict(Counter)
+    deltas[previous['company_id']].subtract(_contribution(sender, previous))
+    apply_deltas(deltas, create_missing=False)
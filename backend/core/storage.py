@@ -0,0 +1,85 @@
+import posixpath
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import FileSystemStorage
+from django.urls import reverse
+from rest_framework import serializers
+
+from .ids import uuid7
+from .models import Application, Property
+
+# Direct uploads: the client asks for a presigned upload (create_direct_upload), sends the bytes
+# straight to the storage backend, then submits the returned token in place of the file. Django
+# only signs and verifies; with an S3-compatible backend it never touches the bytes.
+DOCUMENT_TYPES = ('application/pdf', 'image/jpeg', 'image/png')
+IMAGE_TYPES = ('image/jpeg', 'image/png', 'image/webp')
+# target -> (model, field, allowed content types, admin only)
+DIRECT_UPLOAD_TARGETS = {
+    'idDocument': (Application, 'id_document', DOCUMENT_TYPES, False),
+    'proofOfFunds': (Application, 'proof_of_funds', DOCUMENT_TYPES, False),
+    'image': (Property, 'image', IMAGE_TYPES, True),
+    'layoutImage': (Property, 'layout_image', IMAGE_TYPES + ('application/pdf',), True),
+}
+TOKEN_SALT = 'core.storage.direct-upload'
+
+
+def _field(target):
+    model, field_name, _, _ = DIRECT_UPLOAD_TARGETS[target]
+    return model._meta.get_field(field_name)
+
+
+def create_direct_upload(target, filename, content_type):
+    # Returns the presigned request for the browser plus the token that later stands in for the file.
+    field = _field(target)
+    directory, basename = posixpath.split(field.generate_filename(None, filename))
+    # uuid7 prefix keeps keys unique, so a presigned upload can never overwrite an existing object.
+    key = posixpath.join(directory, f'{uuid7().hex}-{basename}')
+    max_bytes = settings.UPLOAD_MAX_DOCUMENT_BYTES
+    token = signing.dumps({'target': target, 'key': key, 'type': content_type, 'max': max_bytes}, salt=TOKEN_SALT)
+    upload = field.storage.presign_upload(key, content_type, max_bytes, settings.DIRECT_UPLOAD_EXPIRES, token)
+    return {**upload, 'key': key, 'uploadToken': token, 'maxBytes': max_bytes, 'expiresIn': settings.DIRECT_UPLOAD_EXPIRES}
+
+
+def load_upload_token(token, max_age):
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return None
+
+
+class DirectUploadField(serializers.CharField):
+    # Write-only token field that resolves to the storage key of a finished direct upload. Declare it
+    # with the same source as the multipart file field so either can set the model field.
+    def __init__(self, target, **kwargs):
+        self.target = target
+        kwargs.setdefault('write_only', True)
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        payload = load_upload_token(super().to_internal_value(data), settings.DIRECT_UPLOAD_TOKEN_MAX_AGE)
+        if not payload or payload.get('target') != self.target:
+            raise serializers.ValidationError('Invalid or expired upload token.')
+        storage = _field(self.target).storage
+        key = payload['key']
+        try:
+            size = storage.size(key)
+        except (FileNotFoundError, OSError):
+            raise serializers.ValidationError('The upload has not completed.')
+        if size > payload['max']:
+            storage.delete(key)
+            raise serializers.ValidationError(f'File exceeds {payload["max"]} bytes.')
+        return key
+
+
+class LocalMediaStorage(FileSystemStorage):
+    # Filesystem stand-in for an object store: presigned uploads point at LocalUploadView, which
+    # checks the signed token and writes the file under MEDIA_ROOT. Single-node/dev use only.
+    def presign_upload(self, name, content_type, max_bytes, expires, token):
+        return {
+            'method': 'POST',
+            'url': reverse('direct_upload_local', args=[token]),
+            'fields': {'Content-Type': content_type},
+            'fileField': 'file',
+        }
@@ -0,0 +1,132 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+from . import caching
+from .models import CompanyMembership
+
+SUPERADMIN = 'SuperAdmin'
+ADMIN_ROLES = ('Admin', SUPERADMIN)
+
+
+def _membership_key(user_id):
+    return f'tenant-memberships:{user_id}'
+
+
+def _cache_timeout():
+    # Only cached on a backend shared by all workers: invalidation deletes the key in the process
+    # that changed the membership, and a per-process copy elsewhere would keep a revoked
+    # membership alive until it expires.
+    if not caching.is_shared(settings.TENANT_MEMBERSHIP_CACHE):
+        return 0
+    return settings.TENANT_MEMBERSHIP_CACHE_SECONDS
+
+
+def load_membership_ids(user_id) -> frozenset:
+    # Company ids the user belongs to, cached for TENANT_MEMBERSHIP_CACHE_SECONDS (0 disables the
+    # cache). Always read from the primary: this set decides access, so replica lag must not hide
+    # a membership that was just granted.
+    timeout = _cache_timeout()
+    cache = caches[settings.TENANT_MEMBERSHIP_CACHE]
+    if timeout > 0:
+        cached = cache.get(_membership_key(user_id))
+        if cached is not None:
+            return frozenset(cached)
+    ids = frozenset(
+        CompanyMembership.objects.using(router.db_for_write(CompanyMembership))
+        .filter(user_id=user_id)
+        .values_list('company_id', flat=True)
+    )
+    if timeout > 0:
+        cache.set(_membership_key(user_id), list(ids), timeout=timeout)
+    return ids
+
+
+def invalidate_memberships(user_ids):
+    keys = [_membership_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        caches[settings.TENANT_MEMBERSHIP_CACHE].delete_many(keys)
+
+
+@receiver(post_save, sender=CompanyMembership)
+@receiver(post_delete, sender=CompanyMembership)
+def _membership_changed(sender, instance, **kwargs):
+    invalidate_memberships([instance.user_id])
+
+
+class TenantContext:
+    # Who is calling and which company they act for, worked out once per request. Role and active
+    # company come from the authenticated user row; the membership set is loaded on first use.
+    def __init__(self, user):
+        self.user = user
+        self.is_authenticated = bool(user and user.is_authenticated)
+        self.role = getattr(user, 'role', None) if self.is_authenticated else None
+        self.company_id = getattr(user, 'company_id', None) if self.is_authenticated else None
+
+    @property
+    def is_superadmin(self) -> bool:
+        return self.role == SUPERADMIN
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role in ADMIN_ROLES
+
+    @property
+    def is_client(self) -> bool:
+        return self.role == 'Client'
+
+    @property
+    def scope_company_id(self):
+        # Company every tenant-scoped query is limited to; None means unrestricted (SuperAdmin).
+        return None if self.is_superadmin else self.company_id
+
+    @cached_property
+    def membership_ids(self) -> frozenset:
+        if not self.is_authenticated:
+            return frozenset()
+        return load_membership_ids(self.user.pk)
+
+    def is_member(self, company_id) -> bool:
+        try:
+            return uuid.UUID(str(company_id)) in self.membership_ids
+        except ValueError:
+            return False
+
+
+def tenant_context(request) -> TenantContext:
+    # Works on both Django and DRF requests. DRF authenticates inside the view and copies the user
+    # onto the underlying HttpRequest, so the context is rebuilt if the user changed since it was
+    # first resolved (e.g. anonymous in middleware, JWT user in the view).
+    http_request = getattr(request, '_request', request)
+    user = getattr(request, 'user', None)
+    context = getattr(http_request, '_tenant_context', None)
+    if context is None or context.user is not user:
+        context = TenantContext(user)
+        http_request._tenant_context = context
+    return context
+
+
+class _RequestTenant:
+    # request.tenant: forwards to tenant_context() on every access, so code that reads it before
+    # DRF authentication never pins an anonymous context for the rest of the request.
+    __slots__ = ('_request',)
+
+    def __init__(self, request):
+        self._request = request
+
+    def __getattr__(self, name):
+        return getattr(tenant_context(self._request), name)
+
+
+class TenantContextMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = _RequestTenant(request)
+        return self.get_response(request)
@@ -0,0 +1,130 @@
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from . import workflows
+from .models import Application, Company, Property, User
+from .throttling import IPThrottle
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentApprovalTests(TransactionTestCase):
+    # Two approvals of competing applications for the same property, released together: exactly one
+    # wins and the other reports the conflict instead of deadlocking.
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Acme')
+        self.user = User.objects.create_user('admin@example.com', role=User.Role.SUPER_ADMIN)
+        self.property = Property.objects.create(company=self.company, title='Plot 1', location='North')
+        self.applications = [
+            Application.objects.create(
+                company=self.company,
+                property=self.property,
+                applicant_name=f'Applicant {n}',
+                applicant_email=f'applicant{n}@example.com',
+            )
+            for n in range(2)
+        ]
+
+    def _race(self, request):
+        # Runs request(client, application) for both applications at once. The barrier holds each
+        # thread right before the approval workflow, after the view has done its own locking.
+        barrier = threading.Barrier(2, timeout=5)
+        approve = workflows.approve_applications
+
+        def synchronized(*args, **kwargs):
+            barrier.wait()
+            return approve(*args, **kwargs)
+
+        responses = {}
+
+        def run(application):
+            try:
+                client = APIClient()
+                client.force_authenticate(self.user)
+                responses[application.id] = request(client, application)
+            finally:
+                connection.close()
+
+        with (
+            mock.patch('core.serializers.approve_applications', synchronized),
+            mock.patch('core.views.approve_applications', synchronized),
+        ):
+            threads = [threading.Thread(target=run, args=(application,)) for application in self.applications]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return [responses[application.id] for application in self.applications]
+
+    def _assert_one_approved(self):
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.status, Property.Status.RESERVED)
+        statuses = sorted(Application.objects.values_list('status', flat=True))
+        self.assertEqual(statuses, [Application.Status.APPROVED, Application.Status.REJECTED])
+
+    def test_update(self):
+        responses = self._race(
+            lambda client, application: client.patch(
+                f'/api/applications/{application.id}/', {'status': 'Approved'}, format='json'
+            )
+        )
+        self.assertEqual(sorted(response.status_code for response in responses), [200, 409])
+        self._assert_one_approved()
+
+    def test_bulk(self):
+        responses = self._race(
+            lambda client, application: client.post(
+                '/api/applications/bulk/',
+                {'action': 'set_status', 'status': 'Approved', 'ids': [str(application.id)]},
+                format='json',
+            )
+        )
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        results = sorted(response.data['results'][0]['result'] for response in responses)
+        self.assertEqual(results, [workflows.CONFLICT, 'updated'])
+        self._assert_one_approved()
+
+
+class PublicApplicationThrottleOrderTests(TestCase):
+    # The per-IP throttle must run before the (possibly large) multipart body is parsed; only a
+    # remembered Idempotency-Key may read the body first.
+
+    def setUp(self):
+        caches[settings.THROTTLE_CACHE].clear()
+        company = Company.objects.create(name='Acme')
+        self.body = {
+            'companyId': str(company.id),
+            'propertyId': str(Property.objects.create(company=company, title='Plot 1', location='North').id),
+            'applicantName': 'Applicant',
+            'applicantEmail': 'applicant@example.com',
+            'offerAmount': '1',
+        }
+
+    def _calls(self, **headers):
+        calls = []
+        parse, allow_request = Request._parse, IPThrottle.allow_request
+
+        def spy_parse(request):
+            calls.append('parse')
+            return parse(request)
+
+        def spy_allow_request(throttle, request, view):
+            calls.append('ipthrottle')
+            return allow_request(throttle, request, view)
+
+        with mock.patch.object(Request, '_parse', spy_parse), mock.patch.object(IPThrottle, 'allow_request', spy_allow_request):
+            response = APIClient().post('/api/public/applications/', self.body, format='multipart', **headers)
+        return response, calls
+
+    def test_throttle_runs_before_parsing(self):
+        for headers in ({}, {'HTTP_IDEMPOTENCY_KEY': 'unknown-key'}):
+            response, calls = self._calls(**headers)
+            self.assertEqual(calls[:2], ['ipthrottle', 'parse'])
+            self.assertIn(response.status_code, (200, 201))
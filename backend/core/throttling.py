@@ -0,0 +1,103 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    # '<tokens>/<period>', e.g. '10/min': bucket capacity 10, refilled at 10 tokens per minute. Like
+    # DRF, only the period's first letter counts ('10/minute', '5/hours', '100/d').
+    if not rate:
+        return None
+    tokens, _, period = rate.partition('/')
+    try:
+        return int(tokens), PERIODS[period.strip()[:1].lower()]
+    except (KeyError, ValueError):
+        raise ImproperlyConfigured(f'Invalid throttle rate {rate!r}; expected e.g. "10/min" or "300/hour".') from None
+
+
+def validate_rates():
+    # Called at startup, so a bad THROTTLE_* value fails the deploy instead of every throttled request.
+    for scope, rate in api_settings.DEFAULT_THROTTLE_RATES.items():
+        try:
+            parse_rate(rate)
+        except ImproperlyConfigured as exc:
+            raise ImproperlyConfigured(f'DEFAULT_THROTTLE_RATES[{scope!r}]: {exc}') from None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    # Views opt in with `throttle_scope`; the rate for '<throttle_scope>.<kind>' is read from
+    # REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], and a missing rate disables the throttle.
+    kind = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_ident_value(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}.{self.kind}')) if scope else None
+        if rate is None:
+            return True
+        # Don't parse request bodies or spend tokens once an earlier throttle already rejected the request.
+        if getattr(request, '_throttle_denied', False):
+            return True
+        ident = self.get_ident_value(request, view)
+        if not ident:
+            return True
+
+        capacity, period = rate
+        refill_per_second = capacity / period
+        cache = caches[settings.THROTTLE_CACHE]
+        key = f'throttle:{scope}.{self.kind}:{ident}'
+        now = time.time()
+
+        tokens, updated = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        if tokens >= 1:
+            cache.set(key, (tokens - 1, now), timeout=period)
+            return True
+
+        cache.set(key, (tokens, now), timeout=period)
+        self.wait_seconds = (1 - tokens) / refill_per_second
+        request._throttle_denied = True
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    kind = 'ip'
+
+    def get_ident_value(self, request, view):
+        return self.get_ident(request)
+
+
+class _RequestDataThrottle(TokenBucketThrottle):
+    fields = ()
+
+    def get_ident_value(self, request, view):
+        data = request.data
+        for field in self.fields:
+            value = data.get(field) if hasattr(data, 'get') else None
+            if value:
+                return str(value).strip().lower()
+        return None
+
+
+class EmailThrottle(_RequestDataThrottle):
+    kind = 'email'
+    fields = ('email', 'applicantEmail')
+
+
+class CompanyThrottle(_RequestDataThrottle):
+    kind = 'company'
+    fields = ('companyId',)
@@ -0,0 +1,254 @@
+import datetime
+import re
+import zlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Application
+
+# Application documents go through three stages:
+#   1. DocumentUploadHandler, while the multipart body streams in: per-file size cap and
+#      magic-byte type check, aborting the request before the rest of the body is read or spooled.
+#   2. validate_document(), in the serializer: header-level image/PDF sanity checks before the file
+#      reaches storage.
+#   3. scan_pending(), from the `scan_uploads` worker: full image decode and PDF page count;
+#      failing files are deleted and the application is marked Rejected.
+DOCUMENT_FIELDS = {'idDocument': 'id_document', 'proofOfFunds': 'proof_of_funds'}
+SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+)
+SNIFF_BYTES = 8
+UNSUPPORTED = 'Unsupported file type. Upload a PDF, JPEG or PNG.'
+PDF_PAGE = re.compile(rb'/Type\s*/Page(?![A-Za-z])')
+PDF_STREAM = re.compile(rb'stream\r?\n')
+# Cap on bytes inflated from one PDF stream while counting pages (guards against zip bombs).
+PDF_MAX_INFLATE = 8 * 1024 * 1024
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Upload too large.'
+    default_code = 'upload_too_large'
+
+
+class DocumentRejected(Exception):
+    pass
+
+
+def sniff(head: bytes) -> str | None:
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def sniff_file(upload) -> str | None:
+    # Type of a whole uploaded file from its first bytes. Unlike sniff() it also recognizes WebP,
+    # which property images (but not application documents) may use.
+    upload.seek(0)
+    head = upload.read(12)
+    upload.seek(0)
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return sniff(head)
+
+
+def _unsupported(field):
+    return ValidationError({field: [UNSUPPORTED]})
+
+
+def _too_large(field):
+    return UploadTooLarge({field: [f'File exceeds {settings.UPLOAD_MAX_DOCUMENT_BYTES} bytes.']})
+
+
+class DocumentUploadHandler(FileUploadHandler):
+    # Runs ahead of Django's memory/temp-file handlers and passes chunks through, so a rejected
+    # document never finishes spooling to memory or disk.
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > settings.UPLOAD_MAX_REQUEST_BYTES:
+            raise UploadTooLarge(f'Request body exceeds {settings.UPLOAD_MAX_REQUEST_BYTES} bytes.')
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.checking = field_name in DOCUMENT_FIELDS
+        self.received = 0
+        self.head = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.checking:
+            return raw_data
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_DOCUMENT_BYTES:
+            raise _too_large(self.field_name)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) == SNIFF_BYTES and sniff(self.head) is None:
+                raise _unsupported(self.field_name)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.checking and sniff(self.head) is None:
+            raise _unsupported(self.field_name)
+        return None
+
+
+def validate_document(upload):
+    # Cheap checks on a received upload (serializer field validator); also covers requests that
+    # bypassed the upload handler.
+    if upload.size > settings.UPLOAD_MAX_DOCUMENT_BYTES:
+        raise ValidationError(f'File exceeds {settings.UPLOAD_MAX_DOCUMENT_BYTES} bytes.')
+    upload.seek(0)
+    content_type = sniff(upload.read(SNIFF_BYTES))
+    try:
+        if content_type is None:
+            raise ValidationError(UNSUPPORTED)
+        if content_type == 'application/pdf':
+            upload.seek(max(upload.size - 1024, 0))
+            if b'%%EOF' not in upload.read():
+                raise ValidationError('The PDF is truncated or malformed.')
+        else:
+            upload.seek(0)
+            try:
+                with Image.open(upload) as image:
+                    width, height = image.size
+            except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+                raise ValidationError('The image could not be read.')
+            if width * height > settings.UPLOAD_MAX_IMAGE_PIXELS:
+                raise ValidationError('The image dimensions are too large.')
+    finally:
+        upload.seek(0)
+    return upload
+
+
+def _pdf_page_count(data: bytes) -> int:
+    # Page objects are either plain (/Type /Page) or packed into compressed object streams
+    # (PDF 1.5+), so flate-compressed streams are inflated (capped) and searched as well.
+    pages = len(PDF_PAGE.findall(data))
+    for match in PDF_STREAM.finditer(data):
+        end = data.find(b'endstream', match.end())
+        if end == -1:
+            break
+        inflater = zlib.decompressobj()
+        try:
+            inflated = inflater.decompress(data[match.end():end], PDF_MAX_INFLATE)
+        except zlib.error:
+            continue
+        pages += len(PDF_PAGE.findall(inflated))
+    return pages
+
+
+def deep_check(handle):
+    head = handle.read(SNIFF_BYTES)
+    content_type = sniff(head)
+    if content_type is None:
+        raise DocumentRejected('unsupported file type')
+    handle.seek(0)
+    if content_type == 'application/pdf':
+        pages = _pdf_page_count(handle.read(settings.UPLOAD_MAX_DOCUMENT_BYTES + 1))
+        if pages == 0:
+            raise DocumentRejected('PDF has no pages')
+        if pages > settings.UPLOAD_PDF_MAX_PAGES:
+            raise DocumentRejected(f'PDF has more than {settings.UPLOAD_PDF_MAX_PAGES} pages')
+        return
+    try:
+        with Image.open(handle) as image:
+            if image.width * image.height > settings.UPLOAD_MAX_IMAGE_PIXELS:
+                raise DocumentRejected('image dimensions too large')
+            image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError, SyntaxError, ValueError):
+        raise DocumentRejected('image could not be decoded')
+
+
+def check_documents(application) -> dict:
+    # Deep-checks every stored document of an application: {field key: 'clean' or the reason}.
+    # Only reads files, so it runs outside any transaction.
+    results = {}
+    for key, field in DOCUMENT_FIELDS.items():
+        stored = getattr(application, field)
+        if not stored:
+            continue
+        try:
+            with stored.open('rb') as handle:
+                deep_check(handle)
+        except DocumentRejected as exc:
+            results[key] = str(exc)
+        except FileNotFoundError:
+            results[key] = 'file missing'
+        else:
+            results[key] = 'clean'
+    return results
+
+
+def claim_pending(batch_size) -> list:
+    # Marks up to `batch_size` Pending applications (and stale claims of a worker that died) as
+    # Scanning in one short transaction; rows locked by another worker are skipped.
+    stale = timezone.now() - datetime.timedelta(seconds=settings.UPLOAD_SCAN_CLAIM_SECONDS)
+    with transaction.atomic():
+        ids = list(
+            Application.objects.filter(
+                Q(scan_status=Application.ScanStatus.PENDING)
+                | Q(scan_status=Application.ScanStatus.SCANNING, scan_claimed_at__lt=stale)
+            )
+            .order_by('id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        claimed_at = timezone.now()
+        Application.objects.filter(id__in=ids).update(scan_status=Application.ScanStatus.SCANNING, scan_claimed_at=claimed_at)
+    return list(Application.objects.filter(id__in=ids, scan_claimed_at=claimed_at).order_by('id'))
+
+
+def record_scan(application, results):
+    # Stores the outcome of check_documents(). Rejected files are deleted from storage and the
+    # reasons kept in documents['scan']. Returns None when the claim is gone (documents replaced or
+    # the batch reclaimed meanwhile): the row stays queued and is scanned again.
+    with transaction.atomic():
+        current = (
+            Application.objects.select_for_update()
+            .filter(
+                id=application.id,
+                scan_status=Application.ScanStatus.SCANNING,
+                scan_claimed_at=application.scan_claimed_at,
+            )
+            .first()
+        )
+        if current is None:
+            return None
+        for key, field in DOCUMENT_FIELDS.items():
+            result = results.get(key, 'clean')
+            stored = getattr(current, field)
+            if result == 'clean' or not stored:
+                continue
+            if result != 'file missing':
+                storage, name = stored.storage, stored.name
+                transaction.on_commit(lambda storage=storage, name=name: storage.delete(name))
+            setattr(current, field, None)
+
+        documents = current.documents if isinstance(current.documents, dict) else {}
+        current.documents = {**documents, 'scan': results}
+        rejected = any(result != 'clean' for result in results.values())
+        current.scan_status = Application.ScanStatus.REJECTED if rejected else Application.ScanStatus.CLEAN
+        current.scan_claimed_at = None
+        current.save(update_fields=['id_document', 'proof_of_funds', 'documents', 'scan_status', 'scan_claimed_at'])
+        return current.scan_status
+
+
+def scan_pending(batch_size):
+    # Claims a batch, then scans each application outside any transaction (file reads and decoding
+    # can be slow) and writes each result in its own short transaction.
+    counts = {'claimed': 0, Application.ScanStatus.CLEAN: 0, Application.ScanStatus.REJECTED: 0}
+    for application in claim_pending(batch_size):
+        counts['claimed'] += 1
+        status = record_scan(application, check_documents(application))
+        if status is not None:
+            counts[status] += 1
+    return counts
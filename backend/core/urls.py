@@ -2,15 +2,29 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from .events import stream_view
 from .views import (
     ActiveCompanyView,
+    AnalyticsConversionView,
+    AnalyticsPlotsView,
+    AnalyticsRevenueView,
     ApplicationViewSet,
     CompanyViewSet,
+    DirectUploadView,
+    EventTicketView,
     HealthView,
+    LocalUploadView,
     MeView,
+    ProfileDetailView,
+    ProfileDownloadView,
+    ProfileListView,
+    ProfileToggleView,
+    ProfileTokenView,
     PublicApplicationsView,
     PublicCompaniesView,
+    PublicFeaturesView,
     PublicPropertiesView,
+    PublicPropertyClustersView,
     PropertyViewSet,
     RavenTokenObtainPairView,
     SignupView,
@@ -32,6 +46,20 @@ urlpatterns = [
     path('auth/active-company/', ActiveCompanyView.as_view(), name='active_company'),
     path('public/companies/', PublicCompaniesView.as_view(), name='public_companies'),
     path('public/properties/', PublicPropertiesView.as_view(), name='public_properties'),
+    path('public/properties/clusters/', PublicPropertyClustersView.as_view(), name='public_property_clusters'),
+    path('public/features/', PublicFeaturesView.as_view(), name='public_features'),
     path('public/applications/', PublicApplicationsView.as_view(), name='public_applications'),
+    path('events/ticket/', EventTicketView.as_view(), name='event_ticket'),
+    path('events/stream/', stream_view, name='event_stream'),
+    path('uploads/', DirectUploadView.as_view(), name='direct_upload'),
+    path('uploads/local/<str:token>/', LocalUploadView.as_view(), name='direct_upload_local'),
+    path('profiles/', ProfileListView.as_view(), name='profiles'),
+    path('profiles/token/', ProfileTokenView.as_view(), name='profile_token'),
+    path('profiles/toggle/', ProfileToggleView.as_view(), name='profile_toggle'),
+    path('profiles/<str:profile_id>/', ProfileDetailView.as_view(), name='profile_detail'),
+    path('profiles/<str:profile_id>/download/', ProfileDownloadView.as_view(), name='profile_download'),
+    path('analytics/plots/', AnalyticsPlotsView.as_view(), name='analytics_plots'),
+    path('analytics/conversion/', AnalyticsConversionView.as_view(), name='analytics_conversion'),
+    path('analytics/revenue/', AnalyticsRevenueView.as_view(), name='analytics_revenue'),
     path('', include(router.urls)),
 ]
@@ -1,28 +1,69 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import FileResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import urlencode
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework import status
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from drf_spectacular.utils import OpenApiResponse, extend_schema, extend_schema_view
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema, extend_schema_view
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from .models import Application, Company, Property, User
+from . import analytics, caching, db_routing, duplicates, events, profiling, stats
+from .fieldsets import FIELDSET_PARAMETERS, fieldset_kwargs, restrict_queryset
+from .filters import (
+    PROPERTY_FILTER_PARAMETERS,
+    cluster_properties,
+    feature_vocabulary,
+    filter_properties,
+    parse_zoom,
+)
+from .models import (
+    Application,
+    Company,
+    CompanyApplicationConversion,
+    CompanyPlotUsage,
+    PlanRevenue,
+    Property,
+    User,
+)
 from .permissions import IsAdminOrSuperAdmin, IsAuthenticatedUser, IsSuperAdmin
 from .serializers import (
     ApplicationSerializer,
+    BulkActionSerializer,
+    CompanyApplicationConversionSerializer,
     ClientSignupSerializer,
     CompanyCreateSerializer,
+    CompanyMembershipBatchSerializer,
+    CompanyPlotUsageSerializer,
     CompanySerializer,
+    CompanyStatsSerializer,
+    DirectUploadRequestSerializer,
+    PlanRevenueSerializer,
     PublicPropertySerializer,
     PropertySerializer,
     UserCreateSerializer,
     UserSerializer,
 )
+from .storage import DIRECT_UPLOAD_TARGETS, LocalMediaStorage, create_direct_upload, load_upload_token
+from .tenancy import tenant_context
+from .throttling import CompanyThrottle, EmailThrottle, IPThrottle
+from .uploads import DocumentUploadHandler, UploadTooLarge, sniff_file
+from .workflows import APPROVED, approve_applications
 
 
 class RavenTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -37,6 +78,8 @@ class RavenTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 class RavenTokenObtainPairView(TokenObtainPairView):
     serializer_class = RavenTokenObtainPairSerializer
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'login'
 
     @extend_schema(
         summary='Login (JWT token obtain)',
@@ -44,6 +87,7 @@ class RavenTokenObtainPairView(TokenObtainPairView):
         responses={
             200: OpenApiResponse(description='Access and refresh tokens'),
             401: OpenApiResponse(description='Invalid credentials'),
+            429: OpenApiResponse(description='Too many attempts (see Retry-After)'),
         },
     )
     def post(self, request, *args, **kwargs):
@@ -62,6 +106,8 @@ class MeView(APIView):
 
 class SignupView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'signup'
 
     @extend_schema(
         summary='Client signup (multi-company)',
@@ -75,6 +121,7 @@ class SignupView(APIView):
                 description='JWT tokens and the created/updated user payload.'
             ),
             400: OpenApiResponse(description='Validation error'),
+            429: OpenApiResponse(description='Too many signups (see Retry-After)'),
         },
     )
     def post(self, request):
@@ -120,76 +167,341 @@ class ActiveCompanyView(APIView):
             return Response({'detail': 'companyId is required'}, status=400)
 
         user = request.user
-
-        if getattr(user, 'role', None) == 'SuperAdmin':
-            company = Company.objects.get(id=company_id)
-            user.company = company
-            user.save(update_fields=['company'])
-            return Response(UserSerializer(user).data)
-
-        is_member = user.company_memberships.filter(company_id=company_id).exists()
-        if not is_member:
+        tenant = tenant_context(request)
+
+        if tenant.is_superadmin:
+            user.company = Company.objects.get(id=company_id)
+        elif tenant.is_member(company_id):
+            # A membership row guarantees the company exists, so it is not fetched again.
+            user.company_id = uuid.UUID(str(company_id))
+        else:
             return Response({'detail': 'Not a member of this company'}, status=403)
-
-        company = Company.objects.get(id=company_id)
-        user.company = company
         user.save(update_fields=['company'])
         return Response(UserSerializer(user).data)
 
 
-class PublicCompaniesView(APIView):
+class ReplicaReadMixin:
+    # Safe reads of these actions may be served by the read replica (plain APIViews have no
+    # action, so all of their GETs qualify).
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        action_name = getattr(self, 'action', None)
+        if action_name is None or action_name in self.replica_actions:
+            self._replica_token = db_routing.use_replica(request)
+
+    def dispatch(self, request, *args, **kwargs):
+        self._replica_token = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            db_routing.release(self._replica_token)
+
+
+def cached_feature_vocabulary(company_id):
+    return caching.get_or_set([caching.company(company_id)], ('features',), lambda: feature_vocabulary(company_id))
+
+
+class PublicCompaniesView(ReplicaReadMixin, APIView):
     permission_classes = [AllowAny]
 
     @extend_schema(
         summary='Public companies list',
         description='Public endpoint used during signup to allow selecting companies. Returns all companies.',
+        parameters=FIELDSET_PARAMETERS,
         responses={200: CompanySerializer(many=True)},
     )
     def get(self, request):
-        companies = Company.objects.all().order_by('name')
-        return Response(CompanySerializer(companies, many=True).data)
+        fieldset = fieldset_kwargs(request)
+
+        def serialize():
+            companies = restrict_queryset(Company.objects.all().order_by('name'), CompanySerializer(**fieldset))
+            return CompanySerializer(companies, many=True, **fieldset).data
 
+        return Response(caching.get_or_set([caching.PUBLIC], ('public_companies', sorted(fieldset.items())), serialize))
 
-class PublicPropertiesView(APIView):
+
+class PublicPropertiesView(ReplicaReadMixin, APIView):
     permission_classes = [AllowAny]
 
     @extend_schema(
         summary='Public properties list',
-        description='Public endpoint for the landing page marketplace. Returns all properties across all companies.',
+        description=(
+            'Public endpoint for the landing page marketplace. Returns all properties across all companies, '
+            'optionally filtered by companyId, features and map area (bbox or near/radius, nearest first).'
+        ),
+        parameters=FIELDSET_PARAMETERS + PROPERTY_FILTER_PARAMETERS,
         responses={200: PublicPropertySerializer(many=True)},
     )
     def get(self, request):
         company_id = request.query_params.get('companyId')
-        qs = Property.objects.select_related('company').filter(deleted_at__isnull=True)
+        fieldset = fieldset_kwargs(request)
+        qs = Property.objects.select_related('company').filter(deleted_at__isnull=True).order_by('-id')
+        if company_id:
+            qs = qs.filter(company_id=company_id)
+        qs = filter_properties(qs, request)
+        properties = restrict_queryset(qs, PublicPropertySerializer(**fieldset))
+        return Response(PublicPropertySerializer(properties, many=True, context={'request': request}, **fieldset).data)
+
+
+class PublicPropertyClustersView(ReplicaReadMixin, APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary='Public property map clusters',
+        description=(
+            'Marketplace map markers: properties with coordinates grouped into grid cells sized for the zoom level, '
+            'each returned as {latitude, longitude, count, propertyId}. propertyId is set only for single-property '
+            'cells. Accepts the same companyId and property filters as the public properties list.'
+        ),
+        parameters=[OpenApiParameter('zoom', OpenApiTypes.INT, required=True)] + PROPERTY_FILTER_PARAMETERS,
+        responses={200: OpenApiResponse(description='List of clusters')},
+    )
+    def get(self, request):
+        zoom = parse_zoom(request.query_params.get('zoom'))
+        company_id = request.query_params.get('companyId')
+        qs = Property.objects.filter(deleted_at__isnull=True)
         if company_id:
             qs = qs.filter(company_id=company_id)
-        properties = qs.order_by('-id')
-        return Response(PublicPropertySerializer(properties, many=True, context={'request': request}).data)
+        return Response(cluster_properties(filter_properties(qs, request), zoom))
+
+
+class PublicFeaturesView(ReplicaReadMixin, APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary='Public feature vocabulary',
+        description=(
+            "Distinct features of a company's available listings with how many properties have each, "
+            'for building the marketplace feature filter.'
+        ),
+        parameters=[OpenApiParameter('companyId', OpenApiTypes.UUID, required=True)],
+        responses={200: OpenApiResponse(description='List of {feature, count}'), 404: OpenApiResponse(description='Unknown company')},
+    )
+    def get(self, request):
+        try:
+            company_id = uuid.UUID(request.query_params.get('companyId', ''))
+        except ValueError:
+            raise ValidationError({'companyId': 'A valid company id is required.'})
+        # Checked before the cache, so made-up ids don't create cache entries.
+        if not Company.objects.filter(id=company_id).exists():
+            raise NotFound()
+        return Response(cached_feature_vocabulary(company_id))
+
+
+class DocumentUploadMixin:
+    # Streams multipart bodies through the document checks before Django spools the files.
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        request.upload_handlers.insert(0, DocumentUploadHandler(request))
+        return drf_request
+
+
+def saved_application_response(request, application, created):
+    # 201 with the full application when this request (or the original one with the same
+    # Idempotency-Key) created it; 200 with only DUPLICATE_FIELDS for an existing duplicate.
+    fields = None if created else duplicates.DUPLICATE_FIELDS
+    data = ApplicationSerializer(application, fields=fields, context={'request': request}).data
+    return Response(data, status=201 if created else 200)
+
+
+IDEMPOTENCY_PARAMETER = OpenApiParameter(
+    duplicates.IDEMPOTENCY_HEADER,
+    OpenApiTypes.STR,
+    OpenApiParameter.HEADER,
+    description='Client-generated key (e.g. a UUID); retries with the same key return the original application.',
+)
 
 
-class PublicApplicationsView(APIView):
+class PublicApplicationsView(DocumentUploadMixin, APIView):
     permission_classes = [AllowAny]
     parser_classes = (JSONParser, MultiPartParser, FormParser)
+    throttle_classes = [IPThrottle, EmailThrottle, CompanyThrottle]
+    throttle_scope = 'public_applications'
+    idempotency_scope = 'public_applications'
 
     @extend_schema(
         summary='Public application create',
-        description='Public endpoint to submit a land acquisition application without requiring an account.',
+        description=(
+            'Public endpoint to submit a land acquisition application without requiring an account. '
+            'idDocument/proofOfFunds must be PDF, JPEG or PNG within the upload size limit; accepted documents '
+            'are scanned in the background (scanStatus Pending, Scanning, then Clean or Rejected). '
+            'Retries with the same Idempotency-Key and the same applicantEmail/propertyId return the original '
+            'application without counting against the rate limits; reusing a key for another email or property is '
+            'a 422. A submission for the same email and property as a recent '
+            'application is not stored again: the response is 200 with that application\'s id and status.'
+        ),
+        parameters=[IDEMPOTENCY_PARAMETER],
         request=ApplicationSerializer,
-        responses={201: ApplicationSerializer},
+        responses={
+            200: OpenApiResponse(description='Duplicate of an existing application: {id, propertyId, status, dateApplied}'),
+            201: ApplicationSerializer,
+            413: OpenApiResponse(description='Document or request body too large'),
+            422: OpenApiResponse(description='Idempotency-Key already used for a different application'),
+            429: OpenApiResponse(description='Too many submissions (see Retry-After)'),
+        },
     )
     def post(self, request):
+        key = duplicates.idempotency_key(request)
+        application = self.replayed_application(request)
+        if application is not None:
+            return saved_application_response(request, application, created=True)
         serializer = ApplicationSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
-        application = serializer.save()
-        return Response(ApplicationSerializer(application, context={'request': request}).data, status=201)
+        application, created = duplicates.save_application(serializer)
+        if created:
+            duplicates.remember(self.idempotency_scope, key, application)
+        return saved_application_response(request, application, created)
+
+    def replayed_application(self, request):
+        if not hasattr(self, '_replayed_application'):
+            self._replayed_application = duplicates.replayed_application(self.idempotency_scope, request)
+        return self._replayed_application
+
+    def check_throttles(self, request):
+        # Replays are answered from the original submission without spending rate-limit tokens.
+        if self.replayed_application(request) is None:
+            super().check_throttles(request)
+
+
+class DirectUploadView(APIView):
+    permission_classes = [AllowAny]
+    throttle_classes = [IPThrottle]
+    throttle_scope = 'direct_uploads'
+
+    @extend_schema(
+        summary='Presign a direct upload',
+        description=(
+            'Returns a presigned request for uploading a file straight to media storage: POST `fields` plus the file '
+            '(as `fileField`, last) to `url` as multipart/form-data. Then submit `uploadToken` as idDocumentUpload/'
+            'proofOfFundsUpload (applications) or imageUpload/layoutImageUpload (properties) instead of the file. '
+            'Property targets require Admin/SuperAdmin.'
+        ),
+        request=DirectUploadRequestSerializer,
+        responses={200: OpenApiResponse(description='{method, url, fields, fileField, key, uploadToken, maxBytes, expiresIn}')},
+    )
+    def post(self, request):
+        serializer = DirectUploadRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target = serializer.validated_data['target']
+        if DIRECT_UPLOAD_TARGETS[target][3] and not tenant_context(request).is_admin:
+            raise PermissionDenied()
+        upload = create_direct_upload(target, serializer.validated_data['filename'], serializer.validated_data['contentType'])
+        if upload['url'].startswith('/'):
+            upload['url'] = request.build_absolute_uri(upload['url'])
+        return Response(upload)
+
+
+class LocalUploadView(DocumentUploadMixin, APIView):
+    # Receiving end of LocalMediaStorage.presign_upload: the local stand-in for the object store.
+    permission_classes = [AllowAny]
+    parser_classes = (MultiPartParser,)
+
+    @extend_schema(exclude=True)
+    def post(self, request, token):
+        payload = load_upload_token(token, settings.DIRECT_UPLOAD_EXPIRES)
+        storage = default_storage
+        if not payload or not isinstance(storage, LocalMediaStorage):
+            raise PermissionDenied('Invalid or expired upload.')
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'This field is required.'})
+        if upload.size > payload['max']:
+            raise UploadTooLarge({'file': [f'File exceeds {payload["max"]} bytes.']})
+        if request.data.get('Content-Type') != payload['type']:
+            raise ValidationError({'Content-Type': 'Does not match the presigned upload.'})
+        if sniff_file(upload) != payload['type']:
+            raise ValidationError({'file': 'File content does not match its Content-Type.'})
+        if storage.exists(payload['key']):
+            raise ValidationError({'file': 'This upload was already completed.'})
+        storage.save(payload['key'], upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class EventTicketView(APIView):
+    permission_classes = [IsAuthenticatedUser]
+
+    @extend_schema(
+        summary='Issue an event stream ticket',
+        description=(
+            'Returns a short-lived ticket for the server-sent events stream (GET /api/events/stream/?ticket=...). '
+            'Events: application.created, application.status and property.status, scoped like the REST API '
+            '(clients only receive events for their own applications). The stream resumes from Last-Event-ID on '
+            'reconnect; a `reset` event means the gap could not be replayed and lists should be reloaded. When '
+            'the stream answers 401, request a new ticket.'
+        ),
+        request=None,
+        responses={200: OpenApiResponse(description='{ticket, url, expiresIn}')},
+    )
+    def post(self, request):
+        ticket = events.create_ticket(request.user)
+        url = f'{request.build_absolute_uri(reverse("event_stream"))}?{urlencode({"ticket": ticket})}'
+        return Response({'ticket': ticket, 'url': url, 'expiresIn': settings.EVENTS_TICKET_MAX_AGE})
 
 
 class TenantScopedViewSetMixin:
+    @property
+    def tenant(self):
+        return tenant_context(self.request)
+
     def _tenant_company_id(self):
-        user = self.request.user
-        if getattr(user, 'role', None) == 'SuperAdmin':
-            return None
-        return user.company_id
+        return self.tenant.scope_company_id
+
+
+class BulkActionViewSetMixin:
+    bulk_status_choices = ()
+
+    def bulk_delete(self, queryset):
+        return queryset.delete()
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        serializer = BulkActionSerializer(data=request.data, status_choices=self.bulk_status_choices)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        bulk_action = serializer.validated_data['action']
+
+        with transaction.atomic():
+            # get_queryset() applies tenant scoping, so ids outside the caller's company report not_found.
+            scoped = self.get_queryset().order_by().filter(id__in=ids)
+            status = serializer.validated_data.get('status')
+            found = self.bulk_target_ids(scoped, bulk_action, status)
+            if bulk_action == BulkActionSerializer.ACTION_SET_STATUS:
+                results = self.bulk_set_status(found, status)
+            else:
+                targets = scoped.model._default_manager.filter(id__in=found)
+                with stats.tracking(targets), caching.tracking(targets):
+                    self.bulk_delete(targets)
+                results = dict.fromkeys(found, 'deleted')
+
+        return Response({'results': [{'id': str(pk), 'result': results.get(pk, 'not_found')} for pk in ids]})
+
+    def bulk_target_ids(self, scoped, bulk_action, status):
+        # Locked in id order, so overlapping bulk requests queue instead of deadlocking.
+        return list(scoped.select_for_update().order_by('id').values_list('id', flat=True))
+
+    def bulk_set_status(self, ids, status):
+        targets = self.get_queryset().model._default_manager.filter(id__in=ids)
+        with stats.tracking(targets), events.tracking(targets), caching.tracking(targets):
+            targets.update(status=status)
+        return dict.fromkeys(ids, 'updated')
+
+
+class SparseFieldsetViewSetMixin:
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.sparse_fieldset_actions:
+            for key, value in fieldset_kwargs(self.request).items():
+                kwargs.setdefault(key, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.sparse_fieldset_actions:
+            queryset = restrict_queryset(queryset, self.get_serializer())
+        return queryset
 
 
 @extend_schema_view(
@@ -199,16 +511,20 @@ class TenantScopedViewSetMixin:
             'Returns companies visible to the current user. SuperAdmin sees all companies. '
             'Other roles only see companies where they have a CompanyMembership.'
         ),
+        parameters=FIELDSET_PARAMETERS,
     ),
-    retrieve=extend_schema(summary='Get company', description='Retrieve a single company within your scope.'),
+    retrieve=extend_schema(summary='Get company', description='Retrieve a single company within your scope.', parameters=FIELDSET_PARAMETERS),
     create=extend_schema(summary='Create company', description='SuperAdmin-only: create a new company.'),
     update=extend_schema(summary='Update company', description='SuperAdmin-only: update a company.'),
     partial_update=extend_schema(summary='Partially update company', description='SuperAdmin-only: partially update a company.'),
     destroy=extend_schema(summary='Delete company', description='SuperAdmin-only: delete a company.'),
 )
-class CompanyViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
+class CompanyViewSet(
+    ReplicaReadMixin, SparseFieldsetViewSetMixin, TenantScopedViewSetMixin, viewsets.ModelViewSet
+):
     queryset = Company.objects.all().order_by('name')
     serializer_class = CompanySerializer
+    replica_actions = ('list', 'retrieve', 'features')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -216,11 +532,10 @@ class CompanyViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
         return CompanySerializer
 
     def get_queryset(self) -> QuerySet:
-        user = self.request.user
-        if getattr(user, 'role', None) == 'SuperAdmin':
+        if self.tenant.is_superadmin:
             return Company.objects.all().order_by('name')
 
-        membership_ids = list(user.company_memberships.values_list('company_id', flat=True))
+        membership_ids = self.tenant.membership_ids
         if membership_ids:
             return Company.objects.filter(id__in=membership_ids).order_by('name')
 
@@ -233,31 +548,77 @@ class CompanyViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ('list', 'retrieve'):
             return [IsAuthenticatedUser()]
+        if self.action == 'features':
+            return [IsAuthenticatedUser()]
+        if self.action in ('memberships', 'stats'):
+            return [IsAdminOrSuperAdmin()]
         return [IsSuperAdmin()]
 
+    @extend_schema(
+        summary='Batch enroll clients',
+        description=(
+            'Admin/SuperAdmin: enroll many Client users (by userIds and/or emails) into this company in one transaction. '
+            'Existing memberships are left untouched. Returns a per-user result: created, exists, not_found or not_client.'
+        ),
+        request=CompanyMembershipBatchSerializer,
+        responses={200: OpenApiResponse(description='Per-user results')},
+    )
+    @action(detail=True, methods=['post'])
+    def memberships(self, request, pk=None):
+        company = self.get_object()
+        serializer = CompanyMembershipBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'results': serializer.save(company=company)})
+
+    @extend_schema(
+        summary='Company dashboard statistics',
+        description=(
+            'Admin/SuperAdmin: property counts by status, application counts by status and offer sums for this company. '
+            'Served from a summary row kept current on every property/application write, so the cost does not grow '
+            'with company size.'
+        ),
+        responses={200: OpenApiResponse(description='Summary statistics')},
+    )
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        company = self.get_object()
+        return Response(CompanyStatsSerializer(stats.company_stats(company.id)).data)
+
+    @extend_schema(
+        summary='Company feature vocabulary',
+        description='Distinct features used by this company\'s properties with how many properties have each (most common first).',
+        responses={200: OpenApiResponse(description='List of {feature, count}')},
+    )
+    @action(detail=True, methods=['get'])
+    def features(self, request, pk=None):
+        company = self.get_object()
+        return Response(cached_feature_vocabulary(company.id))
+
 
 @extend_schema_view(
-    list=extend_schema(summary='List users', description='Admin/SuperAdmin: list users within the current tenant scope.'),
-    retrieve=extend_schema(summary='Get user', description='Admin/SuperAdmin: retrieve a single user.'),
+    list=extend_schema(summary='List users', description='Admin/SuperAdmin: list users within the current tenant scope.', parameters=FIELDSET_PARAMETERS),
+    retrieve=extend_schema(summary='Get user', description='Admin/SuperAdmin: retrieve a single user.', parameters=FIELDSET_PARAMETERS),
     create=extend_schema(summary='Create user', description='SuperAdmin-only: create a user.'),
     update=extend_schema(summary='Update user', description='Admin/SuperAdmin: update a user within the current tenant scope.'),
     partial_update=extend_schema(summary='Partially update user', description='Admin/SuperAdmin: partially update a user within the current tenant scope (e.g. deactivate).'),
     destroy=extend_schema(summary='Delete user', description='SuperAdmin-only: delete a user.'),
 )
-class UserViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
+class UserViewSet(
+    ReplicaReadMixin, SparseFieldsetViewSetMixin, TenantScopedViewSetMixin, viewsets.ModelViewSet
+):
     queryset = User.objects.all().order_by('email')
 
     def get_queryset(self) -> QuerySet:
-        user = self.request.user
-        if getattr(user, 'role', None) == 'SuperAdmin':
-            return User.objects.all().order_by('email')
+        users = User.objects.prefetch_related('company_memberships')
+        if self.tenant.is_superadmin:
+            return users.order_by('email')
 
         tenant_company_id = self._tenant_company_id()
         if not tenant_company_id:
             return User.objects.none()
 
         return (
-            User.objects.filter(company_id=tenant_company_id)
+            users.filter(company_id=tenant_company_id)
             .exclude(role='SuperAdmin')
             .order_by('email')
         )
@@ -274,16 +635,36 @@ class UserViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
 
 
 @extend_schema_view(
-    list=extend_schema(summary='List properties', description='List properties in the current active company scope.'),
-    retrieve=extend_schema(summary='Get property', description='Retrieve a property in the current active company scope.'),
+    list=extend_schema(
+        summary='List properties',
+        description='List properties in the current active company scope, optionally filtered by features.',
+        parameters=FIELDSET_PARAMETERS + PROPERTY_FILTER_PARAMETERS,
+    ),
+    retrieve=extend_schema(summary='Get property', description='Retrieve a property in the current active company scope.', parameters=FIELDSET_PARAMETERS),
     create=extend_schema(summary='Create property', description='Admin/SuperAdmin: create a property for the active company.'),
     update=extend_schema(summary='Update property', description='Admin/SuperAdmin: update a property.'),
     partial_update=extend_schema(summary='Partially update property', description='Admin/SuperAdmin: partially update a property.'),
     destroy=extend_schema(summary='Delete property', description='Admin/SuperAdmin: delete a property.'),
+    bulk=extend_schema(
+        summary='Bulk property action',
+        description=(
+            'Admin/SuperAdmin: apply `set_status` (Available/Reserved/Sold) or `delete` (soft delete) to up to 1000 '
+            'properties in one transaction with a single UPDATE. Returns a result per id (updated/deleted/not_found).'
+        ),
+        request=BulkActionSerializer,
+        responses={200: OpenApiResponse(description='Per-id results')},
+    ),
 )
-class PropertyViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
+class PropertyViewSet(
+    ReplicaReadMixin, BulkActionViewSetMixin, SparseFieldsetViewSetMixin, TenantScopedViewSetMixin, viewsets.ModelViewSet
+):
     serializer_class = PropertySerializer
     parser_classes = (JSONParser, MultiPartParser, FormParser)
+    bulk_status_choices = Property.Status.choices
+    replica_actions = ('list', 'retrieve', 'clusters')
+
+    def bulk_delete(self, queryset):
+        return queryset.filter(deleted_at__isnull=True).update(deleted_at=timezone.now())
 
     def get_queryset(self) -> QuerySet:
         tenant_company_id = self._tenant_company_id()
@@ -291,6 +672,27 @@ class PropertyViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
             return Property.objects.filter(company_id=tenant_company_id, deleted_at__isnull=True).order_by('-id')
         return Property.objects.filter(deleted_at__isnull=True).order_by('-id')
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in ('list', 'clusters'):
+            queryset = filter_properties(queryset, self.request)
+        return queryset
+
+    @extend_schema(
+        summary='Property map clusters',
+        description=(
+            'Properties in scope that have coordinates, grouped into grid cells sized for the zoom level. '
+            'Each cell is returned as {latitude, longitude, count, propertyId}; propertyId is set only for '
+            'single-property cells. Accepts the same filters as the list endpoint.'
+        ),
+        parameters=[OpenApiParameter('zoom', OpenApiTypes.INT, required=True)] + PROPERTY_FILTER_PARAMETERS,
+        responses={200: OpenApiResponse(description='List of clusters')},
+    )
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        zoom = parse_zoom(request.query_params.get('zoom'))
+        return Response(cluster_properties(self.filter_queryset(self.get_queryset()), zoom))
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         if getattr(instance, 'deleted_at', None) is None:
@@ -299,32 +701,89 @@ class PropertyViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def get_permissions(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'clusters'):
             return [IsAuthenticatedUser()]
         return [IsAdminOrSuperAdmin()]
 
     def perform_create(self, serializer):
-        user = self.request.user
-        if getattr(user, 'role', None) == 'SuperAdmin':
+        if self.tenant.is_superadmin:
             serializer.save()
             return
-        if getattr(user, 'role', None) == 'Client':
-            serializer.save(company_id=user.company_id)
-            return
-        serializer.save(company_id=user.company_id)
+        serializer.save(company_id=self.tenant.company_id)
 
 
 @extend_schema_view(
-    list=extend_schema(summary='List applications', description='List applications in the current active company scope.'),
-    retrieve=extend_schema(summary='Get application', description='Retrieve a single application in the current active company scope.'),
-    create=extend_schema(summary='Create application', description='Client/Admin/SuperAdmin: create an application in the active company scope.'),
-    update=extend_schema(summary='Update application', description='Admin/SuperAdmin: update an application.'),
-    partial_update=extend_schema(summary='Partially update application', description='Admin/SuperAdmin: partially update an application.'),
+    list=extend_schema(
+        summary='List applications',
+        description=(
+            'List applications in the current active company scope, newest first. '
+            'appliedFrom/appliedTo (YYYY-MM-DD) restrict the date window, which keeps the query on recent partitions.'
+        ),
+        parameters=FIELDSET_PARAMETERS + [
+            OpenApiParameter('appliedFrom', OpenApiTypes.DATE, description='Only applications on or after this date.'),
+            OpenApiParameter('appliedTo', OpenApiTypes.DATE, description='Only applications on or before this date.'),
+        ],
+    ),
+    retrieve=extend_schema(summary='Get application', description='Retrieve a single application in the current active company scope.', parameters=FIELDSET_PARAMETERS),
+    create=extend_schema(
+        summary='Create application',
+        description=(
+            'Client/Admin/SuperAdmin: create an application in the active company scope. Idempotency-Key retries '
+            'and duplicates of a recent application for the same email and property behave as in the public endpoint.'
+        ),
+        parameters=[IDEMPOTENCY_PARAMETER],
+        responses={
+            200: OpenApiResponse(description='Duplicate of an existing application: {id, propertyId, status, dateApplied}'),
+            201: ApplicationSerializer,
+            422: OpenApiResponse(description='Idempotency-Key already used for a different application'),
+        },
+    ),
+    update=extend_schema(
+        summary='Update application',
+        description=(
+            'Admin/SuperAdmin: update an application. Setting status to Approved reserves the property and '
+            'rejects the other pending applications for it; returns 409 if another application already won the property.'
+        ),
+    ),
+    partial_update=extend_schema(
+        summary='Partially update application',
+        description='Admin/SuperAdmin: partially update an application (approval behaves as in update).',
+    ),
     destroy=extend_schema(summary='Delete application', description='Admin/SuperAdmin: delete an application.'),
+    bulk=extend_schema(
+        summary='Bulk application action',
+        description=(
+            'Admin/SuperAdmin: apply `set_status` (Pending/Approved/Rejected) or `delete` to up to 1000 applications '
+            'in one transaction with a single statement. Approvals reserve the property and auto-reject competing '
+            'pending applications. Returns a result per id (updated/deleted/not_found/conflict/property_unavailable).'
+        ),
+        request=BulkActionSerializer,
+        responses={200: OpenApiResponse(description='Per-id results')},
+    ),
 )
-class ApplicationViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
+class ApplicationViewSet(
+    DocumentUploadMixin,
+    ReplicaReadMixin,
+    BulkActionViewSetMixin,
+    SparseFieldsetViewSetMixin,
+    TenantScopedViewSetMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = ApplicationSerializer
     parser_classes = (JSONParser, MultiPartParser, FormParser)
+    bulk_status_choices = Application.Status.choices
+
+    def bulk_target_ids(self, scoped, bulk_action, status):
+        if bulk_action == BulkActionSerializer.ACTION_SET_STATUS and status == Application.Status.APPROVED:
+            # approve_applications locks the properties before the application rows.
+            return list(scoped.order_by('id').values_list('id', flat=True))
+        return super().bulk_target_ids(scoped, bulk_action, status)
+
+    def bulk_set_status(self, ids, status):
+        if status != Application.Status.APPROVED:
+            return super().bulk_set_status(ids, status)
+        outcomes = approve_applications(ids)
+        return {pk: 'updated' if outcome == APPROVED else outcome for pk, outcome in outcomes.items()}
 
     def get_queryset(self) -> QuerySet:
         tenant_company_id = self._tenant_company_id()
@@ -332,20 +791,47 @@ class ApplicationViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
             return Application.objects.filter(company_id=tenant_company_id).order_by('-id')
         return Application.objects.all().order_by('-id')
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list':
+            return queryset
+        # A date_applied window lets PostgreSQL prune the table down to the matching monthly partitions.
+        for param, lookup in (('appliedFrom', 'date_applied__gte'), ('appliedTo', 'date_applied__lte')):
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                day = datetime.date.fromisoformat(value)
+            except ValueError:
+                raise ValidationError({param: 'Use YYYY-MM-DD.'})
+            queryset = queryset.filter(**{lookup: day})
+        return queryset
+
     def get_permissions(self):
         if self.action in ('list', 'retrieve', 'create'):
             return [IsAuthenticatedUser()]
         return [IsAdminOrSuperAdmin()]
 
+    def create(self, request, *args, **kwargs):
+        key = duplicates.idempotency_key(request)
+        scope = f'applications:{request.user.pk}'
+        application = duplicates.replayed_application(scope, request)
+        if application is None:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            application, created = self.perform_create(serializer)
+            if not created:
+                return saved_application_response(request, application, created)
+            duplicates.remember(scope, key, application)
+        return saved_application_response(request, application, created=True)
+
     def perform_create(self, serializer):
-        user = self.request.user
-        if getattr(user, 'role', None) == 'SuperAdmin':
-            serializer.save()
-            return
-        if getattr(user, 'role', None) == 'Client':
-            serializer.save(company_id=user.company_id, user=user)
-            return
-        serializer.save(company_id=user.company_id)
+        tenant = self.tenant
+        if tenant.is_superadmin:
+            return duplicates.save_application(serializer)
+        if tenant.is_client:
+            return duplicates.save_application(serializer, company_id=tenant.company_id, user=tenant.user)
+        return duplicates.save_application(serializer, company_id=tenant.company_id)
 
 
 class HealthView(APIView):
@@ -358,3 +844,163 @@ class HealthView(APIView):
     )
     def get(self, request):
         return Response({'status': 'ok'})
+
+
+class ProfileListView(APIView):
+    permission_classes = [IsSuperAdmin]
+
+    @extend_schema(
+        summary='List request profiles',
+        description=(
+            'SuperAdmin-only: list captured request profiles (newest first). '
+            'Profiling must be enabled with DJANGO_PROFILING=1.'
+        ),
+        responses={200: OpenApiResponse(description='Profile metadata list')},
+    )
+    def get(self, request):
+        return Response(
+            {
+                'enabled': settings.PROFILING_ENABLED,
+                'sampleRate': settings.PROFILING_SAMPLE_RATE,
+                'forcedUntil': profiling.forced_until(),
+                'profiles': profiling.list_profiles(),
+            }
+        )
+
+
+class ProfileTokenView(APIView):
+    permission_classes = [IsSuperAdmin]
+
+    @extend_schema(
+        summary='Issue a profiling token',
+        description=(
+            'SuperAdmin-only: returns a signed token. Send it in the profiling header to capture a profile '
+            'of that request (e.g. while reproducing a slow dashboard).'
+        ),
+        request=None,
+        responses={200: OpenApiResponse(description='Header name, token and max age in seconds')},
+    )
+    def post(self, request):
+        return Response(
+            {
+                'header': settings.PROFILING_HEADER,
+                'token': profiling.make_profile_token(),
+                'maxAge': settings.PROFILING_TOKEN_MAX_AGE,
+            }
+        )
+
+
+class ProfileToggleView(APIView):
+    permission_classes = [IsSuperAdmin]
+
+    @extend_schema(
+        summary='Toggle profiling of all requests',
+        description='SuperAdmin-only: profile every request for the next `seconds` (0 turns the toggle off).',
+        request={
+            'application/json': {
+                'type': 'object',
+                'properties': {'seconds': {'type': 'integer', 'minimum': 0}},
+                'required': ['seconds'],
+            }
+        },
+        responses={
+            200: OpenApiResponse(description='Timestamp the toggle expires at (or null)'),
+            503: OpenApiResponse(description='The profiles directory is not writable'),
+        },
+    )
+    def post(self, request):
+        try:
+            seconds = int(request.data.get('seconds'))
+        except (TypeError, ValueError):
+            return Response({'detail': 'seconds must be an integer'}, status=400)
+        try:
+            until = profiling.force_profiling(min(seconds, 3600))
+        except OSError:
+            return Response({'detail': 'The profiles directory is not writable.'}, status=503)
+        return Response({'forcedUntil': until})
+
+
+class ProfileDetailView(APIView):
+    permission_classes = [IsSuperAdmin]
+
+    @extend_schema(
+        summary='Get request profile',
+        description='SuperAdmin-only: profile metadata, SQL list and cumulative cProfile stats.',
+        responses={200: OpenApiResponse(description='Profile'), 404: OpenApiResponse(description='Not found')},
+    )
+    def get(self, request, profile_id):
+        path = profiling.profile_path(profile_id, '.json')
+        if path is None:
+            return Response({'detail': 'Not found.'}, status=404)
+        return FileResponse(path.open('rb'), content_type='application/json')
+
+
+class ProfileDownloadView(APIView):
+    permission_classes = [IsSuperAdmin]
+
+    @extend_schema(
+        summary='Download request profile',
+        description='SuperAdmin-only: download the raw cProfile dump (pstats / snakeviz compatible).',
+        responses={200: OpenApiResponse(description='Binary .prof file'), 404: OpenApiResponse(description='Not found')},
+    )
+    def get(self, request, profile_id):
+        path = profiling.profile_path(profile_id, '.prof')
+        if path is None:
+            return Response({'detail': 'Not found.'}, status=404)
+        return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
+
+
+class AnalyticsView(APIView):
+    # SuperAdmin cross-tenant reports read precomputed rows instead of scanning every tenant's tables.
+    permission_classes = [IsSuperAdmin]
+    queryset = None
+    serializer_class = None
+
+    def get(self, request):
+        rows = self.serializer_class(self.queryset.all(), many=True).data
+        return Response(
+            {
+                'materialized': analytics.is_materialized(),
+                'refreshedAt': analytics.refreshed_at(),
+                'results': rows,
+            }
+        )
+
+
+class AnalyticsPlotsView(AnalyticsView):
+    queryset = CompanyPlotUsage.objects.order_by('-plots', 'name')
+    serializer_class = CompanyPlotUsageSerializer
+
+    @extend_schema(
+        summary='Plots per company vs plan limit',
+        description='SuperAdmin-only: live plots per company against maxPlots, from the analytics materialized view.',
+        responses={200: OpenApiResponse(description='Per-company plot usage')},
+    )
+    def get(self, request):
+        return super().get(request)
+
+
+class AnalyticsConversionView(AnalyticsView):
+    queryset = CompanyApplicationConversion.objects.order_by('-applications', 'name')
+    serializer_class = CompanyApplicationConversionSerializer
+
+    @extend_schema(
+        summary='Application conversion by company',
+        description='SuperAdmin-only: applications by status and approval rate per company, from the analytics materialized view.',
+        responses={200: OpenApiResponse(description='Per-company conversion')},
+    )
+    def get(self, request):
+        return super().get(request)
+
+
+class AnalyticsRevenueView(AnalyticsView):
+    queryset = PlanRevenue.objects.order_by('-approved_offers')
+    serializer_class = PlanRevenueSerializer
+
+    @extend_schema(
+        summary='Revenue by subscription plan',
+        description='SuperAdmin-only: companies, approved applications and approved offer totals per subscription plan.',
+        responses={200: OpenApiResponse(description='Per-plan revenue')},
+    )
+    def get(self, request):
+        return super().get(request)
@@ -0,0 +1,78 @@
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import caching, events, stats
+from .models import Application, Property
+
+APPROVED = 'approved'
+CONFLICT = 'conflict'
+PROPERTY_UNAVAILABLE = 'property_unavailable'
+
+
+class ApprovalConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The property is no longer available for this application.'
+    default_code = 'approval_conflict'
+
+
+# Property rows are locked in id order so concurrent approvals for the same plot serialize:
+# one application per property wins and the other pending ones are rejected in one UPDATE.
+# Lock order is properties first, then application rows in id order; callers must not lock or
+# write the applications before calling this, or two competing approvals can deadlock.
+# Returns {application_id: APPROVED | CONFLICT | PROPERTY_UNAVAILABLE}.
+@transaction.atomic
+def approve_applications(application_ids, property_status=Property.Status.RESERVED):
+    application_ids = list(dict.fromkeys(application_ids))
+    applications = {
+        app.id: app
+        for app in Application.objects.filter(id__in=application_ids).only('id', 'property_id', 'status')
+    }
+    property_ids = sorted({app.property_id for app in applications.values()})
+    properties = {
+        prop.id: prop
+        for prop in Property.objects.select_for_update().filter(id__in=property_ids).order_by('id').only(
+            'id', 'status', 'deleted_at'
+        )
+    }
+    # Read after taking the locks so approvals committed by a concurrent transaction are visible.
+    taken = set(
+        Application.objects.filter(property_id__in=property_ids, status=Application.Status.APPROVED)
+        .exclude(id__in=application_ids)
+        .values_list('property_id', flat=True)
+    )
+
+    results = {}
+    winners = {}
+    for application_id in application_ids:
+        app = applications.get(application_id)
+        if app is None:
+            continue
+        prop = properties.get(app.property_id)
+        if prop is None or prop.deleted_at is not None:
+            results[application_id] = PROPERTY_UNAVAILABLE
+        elif app.property_id in taken or app.property_id in winners or prop.status == Property.Status.SOLD:
+            results[application_id] = CONFLICT
+        else:
+            winners[app.property_id] = application_id
+            results[application_id] = APPROVED
+
+    if winners:
+        winner_ids = list(winners.values())
+        won_properties = Property.objects.filter(id__in=list(winners))
+        competing = Application.objects.filter(property_id__in=list(winners))
+        list(competing.select_for_update().order_by('id').values_list('id', flat=True))
+        with (
+            stats.tracking(won_properties),
+            stats.tracking(competing),
+            events.tracking(won_properties),
+            events.tracking(competing),
+            caching.tracking(won_properties),
+        ):
+            Application.objects.filter(id__in=winner_ids).update(status=Application.Status.APPROVED)
+            won_properties.exclude(status=Property.Status.SOLD).update(status=property_status)
+            competing.filter(status=Application.Status.PENDING).exclude(id__in=winner_ids).update(
+                status=Application.Status.REJECTED
+            )
+
+    return results
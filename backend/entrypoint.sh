@@ -3,7 +3,9 @@ set -e
 
 python manage.py makemigrations --noinput
 python manage.py migrate --noinput
+python manage.py build_openapi_schema
 python manage.py seed_demo
 DJANGO_SUPERUSER_PASSWORD=suwokono123 python manage.py createsuperuser --name suwokono --email admin@suwokono.com --no-input
 
-exec python manage.py runserver 0.0.0.0:8000
+# ASGI, so the server-sent events stream can hold many idle connections per worker.
+exec uvicorn raven_api.asgi:application --host 0.0.0.0 --port 8000 --reload
@@ -1,7 +1,14 @@
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'raven_api.settings')
+# Sync views run on asgiref worker threads; keep CPU-heavy password hashing on its own bounded pool.
+os.environ.setdefault('DJANGO_PASSWORD_HASHING_OFFLOAD', '1')
 
 application = get_asgi_application()
+if settings.DEBUG:
+    # What runserver does for WSGI: serve admin/static assets in development.
+    application = ASGIStaticFilesHandler(application)
@@ -2,6 +2,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
 from django.core.management.utils import get_random_secret_key
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -40,6 +41,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.tenancy.TenantContextMiddleware',
+    'core.db_routing.ReplicaPinMiddleware',
+    'core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'raven_api.urls'
@@ -72,8 +76,87 @@ DATABASES = {
     }
 }
 
+# Local fallback (benchmarks, quick experiments) when no Postgres is available.
+if os.environ.get('DJANGO_DB_ENGINE', 'postgresql') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+    }
+
+# Optional read replica. List/retrieve and public listing reads go to it (core.db_routing); a caller
+# who just wrote is pinned to the primary for REPLICA_PIN_SECONDS. With SQLite, SQLITE_REPLICA_PATH
+# names a second file that stands in for the replica locally.
+if os.environ.get('POSTGRES_REPLICA_HOST') and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['POSTGRES_REPLICA_HOST'],
+        'PORT': os.environ.get('POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']),
+        'NAME': os.environ.get('POSTGRES_REPLICA_DB', DATABASES['default']['NAME']),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif os.environ.get('SQLITE_REPLICA_PATH') and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['SQLITE_REPLICA_PATH'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.db_routing.PrimaryReplicaRouter'] if 'replica' in DATABASES else []
+REPLICA_PIN_SECONDS = int(os.environ.get('DJANGO_REPLICA_PIN_SECONDS', '10'))
+# Cache alias holding read-your-writes pins (use a shared backend with several worker processes).
+REPLICA_PIN_CACHE = 'default'
+
+_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+CACHES = {
+    'default': {
+        'BACKEND': _CACHE_BACKENDS[os.environ.get('DJANGO_CACHE_BACKEND', 'locmem')],
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'raven'),
+    }
+}
+
+# How long a user's company-membership set is cached across requests (0 disables). Membership
+# writes through the ORM invalidate it immediately; raw SQL changes show up after the TTL. Only
+# used with a cache shared by all workers (not locmem).
+TENANT_MEMBERSHIP_CACHE_SECONDS = int(os.environ.get('DJANGO_TENANT_MEMBERSHIP_CACHE_SECONDS', '60'))
+TENANT_MEMBERSHIP_CACHE = 'default'
+
+# Versioned per-company cache namespaces (core.caching): cached reads such as feature vocabularies
+# and the public company list; writes bump the company's generation instead of deleting keys.
+# Must be shared by all web and worker processes (file/memcached/redis); locmem disables it.
+TENANT_CACHE = 'default'
+TENANT_CACHE_TIMEOUT = int(os.environ.get('DJANGO_TENANT_CACHE_TIMEOUT', '300'))
+
+# Cache alias holding throttle token buckets (use the file backend to share limits across worker processes).
+THROTTLE_CACHE = 'default'
+
 AUTH_PASSWORD_VALIDATORS = []
 
+# Password hashing policy. The first hasher hashes new passwords; the rest only verify existing hashes.
+# Logins with a hash from another algorithm or with outdated cost parameters are transparently re-hashed.
+PASSWORD_HASHER = os.environ.get('DJANGO_PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('DJANGO_PBKDF2_ITERATIONS', '0')) or None  # None: Django default
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('DJANGO_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('DJANGO_ARGON2_MEMORY_COST', '65536'))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('DJANGO_ARGON2_PARALLELISM', '2'))
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'core.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'core.hashers.TunedArgon2PasswordHasher',
+}
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise RuntimeError(f'DJANGO_PASSWORD_HASHER must be one of: {", ".join(_PASSWORD_HASHERS)}')
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Hashing runs on a bounded per-process thread pool (enabled by default under ASGI, see asgi.py).
+PASSWORD_HASHING_OFFLOAD = os.environ.get('DJANGO_PASSWORD_HASHING_OFFLOAD', '0') == '1'
+PASSWORD_HASHING_WORKERS = int(os.environ.get('DJANGO_PASSWORD_HASHING_WORKERS', str(os.cpu_count() or 2)))
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -85,6 +168,44 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media storage. 'local' keeps uploads under MEDIA_ROOT (single node); 's3' puts them in an
+# S3-compatible bucket (AWS S3 or MinIO) so every app node sees the same files. Both support
+# presigned direct uploads (POST /api/uploads/); with 's3' the bytes bypass Django entirely.
+STORAGE_BACKEND = os.environ.get('DJANGO_STORAGE_BACKEND', 'local')
+if STORAGE_BACKEND == 's3':
+    _default_storage = {
+        'BACKEND': 'core.s3_storage.S3MediaStorage',
+        'OPTIONS': {
+            'bucket_name': os.environ.get('DJANGO_S3_BUCKET', 'raven-media'),
+            'endpoint_url': os.environ.get('DJANGO_S3_ENDPOINT_URL') or None,
+            'public_endpoint_url': os.environ.get('DJANGO_S3_PUBLIC_ENDPOINT_URL') or None,
+            'region_name': os.environ.get('DJANGO_S3_REGION') or None,
+            'access_key': os.environ.get('DJANGO_S3_ACCESS_KEY_ID') or None,
+            'secret_key': os.environ.get('DJANGO_S3_SECRET_ACCESS_KEY') or None,
+            'addressing_style': os.environ.get('DJANGO_S3_ADDRESSING_STYLE') or None,
+            'signature_version': 's3v4',
+            # Documents are private: media URLs are short-lived presigned GETs.
+            'querystring_auth': True,
+            'querystring_expire': int(os.environ.get('DJANGO_S3_URL_EXPIRES', '3600')),
+            'file_overwrite': False,
+            'multipart_threshold': int(os.environ.get('DJANGO_S3_MULTIPART_THRESHOLD', str(8 * 1024 * 1024))),
+            'multipart_chunksize': int(os.environ.get('DJANGO_S3_MULTIPART_CHUNKSIZE', str(8 * 1024 * 1024))),
+            'max_concurrency': int(os.environ.get('DJANGO_S3_MAX_CONCURRENCY', '4')),
+        },
+    }
+elif STORAGE_BACKEND == 'local':
+    _default_storage = {'BACKEND': 'core.storage.LocalMediaStorage'}
+else:
+    raise RuntimeError('DJANGO_STORAGE_BACKEND must be one of: local, s3')
+STORAGES = {
+    'default': _default_storage,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Presigned uploads must start within DIRECT_UPLOAD_EXPIRES seconds; the returned token can be
+# attached to an application/property for DIRECT_UPLOAD_TOKEN_MAX_AGE seconds.
+DIRECT_UPLOAD_EXPIRES = int(os.environ.get('DJANGO_DIRECT_UPLOAD_EXPIRES', '900'))
+DIRECT_UPLOAD_TOKEN_MAX_AGE = int(os.environ.get('DJANGO_DIRECT_UPLOAD_TOKEN_MAX_AGE', '86400'))
+
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 
 AUTH_USER_MODEL = 'core.User'
@@ -92,6 +213,7 @@ AUTH_USER_MODEL = 'core.User'
 CORS_ALLOWED_ORIGINS = [
     o.strip() for o in os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:5173').split(',') if o.strip()
 ]
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -101,6 +223,20 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Reverse proxies in front of the app. Per-IP throttles take the client address from that many
+    # X-Forwarded-For hops; 0 keys them on REMOTE_ADDR, so clients can't pick their own identity.
+    'NUM_PROXIES': int(os.environ.get('DJANGO_NUM_PROXIES', '0')),
+    # Token-bucket rates for core.throttling, keyed '<view throttle_scope>.<ip|email|company>'.
+    'DEFAULT_THROTTLE_RATES': {
+        'login.ip': os.environ.get('THROTTLE_LOGIN_IP', '30/min'),
+        'login.email': os.environ.get('THROTTLE_LOGIN_EMAIL', '10/min'),
+        'signup.ip': os.environ.get('THROTTLE_SIGNUP_IP', '10/min'),
+        'signup.email': os.environ.get('THROTTLE_SIGNUP_EMAIL', '5/min'),
+        'public_applications.ip': os.environ.get('THROTTLE_PUBLIC_APPLICATIONS_IP', '10/hour'),
+        'public_applications.email': os.environ.get('THROTTLE_PUBLIC_APPLICATIONS_EMAIL', '5/hour'),
+        'public_applications.company': os.environ.get('THROTTLE_PUBLIC_APPLICATIONS_COMPANY', '300/hour'),
+        'direct_uploads.ip': os.environ.get('THROTTLE_DIRECT_UPLOADS_IP', '60/hour'),
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -114,7 +250,76 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# /api/schema/ serves a prebuilt OpenAPI document (manage.py build_openapi_schema) that is only
+# regenerated when the code version changes. DJANGO_CODE_VERSION (e.g. the git sha) pins the
+# version; without it a hash of the backend sources is used.
+CODE_VERSION = os.environ.get('DJANGO_CODE_VERSION', '')
+OPENAPI_SCHEMA_DIR = os.environ.get('DJANGO_OPENAPI_SCHEMA_DIR', str(BASE_DIR / 'openapi'))
+OPENAPI_SCHEMA_MAX_AGE = int(os.environ.get('DJANGO_OPENAPI_SCHEMA_MAX_AGE', '86400'))
+
+# Opt-in request profiling (cProfile + SQL), stored in a bounded on-disk ring buffer.
+# Requests are profiled when they carry a signed PROFILING_HEADER token, while a SuperAdmin toggle is active,
+# or at PROFILING_SAMPLE_RATE.
+PROFILING_ENABLED = os.environ.get('DJANGO_PROFILING', '0') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('DJANGO_PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = os.environ.get('DJANGO_PROFILING_DIR', str(BASE_DIR / 'profiles'))
+PROFILING_MAX_PROFILES = int(os.environ.get('DJANGO_PROFILING_MAX_PROFILES', '100'))
+PROFILING_HEADER = 'X-Raven-Profile'
+PROFILING_TOKEN_MAX_AGE = 3600
+PROFILING_TOP_FUNCTIONS = 60
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
+
+# SuperAdmin analytics materialized views; `refresh_analytics --interval` uses this as its suggested period.
+ANALYTICS_REFRESH_INTERVAL = int(os.environ.get('DJANGO_ANALYTICS_REFRESH_INTERVAL', '300'))
+
+# Application document uploads (core.uploads): per-file and per-request caps enforced while the
+# body streams in, and limits for the background `scan_uploads` worker (polls every
+# UPLOAD_SCAN_INTERVAL seconds; a claimed batch unfinished after UPLOAD_SCAN_CLAIM_SECONDS is retried).
+UPLOAD_MAX_DOCUMENT_BYTES = int(os.environ.get('DJANGO_UPLOAD_MAX_DOCUMENT_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(
+    os.environ.get('DJANGO_UPLOAD_MAX_REQUEST_BYTES', str(2 * UPLOAD_MAX_DOCUMENT_BYTES + 1024 * 1024))
+)
+UPLOAD_MAX_IMAGE_PIXELS = int(os.environ.get('DJANGO_UPLOAD_MAX_IMAGE_PIXELS', str(40_000_000)))
+UPLOAD_PDF_MAX_PAGES = int(os.environ.get('DJANGO_UPLOAD_PDF_MAX_PAGES', '100'))
+UPLOAD_SCAN_INTERVAL = int(os.environ.get('DJANGO_UPLOAD_SCAN_INTERVAL', '10'))
+UPLOAD_SCAN_CLAIM_SECONDS = int(os.environ.get('DJANGO_UPLOAD_SCAN_CLAIM_SECONDS', '600'))
+
+# Duplicate applications (core.duplicates): a submission matching an application for the same email
+# and property from the last APPLICATION_DUPLICATE_WINDOW_HOURS returns that application; an
+# Idempotency-Key header replays the original result for IDEMPOTENCY_KEY_TTL seconds.
+APPLICATION_DUPLICATE_WINDOW_HOURS = int(os.environ.get('DJANGO_APPLICATION_DUPLICATE_WINDOW_HOURS', '24'))
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('DJANGO_IDEMPOTENCY_KEY_TTL', '86400'))
+# Cache alias holding Idempotency-Key mappings (use a shared backend with several worker processes).
+IDEMPOTENCY_CACHE = 'default'
+
+# Server-sent events (core.events, GET /api/events/stream/, ASGI only). On PostgreSQL each worker
+# LISTENs for changes; otherwise it polls the event table every EVENTS_POLL_INTERVAL seconds.
+# Reconnecting streams replay up to EVENTS_REPLAY_LIMIT missed events from the last
+# EVENTS_RETENTION_HOURS (pruned by `archive_and_purge`) before asking the client to reload.
+EVENTS_TICKET_MAX_AGE = int(os.environ.get('DJANGO_EVENTS_TICKET_MAX_AGE', '300'))
+EVENTS_STREAM_MAX_SECONDS = int(os.environ.get('DJANGO_EVENTS_STREAM_MAX_SECONDS', '240'))
+EVENTS_KEEPALIVE_SECONDS = int(os.environ.get('DJANGO_EVENTS_KEEPALIVE_SECONDS', '20'))
+EVENTS_RETRY_MS = int(os.environ.get('DJANGO_EVENTS_RETRY_MS', '3000'))
+EVENTS_QUEUE_SIZE = int(os.environ.get('DJANGO_EVENTS_QUEUE_SIZE', '500'))
+EVENTS_REPLAY_LIMIT = int(os.environ.get('DJANGO_EVENTS_REPLAY_LIMIT', '1000'))
+EVENTS_RETENTION_HOURS = int(os.environ.get('DJANGO_EVENTS_RETENTION_HOURS', '24'))
+EVENTS_POLL_INTERVAL = float(os.environ.get('DJANGO_EVENTS_POLL_INTERVAL', '2'))
+# Overlap of the catch-up query after a reconnect/poll, covering transactions that commit out of id order.
+EVENTS_CATCH_UP_SECONDS = int(os.environ.get('DJANGO_EVENTS_CATCH_UP_SECONDS', '10'))
+EVENTS_CATCH_UP_LIMIT = 10000
+
+# Retention (`archive_and_purge`): properties soft-deleted for longer than ARCHIVE_PROPERTIES_AFTER_DAYS and
+# approved/rejected applications older than ARCHIVE_APPLICATIONS_AFTER_DAYS move to the archive tables;
+# unreferenced media files older than MEDIA_GC_GRACE_HOURS are deleted.
+ARCHIVE_PROPERTIES_AFTER_DAYS = int(os.environ.get('DJANGO_ARCHIVE_PROPERTIES_AFTER_DAYS', '90'))
+ARCHIVE_APPLICATIONS_AFTER_DAYS = int(os.environ.get('DJANGO_ARCHIVE_APPLICATIONS_AFTER_DAYS', '365'))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('DJANGO_ARCHIVE_BATCH_SIZE', '500'))
+MEDIA_GC_GRACE_HOURS = int(os.environ.get('DJANGO_MEDIA_GC_GRACE_HOURS', '24'))
+
+# On PostgreSQL, core_application is partitioned by month of date_applied; `create_application_partitions`
+# (run it from cron) keeps this many months of partitions ready ahead of time.
+APPLICATION_PARTITION_MONTHS_AHEAD = int(os.environ.get('DJANGO_APPLICATION_PARTITION_MONTHS_AHEAD', '3'))
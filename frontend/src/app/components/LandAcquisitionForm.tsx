@@ -37,6 +37,8 @@ export function LandAcquisitionForm({ property, onClose }: LandAcquisitionFormPr
   const [currentStep, setCurrentStep] = useState(1);
   const [idDocumentFile, setIdDocumentFile] = useState<File | null>(null);
   const [proofOfFundsFile, setProofOfFundsFile] = useState<File | null>(null);
+  // One key per form: resubmitting after a dropped response returns the application already created.
+  const [idempotencyKey] = useState(() => crypto.randomUUID());
   
   const { register, handleSubmit, trigger, control, setValue, formState: { errors } } = useForm<FormData>({
     shouldUnregister: true,
@@ -108,7 +110,7 @@ export function LandAcquisitionForm({ property, onClose }: LandAcquisitionFormPr
         fd.append('proofOfFunds', proofOfFundsFile);
 
         if (authToken) {
-          await createApplication(authToken, fd as any);
+          await createApplication(authToken, fd as any, idempotencyKey);
           notifySuccess('Application submitted successfully!');
           onClose();
           return;
@@ -116,6 +118,7 @@ export function LandAcquisitionForm({ property, onClose }: LandAcquisitionFormPr
 
         await apiFetch('/api/public/applications/', {
           method: 'POST',
+          headers: { 'Idempotency-Key': idempotencyKey },
           body: fd as any,
         });
         notifySuccess('Application submitted successfully!');
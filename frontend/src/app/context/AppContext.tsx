@@ -38,7 +38,7 @@ interface AppContextType {
   createProperty: (token: string, property: Partial<Property>) => Promise<Property>;
   updateProperty: (token: string, id: string, property: Partial<Property>) => Promise<Property>;
   deleteProperty: (token: string, id: string) => Promise<void>;
-  createApplication: (token: string, application: Partial<Application>) => Promise<Application>;
+  createApplication: (token: string, application: Partial<Application>, idempotencyKey?: string) => Promise<Application>;
   updateApplication: (token: string, id: string, application: Partial<Application>) => Promise<Application>;
   updateUser: (token: string, id: string, user: Partial<User>) => Promise<User>;
   createCompany: (token: string, company: Partial<Company>) => Promise<Company>;
@@ -220,13 +220,15 @@ export function AppProvider({ children }: { children: ReactNode }) {
     setProperties((prev) => prev.filter((p) => p.id !== id));
   };
 
-  const createApplication = async (token: string, application: Partial<Application>) => {
+  const createApplication = async (token: string, application: Partial<Application>, idempotencyKey?: string) => {
     const created = await apiFetch<Application>('/api/applications/', {
       token,
       method: 'POST',
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
       body: isFormData(application) ? (application as any) : JSON.stringify(application),
     });
-    setApplications((prev) => [created, ...prev]);
+    // Retries and duplicate submissions return an application that is already listed.
+    setApplications((prev) => (prev.some((a) => a.id === created.id) ? prev : [created, ...prev]));
     return created;
   };
 